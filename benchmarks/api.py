@@ -0,0 +1,101 @@
+"""End-to-end client benchmarks against the local stand-in API (`remoras.standin`)
+
+Reports ops/sec along with p50/p99 latency for item upload, listing, feed requests and websocket round trips,
+over real sockets and the real transport. Compare runs before a release to catch regressions
+
+    python -m benchmarks.api [--latency 0.001] [--requests 500] [--codec json] [--json results.json]
+"""
+from remoras import GWManager, TokenConfig, FeedPayload
+from remoras.standin import StandinServer
+import argparse
+import asyncio
+import json
+import time
+
+
+def summarize(name:str, latencies:list[float], elapsed:float, ops:int = None) -> dict:
+    latencies = sorted(latencies)
+    percentile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000
+    result = {"name": name, "ops_per_sec": (ops or len(latencies)) / elapsed, "p50_ms": percentile(0.5), "p99_ms": percentile(0.99)}
+    print(f"{name:<36} {result['ops_per_sec']:>10,.0f} ops/sec   p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms")
+    return result
+
+
+def timed(name:str, fn, count:int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        call_started = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(name, latencies, time.perf_counter() - started)
+
+
+async def atimed(name:str, fn, count:int, concurrency:int = 1) -> dict:
+    latencies = []
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with slots:
+            call_started = time.perf_counter()
+            await fn(i)
+            latencies.append(time.perf_counter() - call_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(count)])
+    return summarize(name, latencies, time.perf_counter() - started)
+
+
+def item(i:int) -> dict:
+    return {"title": f"Item {i}", "description": "Lightweight trail running shoe " * 4, "external_url": f"https://shop/{i}", "image_url": f"https://img/{i}.png"}
+
+
+def run(requests:int, latency:float, codec:str) -> list[dict]:
+    results = []
+    token = TokenConfig(project_name="bench", token="bench")
+
+    with StandinServer(latency=latency).serve_in_thread() as url:
+        manager = GWManager.from_token(token, endpoint=url, codec=codec)
+
+        print(f"stand-in at {url}, {latency * 1000:.1f} ms injected latency, codec {manager.codec.name}")
+        results.append(timed("items.add (1 item)", lambda i: manager.items.add([item(i)]), requests))
+
+        bulk = [item(i) for i in range(requests * 20)]
+        started = time.perf_counter()
+        report = manager.items.add(bulk, chunk_size=100, concurrency=8)
+        results.append(summarize("items.add (bulk, chunks of 100)", [chunk.elapsed for chunk in report.chunks], time.perf_counter() - started, ops=report.succeeded))
+
+        results.append(timed("items.list (100 per page)", lambda i: manager.items.list(params={"page": i % 10 + 1, "count": 100}), requests))
+        results.append(timed("data.feed", lambda i: manager.data.feed(FeedPayload(search_prompt=f"prompt {i}")), requests))
+
+        async def websocket():
+            await manager.websocket.initiate()
+            try:
+                send = lambda i: manager.websocket.send_json({"id": str(i), "type": "socket_pagination_request", "search_prompt": "shoes", "events": []})
+                results.append(await atimed("websocket round trip", send, requests))
+                results.append(await atimed("websocket round trip (32 in flight)", send, requests * 4, concurrency=32))
+            finally:
+                await manager.websocket.close()
+
+        asyncio.run(websocket())
+        manager.close()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.api")
+    parser.add_argument("--requests", type=int, default=500, help="requests per benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency the stand-in adds to every request")
+    parser.add_argument("--codec", default="json", help="json, orjson, ujson or auto")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.requests, args.latency, args.codec)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Card decoding: the old copy-then-pick conversion against the eager, lazy and streaming forms
+
+    python -m benchmarks.cards [cards per page]
+"""
+from remoras import GWManager, TokenConfig
+import json
+import sys
+import timeit
+
+
+def bench(name, fn, number):
+    elapsed = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{name:<40} {number / elapsed:>12,.0f} pages/sec  ({elapsed / number * 1e6:.2f} us/page)")
+
+
+def copy_then_pick(raw):
+    cards = json.loads(raw)['cards']
+    cards = [{**card, "product": {**card['product'], 'body': card['product']['body']}} for card in cards]
+    return [{'id': card['product']['sku'], 'body': card['product']['body']} for card in cards]
+
+
+def main(count=24):
+    websocket = GWManager.from_token(TokenConfig(project_name="bench", token="bench")).websocket
+    body = json.dumps({"title": "Trail running shoe", "description": "Breathable mesh upper " * 8, "price": 89.99, "tags": ["run", "trail"]})
+    page = {"id": "request", "cards": [{"type": "product", "id": f"card-{i}", "source_id": "search", "layout_state": {"row": i}, "product": {"sku": f"sku-{i}", "body": body}} for i in range(count)]}
+    raw = json.dumps(page).encode()
+    number = 5_000
+
+    print(f"{count} cards per page")
+    bench("copy then pick (previous)", lambda: copy_then_pick(raw), number)
+    bench("_convert_cards", lambda: websocket._convert_cards(raw), number)
+    bench("_convert_cards(lazy=True)", lambda: websocket._convert_cards(raw, lazy=True), number)
+    bench("iter_cards, first card only", lambda: next(websocket.iter_cards(raw)), number)
+    bench("eager, every body parsed", lambda: [json.loads(card['body']) for card in websocket._convert_cards(raw)], number)
+    bench("lazy, every body read", lambda: [card.body for card in websocket._convert_cards(raw, lazy=True)], number)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 24)
@@ -0,0 +1,35 @@
+"""JSON codecs on a catalog sized response and a card response
+
+    python -m benchmarks.codec [items]
+"""
+from remoras.codec import CODECS, get_codec
+import sys
+import timeit
+
+
+def bench(name, fn, number):
+    elapsed = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{name:<40} {number / elapsed:>12,.0f} ops/sec  ({elapsed / number * 1e6:.2f} us/op)")
+
+
+def main(count=100):
+    items = [{"id": f"id-{i}", "title": f"item {i}", "description": "Lightweight running shoe – breathable mesh", "external_url": f"https://shop/{i}", "image_url": f"https://img/{i}.png", "price": i * 100} for i in range(count)]
+    cards = {"cards": [{"type": "product", "id": f"card-{i}", "source_id": "s", "layout_state": {}, "product": {"sku": f"id-{i}", "body": item}} for i, item in enumerate(items)]}
+    number = 2_000
+
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name:<40} not installed")
+            continue
+
+        body, message = codec.dumps(items), codec.dumps(cards)
+        print(f"{name} ({count} items)")
+        bench("  dumps items", lambda: codec.dumps(items), number)
+        bench("  loads items", lambda: codec.loads(body), number)
+        bench("  loads cards", lambda: codec.loads(message), number)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
@@ -0,0 +1,31 @@
+"""Payload serialization: `dict()` + `json.dumps` against the direct `encode()` path
+
+    python -m benchmarks.serialization [events per payload]
+"""
+from remoras.structs import Event, WebsocketPayload, FeedPayload
+import json
+import sys
+import timeit
+
+
+def bench(name, fn, number):
+    elapsed = min(timeit.repeat(fn, number=number, repeat=5))
+    print(f"{name:<40} {number / elapsed:>12,.0f} ops/sec  ({elapsed / number * 1e6:.2f} us/op)")
+
+
+def main(count=10):
+    events = [Event.create(id=f"sku-{i}", organization_id="org", session_id="session", visitor_id="visitor", weight=i) for i in range(count)]
+    payload = WebsocketPayload(id="request", search_prompt="running shoes under $100", events=events)
+    number = 20_000
+
+    print(f"WebsocketPayload with {count} events")
+    bench("dict() + json.dumps", lambda: json.dumps(payload.dict()).encode(), number)
+    bench("encode()", payload.encode, number)
+
+    print(f"Event batch of {count} events, as DataManager.event_buffer sends it")
+    bench("[dict()] + dict() + json.dumps", lambda: json.dumps(FeedPayload(events=[event.dict() for event in events]).dict()).encode(), number)
+    bench("FeedPayload.encode()", lambda: FeedPayload(events=events).encode(), number)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
@@ -0,0 +1,41 @@
+"""Items/sec for the batch validators
+
+    python -m benchmarks.validation [count]
+"""
+from remoras.data_validation import validate_items, ITEM_SCHEMA
+import sys
+import time
+
+TEST_ITEM = {"title": "a", "description": "b", "external_url": "c", "image_url": "d"}
+
+
+def legacy_validate_items(items):
+    # the per-item assert chain the batch validator replaced, kept for comparison
+    for item in items:
+        assert "title" in item
+        assert "description" in item
+        assert "external_url" in item
+        assert "image_url" in item
+
+
+def bench(name, validate, items):
+    started = time.perf_counter()
+    validate(items)
+    elapsed = time.perf_counter() - started
+    print(f"{name:<24} {len(items) / elapsed:>14,.0f} items/sec  ({elapsed:.3f}s)")
+
+
+def main(count=1_000_000):
+    items = [{**TEST_ITEM, "external_url": str(i)} for i in range(count)]
+    print(f"Validating {count:,} items")
+
+    bench("assert chain (legacy)", legacy_validate_items, items)
+    bench("validate_items", validate_items, items)
+    bench("validate_items strict", lambda items: validate_items(items, strict=True), items)
+
+    broken = [item if i % 100 else {"title": "a"} for i, item in enumerate(items)]
+    bench("errors() 1% invalid", ITEM_SCHEMA.errors, broken)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,14 @@
+from remoras.standin import StandinServer
+import pytest
+
+@pytest.fixture
+def item():
+    """Factory for valid catalog items, `item(i)` has the unique `external_url` `https://shop/{i}`"""
+    return lambda i: {"title": f"Item {i}", "description": "b", "external_url": f"https://shop/{i}", "image_url": "d"}
+
+@pytest.fixture
+def standin():
+    """A `StandinServer` running in a background thread, yields `(server, url)`"""
+    server = StandinServer(seed=3)
+    with server.serve_in_thread() as url:
+        yield server, url
@@ -1,4 +1,57 @@
-from .structs import BasicAuth, ProjectConfig, TokenConfig, FeedPayload, Event, WebsocketPayload
-from .data_validation import validate_instructions, validate_items
+from typing import TYPE_CHECKING
+import importlib
+
+from .structs import BasicAuth, ProjectConfig, TokenConfig, FeedPayload, Event, WebsocketPayload, CardView
+from .data_validation import validate_instructions, validate_items, validate_policies, Schema
 from .exceptions import GeniusValidationError
-from .manager import GWManager
+from .codec import JSONCodec, OrjsonCodec, UjsonCodec, get_codec
+
+# The managers and everything they use are imported on first access (PEP 562), so workers that only need the structs
+# and validation above never pay for `requests`, `websockets` or `asyncio` at startup, see `test_import_time.py`
+_LAZY_MODULES = {
+    "manager": ("GWManager", "WebSocketManager", "WebSocketPool"),
+    "async_manager": ("AsyncGWManager",),
+    "transport": ("Transport", "AsyncTransport", "TransportStats"),
+    "bulk": ("BulkReport", "ChunkResult", "CallResult", "SyncReport"),
+    "cache": ("TTLCache", "CacheStats", "FeedCache", "FeedCacheStats"),
+    "events": ("EventBuffer", "EventBufferStats"),
+    "limiter": ("AdaptiveLimiter", "LimiterStats"),
+    "metrics": ("Metrics", "Sample", "Histogram"),
+    "capture": ("TrafficRecorder", "iter_capture"),
+    "fleet": ("GWFleet", "FleetReport"),
+}
+_LAZY = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+if TYPE_CHECKING:
+    from .manager import GWManager, WebSocketManager, WebSocketPool
+    from .async_manager import AsyncGWManager
+    from .transport import Transport, AsyncTransport, TransportStats
+    from .bulk import BulkReport, ChunkResult, CallResult, SyncReport
+    from .cache import TTLCache, CacheStats, FeedCache, FeedCacheStats
+    from .events import EventBuffer, EventBufferStats
+    from .limiter import AdaptiveLimiter, LimiterStats
+    from .metrics import Metrics, Sample, Histogram
+    from .capture import TrafficRecorder, iter_capture
+    from .fleet import GWFleet, FleetReport
+
+
+def __getattr__(name:str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value # later lookups skip this hook
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY})
+
+
+__all__ = [
+    "BasicAuth", "ProjectConfig", "TokenConfig", "FeedPayload", "Event", "WebsocketPayload", "CardView",
+    "validate_instructions", "validate_items", "validate_policies", "Schema", "GeniusValidationError",
+    "JSONCodec", "OrjsonCodec", "UjsonCodec", "get_codec",
+    *_LAZY,
+]
@@ -0,0 +1,420 @@
+from uuid import uuid4
+from typing import Any, Callable, Container, AsyncIterator, Union
+from collections import deque
+import asyncio
+import time
+
+from .structs import BasicAuth, TokenConfig, ProjectConfig, FeedPayload
+from .data_validation import validate_items, validate_policies
+from .utils import load_obj_or_path, iter_obj_or_path
+from .transport import AsyncTransport, import_aiohttp
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics
+from .bulk import BulkReport, ChunkResult, arun_chunks
+from .cache import TTLCache, FeedCache, MISSING, feed_key
+from .codec import JSONCodec, get_codec
+from .capture import TrafficRecorder
+from .manager import GWManager, WebSocketManager, WebSocketPool, _page_items
+
+
+class AsyncGWManager(GWManager):
+    def __init__(self,
+        basic_auth:BasicAuth = None,
+        project_config:ProjectConfig = None,
+        token_config:TokenConfig = None,
+        project_dir:str = "genius_project",
+        visitor:str = "DEFAULT",
+        transport:AsyncTransport = None,
+        pool_size:int = 100,
+        timeout:float = 30,
+        item_cache:TTLCache = None,
+        max_websockets:int = 128,
+        codec:Union[str, JSONCodec] = None,
+        feed_cache:FeedCache = None,
+        limiter:AdaptiveLimiter = None,
+        metrics:Metrics = None,
+        endpoint:str = None,
+        capture:Union[bool, str, TrafficRecorder] = None
+    ):
+        """asyncio twin of `GWManager`
+
+        Takes the same `TokenConfig`/`BasicAuth`/`ProjectConfig` structs, but every sub-manager method is a coroutine
+        running on a shared non-blocking `AsyncTransport`, so one event loop can keep hundreds of calls in flight next
+        to `self.websocket`. Use it as an async context manager (or `await manager.close()`) to release the pool
+
+        Catalog `items.sync`, the `*_many` helpers and `data.event_buffer` are only on the blocking `GWManager`, run them
+        from a worker thread (`asyncio.to_thread`) on a `GWManager` built from the same token. `websockets.event_buffer`
+        is meant for coroutines and works here as is
+        """
+        codec = get_codec(codec) if codec else None
+
+        super().__init__(
+            basic_auth=basic_auth,
+            project_config=project_config,
+            token_config=token_config,
+            project_dir=project_dir,
+            visitor=visitor,
+            transport=transport if transport else AsyncTransport(pool_size=pool_size, timeout=timeout, codec=codec, metrics=metrics),
+            item_cache=item_cache,
+            max_websockets=max_websockets,
+            codec=codec,
+            feed_cache=feed_cache,
+            limiter=limiter,
+            metrics=metrics,
+            endpoint=endpoint,
+            capture=capture
+        )
+
+    def _build_managers(self, visitor:str):
+        self.project = AsyncProjectManager(self)
+        self.items = AsyncItemManager(self)
+        self.policies = AsyncPolicyManager(self)
+        self.models = AsyncModelManager(self)
+        self.data = AsyncDataManager(self)
+        self.websocket = WebSocketManager(self, visitor=visitor)
+        self.websockets = WebSocketPool(self, max_size=self.max_websockets)
+
+    async def close(self):
+        """Close the pooled connections held by `self.transport` and finish the capture file"""
+        await self.transport.close()
+        if self.capture is not None:
+            self.capture.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class AsyncProjectManager:
+    def __init__(self,
+        manager: AsyncGWManager
+    ):
+        self.manager = manager
+
+    async def create(self):
+        assert self.manager.basic_auth and self.manager.project_config, "Root manager needs to have BasicAuth and ProjectConfig to create a new project"
+        auth = import_aiohttp().BasicAuth(login=self.manager.basic_auth.username, password=self.manager.basic_auth.password)
+        r = await self.manager.transport.post(f"{self.manager.endpoint}/hackathon/project/create", name="project.create", auth=auth, json=self.manager.project_config.dict())
+        r.raise_for_status()
+
+        response = self.manager.codec.loads(await r.read())
+        self.manager.token_config = TokenConfig(
+            project_name=self.manager.project_config.project_name,
+            token = response["access_token"]
+        )
+
+        self.manager.save_token_config()
+
+    async def update(self, update:dict):
+        assert self.manager.token_config, "No token config set in the GWManager"
+        r = await self.manager.transport.put(f"{self.manager.endpoint}/platform/project/{self.manager.token_config.project_name}", name="project.update", headers=self.manager.auth_header, json=update)
+        r.raise_for_status()
+
+        return self.manager.codec.loads(await r.read())
+
+
+class AsyncItemManager:
+    def __init__(
+        self,
+        manager: AsyncGWManager
+    ):
+        self.manager = manager
+
+    def _get_endpoint(self):
+        assert self.manager.token_config, "No token_config set in GWManager"
+        return f"{self.manager.endpoint}/platform/project/{self.manager.token_config.project_name}/items"
+
+    async def _create(self, items:list):
+        r = await self.manager.transport.post(
+            f"{self._get_endpoint()}/create",
+            name="items.create",
+            headers=self.manager.auth_header,
+            json=items
+        )
+        r.raise_for_status()
+
+        return self.manager.codec.loads(await r.read())
+
+    async def add(self, items_or_path:Union[str, list], chunk_size:int = None, concurrency:int = 4, retries:int = 2, on_result:Callable[[ChunkResult], Any] = None, skip:Container[int] = ()) -> Union[list, BulkReport]:
+        """Validate and upload items, pass `chunk_size` for a streamed concurrent chunked upload (see `ItemManager.add`)"""
+        if chunk_size:
+            items = iter_obj_or_path(items_or_path, codec=self.manager.codec)
+            return await arun_chunks(self._create, items, chunk_size=chunk_size, concurrency=concurrency, retries=retries, validate=validate_items, limiter=self.manager.limiter, on_result=on_result, skip=skip)
+
+        items = load_obj_or_path(items_or_path, codec=self.manager.codec)
+        validate_items(items)
+
+        return await self._create(items)
+
+    async def get(self, item_id:str):
+        cache = self.manager.item_cache
+        if cache is not None:
+            item = cache.get(item_id, MISSING)
+            if item is not MISSING:
+                return item
+
+        r = await self.manager.transport.get(
+            f"{self._get_endpoint()}/{item_id}",
+            name="items.get",
+            headers=self.manager.auth_header
+        )
+        r.raise_for_status()
+        item = self.manager.codec.loads(await r.read())
+
+        if cache is not None:
+            cache.set(item_id, item)
+
+        return item
+
+    async def list(self, params={"page": 1, "count": 10}):
+        r = await self.manager.transport.get(
+            f"{self._get_endpoint()}/list",
+            name="items.list",
+            headers=self.manager.auth_header,
+            params=params
+        )
+        r.raise_for_status()
+
+        return self.manager.codec.loads(await r.read())
+
+    async def iter_all(self, page_size:int = 100, prefetch:int = 2, start_page:int = 1) -> AsyncIterator[dict]:
+        """Async generator yielding every item in the project with `prefetch` pages fetched ahead (see `ItemManager.iter_all`)"""
+        assert page_size > 0 and prefetch >= 0, "`page_size` must be positive and `prefetch` can not be negative"
+
+        async def fetch(page):
+            return _page_items(await self.manager.limiter.acall(self.list, params={"page": page, "count": page_size}, idempotent=True))
+
+        pages = deque(asyncio.ensure_future(fetch(page)) for page in range(start_page, start_page + prefetch + 1))
+        next_page = start_page + prefetch + 1
+
+        try:
+            while pages:
+                items = await pages.popleft()
+                for item in items:
+                    yield item
+
+                if len(items) < page_size:
+                    break
+
+                pages.append(asyncio.ensure_future(fetch(next_page)))
+                next_page += 1
+        finally:
+            for task in pages:
+                task.cancel()
+
+    async def update(self, item_id:str, update:dict):
+        validate_items([update])
+
+        r = await self.manager.transport.put(
+            f"{self._get_endpoint()}/{item_id}/update",
+            name="items.update",
+            headers=self.manager.auth_header,
+            json=update
+        )
+        self._invalidate(item_id)
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def delete(self, item_id:str):
+        r = await self.manager.transport.delete(
+            f"{self._get_endpoint()}/{item_id}/delete",
+            name="items.delete",
+            headers=self.manager.auth_header
+        )
+        self._invalidate(item_id)
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    def _invalidate(self, item_id:str):
+        if self.manager.item_cache is not None:
+            self.manager.item_cache.invalidate(item_id)
+
+
+class AsyncPolicyManager:
+    def __init__(
+        self,
+        manager: AsyncGWManager
+    ):
+        self.manager = manager
+
+    def _get_endpoint(self):
+        assert self.manager.token_config, "No token_config in GWManager"
+        return f"{self.manager.endpoint}/platform/{self.manager.token_config.project_name}/models/policies"
+
+    async def _create(self, policies:list):
+        r = await self.manager.transport.post(
+            f"{self._get_endpoint()}",
+            name="policies.create",
+            headers=self.manager.auth_header,
+            json=policies
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def add(self, policies_or_path:Union[str, list], chunk_size:int = None, concurrency:int = 4, retries:int = 2, on_result:Callable[[ChunkResult], Any] = None, skip:Container[int] = ()) -> Union[list, BulkReport]:
+        """Validate and upload policies, pass `chunk_size` to stream them up in concurrent chunks (see `ItemManager.add`)"""
+        if chunk_size:
+            policies = iter_obj_or_path(policies_or_path, codec=self.manager.codec)
+            return await arun_chunks(self._create, policies, chunk_size=chunk_size, concurrency=concurrency, retries=retries, validate=validate_policies, limiter=self.manager.limiter, on_result=on_result, skip=skip)
+
+        policies = load_obj_or_path(policies_or_path, codec=self.manager.codec)
+        validate_policies(policies)
+
+        return await self._create(policies)
+
+    async def list(self):
+        r = await self.manager.transport.get(
+            f"{self._get_endpoint()}",
+            name="policies.list",
+            headers=self.manager.auth_header
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def get(self, policy_id:str):
+        r = await self.manager.transport.get(
+            f"{self._get_endpoint()}/{policy_id}",
+            name="policies.get",
+            headers=self.manager.auth_header
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def update(self, policy_id:str, update:dict):
+        validate_policies([update])
+        r = await self.manager.transport.put(
+            f"{self._get_endpoint()}/{policy_id}",
+            name="policies.update",
+            headers=self.manager.auth_header,
+            json=update
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def delete(self, policy_id:str):
+        r = await self.manager.transport.delete(
+            f"{self._get_endpoint()}/{policy_id}",
+            name="policies.delete",
+            headers=self.manager.auth_header
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def enable(self, policy_id:str, enabled:bool):
+        r = await self.manager.transport.put(
+            f"{self._get_endpoint()}/{policy_id}/enable",
+            name="policies.enable",
+            headers=self.manager.auth_header,
+            json={"enabled": enabled}
+        )
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+
+class AsyncModelManager:
+    def __init__(
+        self,
+        manager: AsyncGWManager
+    ):
+        self.manager = manager
+
+    def _get_endpoint(self):
+        assert self.manager.token_config, "No token_config set in GWManager"
+        return f"{self.manager.endpoint}/platform/{self.manager.token_config.project_name}/models"
+
+    async def get(self, model_id:str):
+        r = await self.manager.transport.get(
+            f"{self._get_endpoint()}/{model_id}",
+            name="models.get",
+            headers=self.manager.auth_header
+        )
+
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+    async def train(self, model_id:str=None):
+        model = {"model_id": model_id} if model_id else {}
+        r = await self.manager.transport.post(
+            f"{self._get_endpoint()}/train",
+            name="models.train",
+            headers=self.manager.auth_header,
+            json=model
+        )
+        r.raise_for_status()
+
+        return self.manager.codec.loads(await r.read())
+
+    async def activate(self, model_id:str):
+        r = await self.manager.transport.post(
+            f"{self._get_endpoint()}/{model_id}/activate",
+            name="models.activate",
+            headers=self.manager.auth_header
+        )
+        r.raise_for_status()
+
+        return self.manager.codec.loads(await r.read())
+
+    async def list(self):
+        assert self.manager.token_config, "No token_config in GWManager"
+        endpoint = f"{self.manager.endpoint}/hackathon/{self.manager.token_config.project_name}/model/list"
+
+        r = await self.manager.transport.get(
+            endpoint,
+            name="models.list",
+            headers=self.manager.auth_header
+        )
+
+        r.raise_for_status()
+        return self.manager.codec.loads(await r.read())
+
+
+class AsyncDataManager:
+    def __init__(
+        self,
+        manager: AsyncGWManager
+    ):
+        self.manager = manager
+
+    def _get_endpoint(self):
+        assert self.manager.token_config, "No token_config in GWManager"
+        return f"{self.manager.endpoint}/hackathon/{self.manager.token_config.project_name}"
+
+    async def feed(self, payload:FeedPayload, session_id=None):
+        """Request a feed page, served from `manager.feed_cache` (when set) if the payload carries no events"""
+        if self.manager.feed_cache is None:
+            return await self._feed(payload, session_id)
+
+        key = feed_key(payload, scope=self._get_endpoint())
+        return await self.manager.feed_cache.acall(key, lambda: self._feed(payload, session_id))
+
+    async def _feed(self, payload:FeedPayload, session_id=None):
+        return await self._post("feed", payload, session_id)
+
+    async def batch(self, payload:FeedPayload, session_id=None):
+        return await self._post("batch", payload, session_id)
+
+    async def _post(self, kind:str, payload:FeedPayload, session_id=None):
+        session_id = uuid4() if not session_id else session_id
+        body = payload.encode()
+        capture = self.manager.capture
+        started = time.perf_counter()
+
+        try:
+            r = await self.manager.transport.post(
+                f"{self._get_endpoint()}/{kind}/{session_id}",
+                name=f"data.{kind}",
+                headers={**self.manager.auth_header, "Content-Type": "application/json"},
+                data=body
+            )
+            r.raise_for_status()
+            content = await r.read()
+        except Exception as e:
+            if capture is not None:
+                capture.record(kind, session_id, body, started, error=e)
+            raise
+
+        if capture is not None:
+            capture.record(kind, session_id, body, started, response=content)
+        return self.manager.codec.loads(content)
@@ -0,0 +1,309 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Any, Awaitable, Callable, Container, Iterable, Iterator
+import asyncio
+import time
+
+from .limiter import AdaptiveLimiter
+
+
+@dataclass
+class ChunkResult:
+    """Outcome of uploading a single chunk
+
+    - `index` position of the chunk in the upload
+    - `start` offset of the chunk's first item in the original list
+    - `count` number of items in the chunk
+    - `attempts` how many times the chunk was sent
+    - `response` parsed API response of the last successful attempt
+    - `error` the last error message if every attempt failed
+    """
+    index: int
+    start: int
+    count: int
+    attempts: int = 0
+    elapsed: float = 0.0
+    response: Any = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def dict(self):
+        return {"index": self.index, "start": self.start, "count": self.count, "attempts": self.attempts, "elapsed": self.elapsed, "ok": self.ok, "error": self.error}
+
+
+@dataclass
+class BulkReport:
+    """Per-chunk report for a bulk upload along with its overall throughput"""
+    chunks: list[ChunkResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def items(self) -> int:
+        return sum(chunk.count for chunk in self.chunks)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(chunk.count for chunk in self.chunks if chunk.ok)
+
+    @property
+    def failed(self) -> list[ChunkResult]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def items_per_sec(self) -> float:
+        return self.succeeded / self.elapsed if self.elapsed else 0.0
+
+    def dict(self):
+        return {
+            "items": self.items,
+            "succeeded": self.succeeded,
+            "failed_chunks": len(self.failed),
+            "elapsed": self.elapsed,
+            "items_per_sec": self.items_per_sec,
+            "chunks": [chunk.dict() for chunk in self.chunks]
+        }
+
+
+@dataclass
+class CallResult:
+    """Outcome of a single call made by `run_calls`, `key` identifies the call (e.g. an item id)"""
+    key: Any
+    response: Any = None
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def dict(self):
+        return {"key": self.key, "ok": self.ok, "error": self.error}
+
+
+@dataclass
+class SyncReport:
+    """Summary of an incremental catalog sync
+
+    `created`, `updated` and `deleted` count the changes that went through, `unchanged` the items that were skipped,
+    `requests` the number of API calls that were made and `failures` holds one entry per change that did not go through
+    """
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    requests: int = 0
+    elapsed: float = 0.0
+    failures: list[dict] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+    def dict(self):
+        return vars(self)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Lazily split `items` into lists of at most `size` entries"""
+    assert size > 0, "Chunk size must be a positive integer"
+    iterator = iter(items)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _send_with_retries(send: Callable[[list], Any], chunk: list, result: ChunkResult, retries: int, backoff: float) -> ChunkResult:
+    started = time.perf_counter()
+
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        try:
+            result.response = send(chunk)
+            result.error = None
+            break
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                time.sleep(backoff * 2 ** attempt)
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def _validate_chunk(validate: Callable[[list], Any] | None, chunk: list, result: ChunkResult) -> bool:
+    if validate is None:
+        return True
+
+    try:
+        validate(chunk)
+        return True
+    except Exception as e: # invalid chunks are reported, never sent or retried
+        result.error = f"{type(e).__name__}: {e}"
+        return False
+
+
+def run_chunks(send: Callable[[list], Any], items: Iterable, chunk_size: int, concurrency: int = 4, retries: int = 2, backoff: float = 0.5, validate: Callable[[list], Any] = None, limiter: AdaptiveLimiter = None, on_result: Callable[[ChunkResult], Any] = None, skip: Container[int] = ()) -> BulkReport:
+    """Upload `items` in chunks of `chunk_size` with up to `concurrency` chunks in flight
+
+    `send` is called with each chunk and should raise on failure. A failing chunk is retried on its own
+    up to `retries` times with exponential `backoff` (seconds) and never stops the rest of the upload.
+    Chunks are only pulled from `items` as slots free up so the whole input is never held at once,
+    which lets `items` be a lazy stream. If `validate` is passed each chunk is checked just before
+    being sent and a chunk that fails validation is reported without being uploaded.
+
+    With a `limiter` (see `AdaptiveLimiter`) `concurrency` becomes a ceiling, the limiter decides how many chunks
+    are actually sent at once and retries chunks the server throttled before they count against `retries`
+
+    `on_result` is called with every `ChunkResult` as it is collected, e.g. to report progress or checkpoint. Chunks
+    whose index is in `skip` (sent by an earlier run over the same input) are neither sent nor reported
+    """
+    assert concurrency > 0, "Concurrency must be a positive integer"
+    if limiter is not None:
+        send = partial(limiter.call, send)
+    report = BulkReport()
+    started = time.perf_counter()
+
+    def collect(results: Iterable[ChunkResult]):
+        for result in results:
+            report.chunks.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+        start = 0
+
+        for index, chunk in enumerate(chunked(items, chunk_size)):
+            result = ChunkResult(index=index, start=start, count=len(chunk))
+            start += len(chunk)
+
+            if index in skip:
+                continue
+
+            if not _validate_chunk(validate, chunk, result):
+                collect([result])
+                continue
+
+            if len(in_flight) >= concurrency:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(future.result() for future in done)
+
+            in_flight.add(pool.submit(_send_with_retries, send, chunk, result, retries, backoff))
+
+        collect(future.result() for future in wait(in_flight).done)
+
+    report.chunks.sort(key=lambda chunk: chunk.index)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+async def _asend_with_retries(send: Callable[[list], Awaitable], chunk: list, result: ChunkResult, retries: int, backoff: float) -> ChunkResult:
+    started = time.perf_counter()
+
+    for attempt in range(retries + 1):
+        result.attempts = attempt + 1
+        try:
+            result.response = await send(chunk)
+            result.error = None
+            break
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                await asyncio.sleep(backoff * 2 ** attempt)
+
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+async def arun_chunks(send: Callable[[list], Awaitable], items: Iterable, chunk_size: int, concurrency: int = 4, retries: int = 2, backoff: float = 0.5, validate: Callable[[list], Any] = None, limiter: AdaptiveLimiter = None, on_result: Callable[[ChunkResult], Any] = None, skip: Container[int] = ()) -> BulkReport:
+    """asyncio version of `run_chunks`, `send` must be a coroutine function"""
+    assert concurrency > 0, "Concurrency must be a positive integer"
+    if limiter is not None:
+        send = partial(limiter.acall, send)
+    report = BulkReport()
+    started = time.perf_counter()
+
+    def collect(results: Iterable[ChunkResult]):
+        for result in results:
+            report.chunks.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    in_flight = set()
+    start = 0
+
+    for index, chunk in enumerate(chunked(items, chunk_size)):
+        result = ChunkResult(index=index, start=start, count=len(chunk))
+        start += len(chunk)
+
+        if index in skip:
+            continue
+
+        if not _validate_chunk(validate, chunk, result):
+            collect([result])
+            continue
+
+        if len(in_flight) >= concurrency:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            collect(task.result() for task in done)
+
+        in_flight.add(asyncio.ensure_future(_asend_with_retries(send, chunk, result, retries, backoff)))
+
+    if in_flight:
+        done, _ = await asyncio.wait(in_flight)
+        collect(task.result() for task in done)
+
+    report.chunks.sort(key=lambda chunk: chunk.index)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _call(call: Callable[[Any], Any], arg: Any, result: CallResult) -> CallResult:
+    try:
+        result.response = call(arg)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+
+def run_calls(call: Callable[[Any], Any], args: Iterable, concurrency: int = 8, key: Callable[[Any], Any] = None, limiter: AdaptiveLimiter = None, idempotent: bool = False, on_result: Callable[[CallResult], Any] = None) -> list[CallResult]:
+    """Call `call(arg)` for every entry of `args` with up to `concurrency` calls in flight
+
+    Failures never stop the run, each call gets a `CallResult` (in input order) keyed by `key(arg)`, or by `arg` itself.
+    With a `limiter` the calls run within its adaptive limit, `idempotent` calls are also retried on 5xx and connection errors.
+    `on_result` is called with every `CallResult` as it completes
+    """
+    assert concurrency > 0, "Concurrency must be a positive integer"
+    if limiter is not None:
+        call = partial(limiter.call, call, idempotent=idempotent)
+    key = key if key else (lambda arg: arg)
+    results = []
+
+    def collect(done):
+        if on_result is not None:
+            for future in done:
+                on_result(future.result())
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        in_flight = set()
+
+        for arg in args:
+            if len(in_flight) >= concurrency:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(done)
+
+            result = CallResult(key=key(arg))
+            results.append(result)
+            in_flight.add(pool.submit(_call, call, arg, result))
+
+        collect(wait(in_flight).done)
+
+    return results
@@ -0,0 +1,264 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable, Union
+import asyncio
+import hashlib
+import json
+import threading
+import time
+
+MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters for a `TTLCache`
+
+    - `hits` / `misses` lookups that were / were not served from the cache
+    - `evictions` entries dropped to stay within `maxsize`
+    - `expirations` entries dropped because they outlived the `ttl`
+    - `invalidations` entries removed explicitly, e.g. after an update or delete
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def dict(self):
+        return {**vars(self), "hit_ratio": self.hit_ratio}
+
+
+class TTLCache:
+    def __init__(self, maxsize:int = 1024, ttl:float = 300, clock:Callable[[], float] = time.monotonic):
+        """Thread-safe, size-bounded LRU cache whose entries expire `ttl` seconds after being stored
+
+        Values are returned as stored (no copies are made), so treat cached objects as read-only
+        """
+        assert maxsize > 0, "Cache `maxsize` must be a positive integer"
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._stats = CacheStats()
+
+    def get(self, key:Hashable, default:Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self._stats.misses += 1
+                return default
+
+            expires, value = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return value
+
+    def set(self, key:Hashable, value:Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._stats.evictions += 1
+
+    def invalidate(self, key:Hashable) -> bool:
+        """Drop `key` from the cache, returns whether it was cached"""
+        with self._lock:
+            if self._entries.pop(key, None) is None:
+                return False
+
+            self._stats.invalidations += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**{**vars(self._stats), "size": len(self._entries)})
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@dataclass
+class FeedCacheStats:
+    """Counters for a `FeedCache`
+
+    - `hits` requests answered from the cache
+    - `coalesced` requests that shared an identical request already in flight instead of making their own
+    - `misses` requests that had to go upstream
+    - `uncacheable` requests that bypassed the cache, e.g. because they carried events
+    - `saved_latency` total upstream time (seconds) the cache hits did not have to wait for
+    """
+    hits: int = 0
+    coalesced: int = 0
+    misses: int = 0
+    uncacheable: int = 0
+    saved_latency: float = 0.0
+    size: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def saved_calls(self) -> int:
+        return self.hits + self.coalesced
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.coalesced + self.misses
+        return self.saved_calls / lookups if lookups else 0.0
+
+    def dict(self):
+        return {**vars(self), "saved_calls": self.saved_calls, "hit_ratio": self.hit_ratio}
+
+
+def feed_key(payload:Union[dict, Any], scope:str = "") -> str | None:
+    """Normalized cache key for a feed request, `None` when the request should not be cached
+
+    Only requests without events are cacheable, since events make a feed personal. The request `id` is ignored
+    and the `search_prompt` whitespace is collapsed so equivalent requests from different visitors share a key
+    """
+    events = payload.get("events") if isinstance(payload, dict) else payload.events
+    if events:
+        return None
+
+    normalized = {key: value for key, value in (payload if isinstance(payload, dict) else payload.dict()).items() if key != "id"}
+    if isinstance(normalized.get("search_prompt"), str):
+        normalized["search_prompt"] = " ".join(normalized["search_prompt"].split())
+
+    digest = hashlib.blake2b(json.dumps(normalized, sort_keys=True, separators=(",", ":")).encode(), digest_size=16).hexdigest()
+    return f"{scope}:{digest}"
+
+
+class FeedCache:
+    def __init__(self, maxsize:int = 1024, ttl:float = 5, clock:Callable[[], float] = time.monotonic):
+        """Short lived cache for feed responses with single-flight deduplication
+
+        Responses are kept in a `TTLCache` for `ttl` seconds. Identical requests made while one is already in flight
+        wait for it and share its response instead of going upstream again, from threads (`call`) and coroutines
+        (`acall`) alike. Failures are never cached, every caller waiting on a failed request sees its error.
+        Responses are shared between callers, treat them as read-only
+        """
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._stats = FeedCacheStats()
+
+    def _lookup(self, key:str) -> Any:
+        entry = self._cache.get(key, MISSING)
+        if entry is MISSING:
+            return MISSING
+
+        response, latency = entry
+        with self._lock:
+            self._stats.hits += 1
+            self._stats.saved_latency += latency
+        return response
+
+    def call(self, key:str | None, fetch:Callable[[], Any]) -> Any:
+        """Return the cached response for `key`, or the response of `fetch()`. Pass `key=None` to bypass the cache"""
+        if key is None:
+            with self._lock:
+                self._stats.uncacheable += 1
+            return fetch()
+
+        response = self._lookup(key)
+        if response is not MISSING:
+            return response
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        started = time.perf_counter()
+        try:
+            response = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self._cache.set(key, (response, time.perf_counter() - started))
+            future.set_result(response)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+        return response
+
+    async def _afetch(self, key:str, fetch:Callable[[], Awaitable]) -> Any:
+        started = time.perf_counter()
+        try:
+            response = await fetch()
+        finally:
+            self._tasks.pop(key, None)
+
+        self._cache.set(key, (response, time.perf_counter() - started))
+        return response
+
+    async def acall(self, key:str | None, fetch:Callable[[], Awaitable]) -> Any:
+        """asyncio version of `call`, `fetch` must be a coroutine function
+
+        The upstream request runs as its own task, so a caller that is cancelled or times out never cancels it for the others
+        """
+        if key is None:
+            with self._lock:
+                self._stats.uncacheable += 1
+            return await fetch()
+
+        response = self._lookup(key)
+        if response is not MISSING:
+            return response
+
+        task = self._tasks.get(key)
+        leader = task is None
+        if leader:
+            task = self._tasks[key] = asyncio.ensure_future(self._afetch(key, fetch))
+            task.add_done_callback(lambda task: task.cancelled() or task.exception()) # no "exception never retrieved" warnings
+
+        with self._lock:
+            if leader:
+                self._stats.misses += 1
+            else:
+                self._stats.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> FeedCacheStats:
+        cache = self._cache.stats()
+        with self._lock:
+            return FeedCacheStats(**{**vars(self._stats), "size": cache.size, "evictions": cache.evictions, "expirations": cache.expirations})
+
+    def __len__(self):
+        return len(self._cache)
@@ -0,0 +1,109 @@
+"""Record the feed traffic a manager sends, for `remoras.replay` to load test against
+
+With `GWManager(capture=True)` every websocket request and `data.feed`/`data.batch` call is written with its timing to a
+gzipped JSONL file in `project_dir/captures`
+"""
+from datetime import datetime
+from typing import Iterator, Union
+from uuid import uuid4
+import gzip
+import os
+import threading
+import time
+
+from .codec import JSONCodec, DEFAULT_CODEC, get_codec
+
+
+def error_label(error:Exception) -> str:
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None) or getattr(error, "status", None)
+    return str(status) if status else type(error).__name__
+
+
+class TrafficRecorder:
+    def __init__(self, path:str, responses:bool = False, codec:Union[str, JSONCodec] = None):
+        """Write every request a manager makes to `path` as gzipped JSON lines, one record per request
+
+        A record holds `t` (seconds since the recorder was created), `kind` (`"websocket"`, `"feed"` or `"batch"`),
+        `visitor`, `session`, the `request` payload, its `latency`, the `sent`/`received` byte counts, the number of
+        `cards` returned and the `error` when it failed. With `responses` the decoded response is kept as well, which
+        makes the file much larger. The file is created on the first record and complete once `close()` is called, records
+        made after that are appended to it
+        """
+        self.path = path
+        self.responses = responses
+        self.codec = get_codec(codec) if codec else DEFAULT_CODEC
+        self.records = 0
+
+        self._origin = time.perf_counter()
+        self._file = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def in_dir(self, project_dir:str, **kwargs):
+        """A recorder writing to a new timestamped file in `project_dir/captures`"""
+        return self(os.path.join(project_dir, "captures", f"capture-{datetime.now():%Y%m%d-%H%M%S}-{uuid4().hex[:6]}.jsonl.gz"), **kwargs)
+
+    def record(self, kind:str, session:str, request:Union[dict, str, bytes], started:float, visitor:str = None, response:bytes = None, decoded=None, error:Exception = None):
+        """Record one request that was sent at `started` (`time.perf_counter()`), a raw `request` is decoded first"""
+        latency = time.perf_counter() - started
+        if isinstance(request, (str, bytes)):
+            sent, request = len(request), self.codec.loads(request)
+        else:
+            sent = None
+
+        if response is not None and decoded is None:
+            try:
+                decoded = self.codec.loads(response)
+            except ValueError:
+                decoded = None
+
+        cards = decoded.get("cards") if isinstance(decoded, dict) else None
+        entry = {
+            "t": round(started - self._origin, 6), "kind": kind, "visitor": visitor, "session": str(session), "latency": round(latency, 6),
+            "request": request, "sent": sent, "received": len(response) if response is not None else 0,
+            "cards": len(cards) if isinstance(cards, list) else None, "error": error_label(error) if error is not None else None
+        }
+        if self.responses:
+            entry["response"] = decoded
+
+        line = self.codec.dumps(entry) + b"\n"
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                # reopened after `close()` the records so far are kept, gzip members simply concatenate
+                self._file = gzip.open(self.path, "ab" if self.records else "wb", compresslevel=6)
+            self._file.write(line)
+            self.records += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def make_recorder(capture:Union[bool, str, TrafficRecorder], project_dir:str, codec:JSONCodec) -> TrafficRecorder:
+    """Build the recorder for `GWManager(capture=...)`: `True` for a new file in `project_dir`, a path, or a recorder"""
+    if not capture:
+        return None
+    if isinstance(capture, TrafficRecorder):
+        return capture
+    if isinstance(capture, str):
+        return TrafficRecorder(capture, codec=codec)
+    return TrafficRecorder.in_dir(project_dir, codec=codec)
+
+
+def iter_capture(path:str, codec:Union[str, JSONCodec] = None) -> Iterator[dict]:
+    """Stream the records of a capture file"""
+    codec = get_codec(codec) if codec else DEFAULT_CODEC
+    with gzip.open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield codec.loads(line)
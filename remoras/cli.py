@@ -0,0 +1,377 @@
+"""`remoras` command-line tool for bulk catalog and policy operations
+
+    remoras items push catalog.jsonl --chunk-size 200 --concurrency 16
+    remoras items sync catalog.jsonl
+    remoras items export items.jsonl
+    remoras items delete stale_ids.txt
+    remoras policies push policies.json
+
+Input files are JSON arrays or JSON Lines and are streamed, so catalogs larger than memory work. Progress and throughput
+are shown on stderr while a command runs. When anything fails a JSON failure report is written (see `--report`) and the
+exit status is 1. `push`, `delete` and `export` checkpoint their progress, rerun the same command with `--resume` to
+pick up where an interrupted or partly failed run stopped. `sync` needs no checkpoint, its manifest already makes
+every run incremental
+"""
+from datetime import datetime
+from typing import Iterator
+import argparse
+import hashlib
+import os
+import sys
+import time
+
+from .structs import TokenConfig
+from .utils import iter_obj_or_path
+from .data_validation import validate_policies
+from .exceptions import GeniusValidationError
+
+EXIT_OK, EXIT_FAILED, EXIT_INTERRUPTED = 0, 1, 130
+
+
+class Progress:
+    def __init__(self, label:str, unit:str, enabled:bool = True, interval:float = 0.2, stream = None):
+        """Live `ok`/`failed` counters and throughput for a running command, redrawn on one line at most every `interval` seconds"""
+        self.label = label
+        self.unit = unit
+        self.enabled = enabled
+        self.interval = interval
+        self.stream = stream if stream else sys.stderr
+        self.ok = 0
+        self.failed = 0
+
+        self._started = time.perf_counter()
+        self._drawn = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def line(self) -> str:
+        rate = self.ok / self.elapsed if self.elapsed else 0.0
+        return f"{self.label}: {self.ok:,} ok, {self.failed:,} failed in {self.elapsed:.1f}s ({rate:,.0f} {self.unit}/s)"
+
+    def update(self, ok:int = 0, failed:int = 0):
+        self.ok += ok
+        self.failed += failed
+
+        now = time.perf_counter()
+        if self.enabled and now - self._drawn >= self.interval:
+            self._drawn = now
+            self.stream.write("\r" + self.line())
+            self.stream.flush()
+
+    def finish(self):
+        if self.enabled:
+            self.stream.write("\r" + self.line() + "\n")
+            self.stream.flush()
+
+
+class Checkpoint:
+    def __init__(self, path:str, identity:dict, resume:bool, codec, interval:float = 1.0):
+        """Keys already done by a resumable command, saved to `path` at most every `interval` seconds
+
+        `identity` describes the run (command, input file, chunk size...), resuming from a checkpoint written for
+        a different run is refused rather than silently skipping the wrong work
+        """
+        self.path = path
+        self.identity = identity
+        self.codec = codec
+        self.interval = interval
+        self.done: set = set()
+        self._saved = time.perf_counter()
+
+        if resume and os.path.exists(path):
+            with open(path, "rb") as f:
+                state = codec.loads(f.read())
+            if state["identity"] != identity:
+                raise SystemExit(f"{path} was written for a different run ({state['identity']}), remove it or drop --resume")
+            self.done = set(state["done"])
+
+    def add(self, key):
+        self.done.add(key)
+        if time.perf_counter() - self._saved >= self.interval:
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, "wb") as f:
+            f.write(self.codec.dumps({"identity": self.identity, "done": sorted(self.done, key=str)}))
+        os.replace(temp, self.path) # never leave a half written checkpoint behind
+        self._saved = time.perf_counter()
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def _identity(args, command:str, **extra) -> dict:
+    path = os.path.abspath(args.file)
+    return {"command": command, "input": path, "size": os.path.getsize(path), **extra}
+
+
+def _state_path(args, command:str) -> str:
+    if args.state:
+        return args.state
+    digest = hashlib.blake2b(os.path.abspath(args.file).encode(), digest_size=4).hexdigest()
+    return os.path.join(args.project_dir, "state", f"{command.replace(' ', '-')}-{os.path.basename(args.file)}-{digest}.json")
+
+
+def _write_report(args, manager, command:str, progress:Progress, failures:list[dict]) -> int:
+    """Write the failure report when anything failed (or when `--report` asks for one), returns the exit status"""
+    if failures or args.report:
+        path = args.report or os.path.join(args.project_dir, "reports", f"{command.replace(' ', '-')}-{datetime.now():%Y%m%d-%H%M%S}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        report = {
+            "command": command, "input": getattr(args, "file", None), "succeeded": progress.ok, "failed": progress.failed,
+            "elapsed": progress.elapsed, "failures": failures
+        }
+        with open(path, "wb") as f:
+            f.write(manager.codec.dumps(report))
+        print(f"report written to {path}", file=sys.stderr)
+
+    return EXIT_FAILED if failures else EXIT_OK
+
+
+def _read_ids(path:str, codec) -> Iterator[str]:
+    """Ids from a text file (one per line), or from a JSON/JSONL file of ids or of objects with an `id`
+
+    An entry without a usable id is passed on as is (or as `None` for an object without `id`), `delete_many` then
+    reports it as a failure instead of the whole command stopping
+    """
+    if path.endswith(".txt"):
+        with open(path) as f:
+            yield from (line.strip() for line in f if line.strip())
+        return
+
+    for value in iter_obj_or_path(path, codec=codec):
+        yield value.get("id") if isinstance(value, dict) else value
+
+
+def push(args, manager) -> int:
+    command = f"{args.resource} push"
+    resource = getattr(manager, args.resource)
+    checkpoint = Checkpoint(_state_path(args, command), _identity(args, command, chunk_size=args.chunk_size), args.resume, manager.codec)
+    progress = Progress(command, args.resource, enabled=not args.quiet)
+    failures = []
+
+    def on_result(chunk):
+        if chunk.ok:
+            checkpoint.add(chunk.index)
+            progress.update(ok=chunk.count)
+        else:
+            failures.append(chunk.dict())
+            progress.update(failed=chunk.count)
+
+    try:
+        resource.add(args.file, chunk_size=args.chunk_size, concurrency=args.concurrency, retries=args.retries, on_result=on_result, skip=frozenset(checkpoint.done))
+    finally:
+        checkpoint.save()
+        progress.finish()
+
+    if not failures:
+        checkpoint.clear()
+    return _write_report(args, manager, command, progress, failures)
+
+
+def delete(args, manager) -> int:
+    command = f"{args.resource} delete"
+    resource = getattr(manager, args.resource)
+    checkpoint = Checkpoint(_state_path(args, command), _identity(args, command), args.resume, manager.codec)
+    progress = Progress(command, args.resource, enabled=not args.quiet)
+    failures = []
+
+    def on_result(result):
+        if result.ok:
+            checkpoint.add(result.key)
+            progress.update(ok=1)
+        else:
+            failures.append(result.dict())
+            progress.update(failed=1)
+
+    ids = (item_id for item_id in _read_ids(args.file, manager.codec) if item_id not in checkpoint.done)
+    try:
+        resource.delete_many(ids, concurrency=args.concurrency, on_result=on_result)
+    finally:
+        checkpoint.save()
+        progress.finish()
+
+    if not failures:
+        checkpoint.clear()
+    return _write_report(args, manager, command, progress, failures)
+
+
+def _count_lines(path:str) -> tuple[int, list[int]]:
+    offsets = [0]
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break # a partly written last line is dropped
+            offsets.append(offsets[-1] + len(line))
+    return len(offsets) - 1, offsets
+
+
+def export(args, manager) -> int:
+    command = f"{args.resource} export"
+    progress = Progress(command, args.resource, enabled=not args.quiet and args.output != "-")
+    dumps = manager.codec.dumps
+
+    start_page = 1
+    if args.resource == "items" and args.resume and args.output != "-" and os.path.exists(args.output):
+        # keep only whole pages so the export continues from a page boundary
+        lines, offsets = _count_lines(args.output)
+        pages = lines // args.page_size
+        with open(args.output, "r+b") as f:
+            f.truncate(offsets[pages * args.page_size])
+        start_page = pages + 1
+        progress.ok = pages * args.page_size
+
+    if args.resource == "items":
+        records = manager.items.iter_all(page_size=args.page_size, prefetch=args.prefetch, start_page=start_page)
+    else:
+        records = iter(manager.policies.list())
+
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "ab" if start_page > 1 else "wb")
+    try:
+        for record in records:
+            out.write(dumps(record) + b"\n")
+            progress.update(ok=1)
+    finally:
+        out.flush()
+        if out is not sys.stdout.buffer:
+            out.close()
+        progress.finish()
+
+    return EXIT_OK
+
+
+def sync(args, manager) -> int:
+    command = f"{args.resource} sync"
+    progress = Progress(command, args.resource, enabled=not args.quiet)
+
+    try:
+        if args.resource == "items":
+            report = manager.items.sync(args.file, chunk_size=args.chunk_size, concurrency=args.concurrency, retries=args.retries, dry_run=args.dry_run)
+            failures = report.failures
+            progress.update(ok=report.created + report.updated + report.deleted)
+            summary = f"{report.created:,} created, {report.updated:,} updated, {report.deleted:,} deleted, {report.unchanged:,} unchanged"
+        else:
+            failures, summary = _sync_policies(args, manager, progress)
+    except GeniusValidationError as e:
+        # one problem per invalid record, so the report points at what to fix
+        failures = [{"index": index, "error": message} for index, message in e.errors] or [{"error": str(e)}]
+        summary = f"nothing synced, {len(failures):,} problem(s) found in {args.file}"
+    else:
+        summary = ("dry run, would have: " if args.dry_run else "") + summary
+
+    progress.failed = len(failures)
+    progress.finish()
+    print(summary, file=sys.stderr)
+    return _write_report(args, manager, command, progress, failures)
+
+
+def _sync_policies(args, manager, progress:Progress) -> tuple[list[dict], str]:
+    """Make the project's policies match the file, policies are matched on their `policy` text"""
+    wanted = list(iter_obj_or_path(args.file, codec=manager.codec))
+    validate_policies(wanted)
+
+    existing = {policy["policy"]: policy for policy in manager.policies.list()}
+    creates = [policy for policy in wanted if policy["policy"] not in existing]
+    texts = {policy["policy"] for policy in wanted}
+    deletes = [] if args.keep_extra else [policy["id"] for text, policy in existing.items() if text not in texts]
+    summary = f"{len(creates):,} created, {len(deletes):,} deleted, {len(wanted) - len(creates):,} unchanged"
+
+    if args.dry_run:
+        return [], summary
+
+    failures = []
+    if creates:
+        report = manager.policies.add(creates, chunk_size=args.chunk_size, concurrency=args.concurrency, retries=args.retries)
+        failures += [chunk.dict() for chunk in report.failed]
+        progress.update(ok=report.succeeded)
+
+    for result in manager.policies.delete_many(deletes, concurrency=args.concurrency):
+        if result.ok:
+            progress.update(ok=1)
+        else:
+            failures.append(result.dict())
+
+    return failures, summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="remoras", description=__doc__.split("\n")[0], formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--project-dir", default="genius_project", help="where the token, manifests, checkpoints and reports live (default: %(default)s)")
+    parser.add_argument("--token", help="token json written by `save_token_config` (default: <project-dir>/token.json)")
+    parser.add_argument("--endpoint", help="API base URL (default: $REMORAS_ENDPOINT or the productgenius API)")
+    parser.add_argument("--codec", default="auto", help="json codec: json, orjson, ujson or auto (default: %(default)s)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no live progress")
+
+    resources = parser.add_subparsers(dest="resource", required=True)
+    for resource in ("items", "policies"):
+        commands = resources.add_parser(resource).add_subparsers(dest="command", required=True)
+
+        def command(name:str, help:str, concurrency:int = 8):
+            sub = commands.add_parser(name, help=help)
+            sub.add_argument("--concurrency", type=int, default=concurrency, help="most calls in flight (default: %(default)s)")
+            sub.add_argument("--report", help="write the JSON failure report here (default: <project-dir>/reports/...)")
+            return sub
+
+        sub = command("push", f"upload {resource} from a JSON/JSONL file")
+        sub.add_argument("file")
+        sub.add_argument("--chunk-size", type=int, default=100, help="records per request (default: %(default)s)")
+        sub.add_argument("--retries", type=int, default=2, help="retries per failed chunk (default: %(default)s)")
+        sub.add_argument("--resume", action="store_true", help="skip the chunks an earlier run already uploaded")
+        sub.add_argument("--state", help="checkpoint file (default: <project-dir>/state/...)")
+
+        sub = command("sync", f"make the project's {resource} match a JSON/JSONL file, only sending what changed")
+        sub.add_argument("file")
+        sub.add_argument("--chunk-size", type=int, default=500, help="creates per request (default: %(default)s)")
+        sub.add_argument("--retries", type=int, default=2, help="retries per failed chunk of creates (default: %(default)s)")
+        sub.add_argument("--dry-run", action="store_true", help="only count what would change")
+        if resource == "policies":
+            sub.add_argument("--keep-extra", action="store_true", help="do not delete policies missing from the file")
+
+        sub = command("delete", f"delete {resource} by id, from a .txt file (one id per line) or JSON/JSONL of ids or objects with an `id`")
+        sub.add_argument("file")
+        sub.add_argument("--resume", action="store_true", help="skip the ids an earlier run already deleted")
+        sub.add_argument("--state", help="checkpoint file (default: <project-dir>/state/...)")
+
+        sub = command("export", f"write every {resource} as JSON Lines")
+        sub.add_argument("output", nargs="?", default="-", help="output file (default: stdout)")
+        if resource == "items":
+            sub.add_argument("--page-size", type=int, default=100)
+            sub.add_argument("--prefetch", type=int, default=2, help="pages fetched ahead (default: %(default)s)")
+            sub.add_argument("--resume", action="store_true", help="continue an interrupted export into the same file")
+
+    return parser
+
+
+COMMANDS = {"push": push, "sync": sync, "delete": delete, "export": export}
+
+
+def main(argv:list[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    from .manager import GWManager
+
+    token_path = args.token or os.path.join(args.project_dir, "token.json")
+    if not os.path.exists(token_path):
+        parser.error(f"token file {token_path} not found, pass --token or point --project-dir at an existing project")
+    token = TokenConfig.load(token_path)
+    manager = GWManager.from_token(
+        token, project_dir=args.project_dir, endpoint=args.endpoint, codec=args.codec, pool_size=max(args.concurrency, 10)
+    )
+
+    try:
+        return COMMANDS[args.command](args, manager)
+    except KeyboardInterrupt:
+        print("\ninterrupted, rerun with --resume to continue", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+from typing import Any, Union
+import json
+
+
+class JSONCodec:
+    """Standard library JSON codec
+
+    Every codec works bytes-in/bytes-out: `dumps` returns compact UTF-8 bytes ready to put on the wire and `loads`
+    accepts `bytes` or `str`, so responses never need to be decoded to text first
+    """
+    name = "json"
+
+    def __init__(self):
+        self._encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    def dumps(self, obj:Any) -> bytes:
+        return self._encode(obj).encode()
+
+    def loads(self, data:Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """Codec backed by `orjson`, which encodes straight to bytes"""
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self.dumps = orjson.dumps
+        self.loads = orjson.loads
+
+
+class UjsonCodec(JSONCodec):
+    """Codec backed by `ujson`"""
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._encode = ujson.dumps
+        self.loads = ujson.loads
+
+    def dumps(self, obj:Any) -> bytes:
+        return self._encode(obj, ensure_ascii=False, escape_forward_slashes=False).encode()
+
+
+CODECS = {"orjson": OrjsonCodec, "ujson": UjsonCodec, "json": JSONCodec}
+
+
+def get_codec(codec:Union[str, JSONCodec] = "json") -> JSONCodec:
+    """Resolve a codec setting
+
+    Pass a codec instance, one of the names in `CODECS`, or `"auto"` to use the fastest installed codec
+    (`orjson`, then `ujson`, falling back to the standard library). Asking for a codec by name that is not
+    installed raises `ImportError`
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+
+    if codec == "auto":
+        for name in CODECS:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                continue
+
+    assert codec in CODECS, f"Unknown codec `{codec}`, expected one of {list(CODECS)} or 'auto'"
+    return CODECS[codec]()
+
+
+DEFAULT_CODEC = JSONCodec()
@@ -1,28 +1,99 @@
-import json
+from typing import Callable, Iterable
 from .exceptions import GeniusValidationError
 
-def validate_items(items: list[dict]):
-    for item in items:
-        try:
-            assert "title" in item, f"'title' field was not found inside of item {item}"
-            assert "description" in item, f"'description' field was not found inside of item {item}"
-            assert "external_url" in item, f"'external_url' field was not found inside of item {item}"
-            assert "image_url" in item, f"'image_url' field was not found inside of item {item}"
-        except AssertionError as e:
-            raise GeniusValidationError(e.args)
-    
-
-def validate_instructions(instructions: list[dict]):
-    for instruction in instructions:
-        try:
-            assert "promptlet" in instruction, f"'promptlet' field not found inside of instruction: {instruction}"
-        except AssertionError as e:
-            raise GeniusValidationError(e.args)
-
-def validate_policies(policies: list[dict]):
-    for policy in policies:
-        try:
-            assert "policy" in policy, "'policy' field not found inside of object"
-        except AssertionError as e:
-            raise GeniusValidationError(e.args)
-    
+
+class Schema:
+    def __init__(self, name:str, fields:dict[str, type], max_length:int = None):
+        """Compiled description of a Genius object
+
+        `fields` maps every required field to its expected type. The checks are compiled into a single generated loop
+        so a whole batch is checked in one tight pass, and unlike `assert` they still run under `python -O`.
+        Type checks, along with a non-empty and `max_length` check for string fields, only run in `strict` mode
+        """
+        self.name = name
+        self.fields = fields
+        self.max_length = max_length
+
+        self._valid = self._compile(strict=False)
+        self._strict_valid = self._compile(strict=True)
+
+    def _compile(self, strict:bool) -> Callable[[Iterable], bool]:
+        """Generate `valid(objs)` which returns `True` only when every object in `objs` passes"""
+        names = {f"_type{i}": kind for i, kind in enumerate(self.fields.values())}
+        checks = [" and ".join(f"{field!r} in obj" for field in self.fields)]
+
+        if strict:
+            for (field, kind), type_name in zip(self.fields.items(), names):
+                value = f"obj[{field!r}]"
+                checks.append(f"(type({value}) is {type_name} or isinstance({value}, {type_name}))")
+                if kind is str:
+                    checks.append(f"0 < len({value}) <= {self.max_length}" if self.max_length else value)
+
+        source = (
+            "def valid(objs, type=type, dict=dict, isinstance=isinstance, len=len):\n"
+            "    for obj in objs:\n"
+            f"        if type(obj) is not dict or not ({' and '.join(checks)}):\n"
+            "            return False\n"
+            "    return True\n"
+        )
+
+        namespace = dict(names)
+        exec(source, namespace)
+        return namespace["valid"]
+
+    def _describe(self, obj, strict:bool) -> list[str]:
+        """Explain why `obj` failed, only called for objects that already failed the fast path"""
+        if not isinstance(obj, dict):
+            return [f"expected {self.name} to be an object, got {type(obj).__name__}"]
+
+        errors = [f"'{field}' field was not found inside of {self.name}" for field in self.fields if field not in obj]
+        if not strict:
+            return errors
+
+        for field in self.fields:
+            if field not in obj:
+                continue
+
+            value, kind = obj[field], self.fields[field]
+            if not isinstance(value, kind):
+                errors.append(f"'{field}' field should be {kind.__name__}, got {type(value).__name__}")
+            elif kind is str and not value:
+                errors.append(f"'{field}' field is empty")
+            elif kind is str and self.max_length and len(value) > self.max_length:
+                errors.append(f"'{field}' field is longer than {self.max_length} characters")
+
+        return errors
+
+    def errors(self, objs:Iterable[dict], strict:bool = False) -> list[tuple[int, str]]:
+        """Return every `(index, message)` problem in `objs` without raising"""
+        if not isinstance(objs, (list, tuple)):
+            objs = list(objs)
+
+        valid = self._strict_valid if strict else self._valid
+        if valid(objs): # the common case, a clean batch costs a single pass
+            return []
+
+        return [(index, message) for index, obj in enumerate(objs) if not valid((obj,)) for message in self._describe(obj, strict)]
+
+    def validate(self, objs:Iterable[dict], strict:bool = False) -> None:
+        """Check a whole batch and raise one `GeniusValidationError` listing every problem found"""
+        errors = self.errors(objs, strict=strict)
+        if errors:
+            raise GeniusValidationError(f"{len(errors)} problem(s) found while validating {self.name}s", errors=errors)
+
+
+ITEM_SCHEMA = Schema("item", {"title": str, "description": str, "external_url": str, "image_url": str})
+INSTRUCTION_SCHEMA = Schema("instruction", {"promptlet": str})
+POLICY_SCHEMA = Schema("policy", {"policy": str})
+
+
+def validate_items(items: list[dict], strict:bool = False):
+    ITEM_SCHEMA.validate(items, strict=strict)
+
+
+def validate_instructions(instructions: list[dict], strict:bool = False):
+    INSTRUCTION_SCHEMA.validate(instructions, strict=strict)
+
+
+def validate_policies(policies: list[dict], strict:bool = False):
+    POLICY_SCHEMA.validate(policies, strict=strict)
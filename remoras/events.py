@@ -0,0 +1,198 @@
+from dataclasses import dataclass
+from typing import Any, Callable
+import asyncio
+import queue
+import threading
+import time
+
+from .structs import Event
+
+
+@dataclass
+class EventBufferStats:
+    """Counters for an `EventBuffer`
+
+    - `added` events accepted into the buffer
+    - `pending` events waiting to be flushed
+    - `flushes` / `flushed` calls made to the sink and the events they carried
+    - `failed` / `dropped` sink calls that raised and the events that were lost with them
+    """
+    added: int = 0
+    pending: int = 0
+    flushes: int = 0
+    flushed: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+    def dict(self):
+        return vars(self)
+
+
+class EventBuffer:
+    def __init__(self,
+        sink:Callable[[str, str, list[Event]], Any],
+        max_events:int = 100,
+        max_age:float = 1.0,
+        max_pending:int = 10_000,
+        on_error:Callable[[Exception, list[Event]], Any] = None
+    ):
+        """Collect `Event`s from any number of threads or coroutines and send them in batches
+
+        Events are grouped by `(session_id, visitor_id)`. A group is handed to `sink(session_id, visitor_id, events)` from
+        a background thread once it holds `max_events` events or its oldest event is `max_age` seconds old, so callers
+        never wait on the network. At most `max_pending` events are held, beyond that `add` blocks (backpressure) until a
+        flush frees room. A sink that raises drops its batch and reports it to `on_error`.
+
+        Call `close()` (or use the buffer as a context manager) to flush everything that is left on shutdown. From a
+        coroutine use `aflush()` / `aclose()` (or `async with`) instead, so the event loop is not blocked on the sink
+        """
+        assert max_events > 0 and max_pending >= max_events, "`max_pending` must be at least `max_events`"
+        self.sink = sink
+        self.max_events = max_events
+        self.max_age = max_age
+        self.max_pending = max_pending
+        self.on_error = on_error
+
+        self._groups: dict[tuple[str, str], tuple[float, list[Event]]] = {}
+        self._pending = 0
+        self._stats = EventBufferStats()
+        self._closed = False
+        self._new_group = False
+
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._flush_loop, name="remoras-event-buffer", daemon=True)
+        self._thread.start()
+
+    def add(self, event:Event, block:bool = True, timeout:float = None) -> None:
+        """Queue `event`, blocking while the buffer is full. Raises `queue.Full` if it is still full after `timeout`
+        seconds (or straight away with `block=False`)"""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("EventBuffer is closed")
+
+            if self._pending >= self.max_pending:
+                if not block or not self._condition.wait_for(lambda: self._pending < self.max_pending or self._closed, timeout):
+                    raise queue.Full("EventBuffer is full")
+                if self._closed:
+                    raise RuntimeError("EventBuffer is closed")
+
+            key = (event.session_id, event.visitor_id)
+            if key not in self._groups:
+                self._groups[key] = (time.monotonic(), [])
+                # the flush thread sized its wait before this group existed, wake it to account for its deadline
+                self._new_group = True
+                self._condition.notify_all()
+            _, events = self._groups[key]
+            events.append(event)
+
+            self._pending += 1
+            self._stats.added += 1
+
+            if len(events) >= self.max_events:
+                self._condition.notify_all()
+
+    async def aadd(self, event:Event) -> None:
+        """Coroutine friendly `add`, waits for room off the event loop when the buffer is full"""
+        try:
+            self.add(event, block=False)
+        except queue.Full:
+            await asyncio.get_running_loop().run_in_executor(None, self.add, event)
+
+    def _take_ready(self, everything:bool) -> list[tuple[tuple[str, str], list[Event]]]:
+        now = time.monotonic()
+        ready = [
+            key for key, (started, events) in self._groups.items()
+            if everything or len(events) >= self.max_events or now - started >= self.max_age
+        ]
+
+        batches = []
+        for key in ready:
+            _, events = self._groups.pop(key)
+            # oversized groups are split so a single sink call never carries more than `max_events`
+            batches.extend((key, events[i:i + self.max_events]) for i in range(0, len(events), self.max_events))
+
+        return batches
+
+    def _next_deadline(self) -> float:
+        if not self._groups:
+            return self.max_age
+        oldest = min(started for started, _ in self._groups.values())
+        return max(oldest + self.max_age - time.monotonic(), 0)
+
+    def _has_full_group(self) -> bool:
+        return any(len(events) >= self.max_events for _, events in self._groups.values())
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or self._new_group or self._has_full_group(), self._next_deadline())
+                self._new_group = False
+                closing = self._closed
+                batches = self._take_ready(everything=closing)
+
+            self._send(batches)
+
+            if closing:
+                return
+
+    def _send(self, batches):
+        for (session_id, visitor_id), events in batches:
+            try:
+                self.sink(session_id, visitor_id, events)
+                failed = False
+            except Exception as e:
+                failed = True
+                if self.on_error:
+                    try:
+                        self.on_error(e, events)
+                    except Exception:
+                        pass # a broken error handler must not take the flush thread down with it
+
+            with self._condition:
+                self._pending -= len(events)
+                self._stats.flushes += 1
+                if failed:
+                    self._stats.failed += 1
+                    self._stats.dropped += len(events)
+                else:
+                    self._stats.flushed += len(events)
+                self._condition.notify_all()
+
+    def flush(self) -> None:
+        """Send every buffered event now, from the calling thread"""
+        with self._condition:
+            batches = self._take_ready(everything=True)
+
+        self._send(batches)
+
+    def close(self, timeout:float = None) -> None:
+        """Stop accepting events, flush what is left and stop the background thread"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+        self._thread.join(timeout)
+
+    async def aflush(self) -> None:
+        """Coroutine friendly `flush`, the sink runs off the event loop so it may itself wait on the loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    async def aclose(self, timeout:float = None) -> None:
+        """Coroutine friendly `close`, waits for the final flush off the event loop"""
+        await asyncio.get_running_loop().run_in_executor(None, self.close, timeout)
+
+    def stats(self) -> EventBufferStats:
+        with self._condition:
+            return EventBufferStats(**{**vars(self._stats), "pending": self._pending})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
@@ -1,12 +1,12 @@
 
 class GeniusValidationError(Exception):
-    def __init__(self, message):
+    def __init__(self, message, errors:list[tuple[int, str]] = None):
+        """`errors` holds every `(index, message)` problem found in the validated batch"""
         self.message = message
+        self.errors = errors if errors else []
         super().__init__(message)
 
     def __str__(self):
-        return f"Unable to validate Genius Item/Instruction: {self.message}"
-    
-        
-
-    
+        details = "".join(f"\n  [{index}] {error}" for index, error in self.errors[:10])
+        more = f"\n  ... and {len(self.errors) - 10} more" if len(self.errors) > 10 else ""
+        return f"Unable to validate Genius Item/Instruction: {self.message}{details}{more}"
@@ -0,0 +1,155 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Union
+import glob
+import os
+import time
+
+from .structs import TokenConfig
+from .codec import JSONCodec, get_codec, DEFAULT_CODEC
+from .transport import Transport
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics
+from .bulk import CallResult, run_calls
+from .manager import GWManager
+
+
+@dataclass
+class FleetReport:
+    """Outcome of an operation run across a fleet, one `CallResult` per project keyed by project name"""
+    results: list[CallResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def responses(self) -> dict[str, Any]:
+        return {result.key: result.response for result in self.results if result.ok}
+
+    @property
+    def errors(self) -> dict[str, str]:
+        return {result.key: result.error for result in self.results if not result.ok}
+
+    @property
+    def ok(self) -> bool:
+        return all(result.ok for result in self.results)
+
+    def dict(self):
+        return {"projects": len(self.results), "failed": len(self.errors), "elapsed": self.elapsed, "results": [result.dict() for result in self.results]}
+
+
+class GWFleet:
+    def __init__(self,
+        token_configs:Iterable[TokenConfig],
+        project_dirs:dict[str, str] = None,
+        transport:Transport = None,
+        pool_size:int = 32,
+        timeout:float = 30,
+        limiter:AdaptiveLimiter = None,
+        metrics:Metrics = None,
+        codec:Union[str, JSONCodec] = None,
+        endpoint:str = None,
+        concurrency:int = 8
+    ):
+        """Manage many projects at once, one `GWManager` per `TokenConfig`
+
+        Every manager shares a single pooled `transport`, `limiter` and (optional) `metrics`, so the whole fleet holds
+        one connection pool and backs off together when the API pushes back. `self.managers` maps project names to
+        their managers and `fleet["name"]` returns one of them. `project_dirs` maps project names to their `project_dir`,
+        projects without one use `genius_project/<name>`
+
+        `run` applies an operation to every project with up to `concurrency` projects in flight and collects the
+        results in a `FleetReport`, one failing project never stops the others
+        """
+        self.codec = get_codec(codec) if codec else DEFAULT_CODEC
+        self.metrics = metrics
+        self.transport = transport if transport else Transport(pool_size=pool_size, timeout=timeout, codec=self.codec, metrics=metrics)
+        self.limiter = limiter if limiter else AdaptiveLimiter()
+        self.concurrency = concurrency
+
+        project_dirs = project_dirs or {}
+        self.managers: dict[str, GWManager] = {}
+        for token_config in token_configs:
+            name = token_config.project_name
+            assert name not in self.managers, f"Project {name} was passed twice"
+
+            self.managers[name] = GWManager.from_token(
+                token_config,
+                project_dir=project_dirs.get(name, os.path.join("genius_project", name)),
+                transport=self.transport,
+                limiter=self.limiter,
+                metrics=metrics,
+                codec=self.codec,
+                endpoint=endpoint
+            )
+
+    @classmethod
+    def from_dir(self, directory:str, **kwargs):
+        """Load every `token.json` under `directory`, as written by `GWManager.save_token_config`
+
+        Each project keeps the directory its token was found in as `project_dir`, so manifests and captures stay
+        next to its token
+        """
+        paths = sorted(glob.glob(os.path.join(directory, "**", "token.json"), recursive=True))
+        assert paths, f"No token.json files found under {directory}"
+
+        codec = get_codec(kwargs["codec"]) if kwargs.get("codec") else DEFAULT_CODEC
+        token_configs = [TokenConfig.load(path, codec=codec) for path in paths]
+        project_dirs = {token_config.project_name: os.path.dirname(path) for token_config, path in zip(token_configs, paths)}
+        return self(token_configs, project_dirs=project_dirs, **kwargs)
+
+    def __getitem__(self, project_name:str) -> GWManager:
+        return self.managers[project_name]
+
+    def __len__(self):
+        return len(self.managers)
+
+    def __iter__(self):
+        return iter(self.managers.values())
+
+    def run(self, operation:Callable[[GWManager], Any], projects:Iterable[str] = None, concurrency:int = None) -> FleetReport:
+        """Call `operation(manager)` for every project (or only `projects`) concurrently
+
+            report = fleet.run(lambda manager: manager.models.train())
+            report.responses # {"project": <train response>, ...}
+            report.errors    # {"failing_project": "HTTPError: 500 ...", ...}
+        """
+        names = list(projects) if projects is not None else list(self.managers)
+        started = time.perf_counter()
+        # no limiter here, every call the operation makes already goes through the shared one
+        results = run_calls(lambda name: operation(self.managers[name]), names, concurrency=concurrency or self.concurrency)
+        return FleetReport(results=results, elapsed=time.perf_counter() - started)
+
+    def train(self, model_id:str = None, **kwargs) -> FleetReport:
+        return self.run(lambda manager: manager.models.train(model_id), **kwargs)
+
+    def list_models(self, **kwargs) -> FleetReport:
+        return self.run(lambda manager: manager.models.list(), **kwargs)
+
+    def add_items(self, items:Union[str, list, dict[str, Union[str, list]]], chunk_size:int = 500, concurrency:int = 4, **kwargs) -> FleetReport:
+        """Bulk upload items to every project, each response is that project's `BulkReport`
+
+        `items` is a list or path uploaded to every project, or a dict mapping project names to their own list or path,
+        in which case only those projects are uploaded to
+        """
+        if isinstance(items, dict):
+            kwargs.setdefault("projects", list(items))
+            return self.run(lambda manager: manager.items.add(items[manager.token_config.project_name], chunk_size=chunk_size, concurrency=concurrency), **kwargs)
+
+        return self.run(lambda manager: manager.items.add(items, chunk_size=chunk_size, concurrency=concurrency), **kwargs)
+
+    def sync_items(self, items:Union[str, list, dict[str, Union[str, list]]], chunk_size:int = 500, concurrency:int = 8, **kwargs) -> FleetReport:
+        """`ItemManager.sync` across the fleet, `items` as in `add_items`, each response is that project's `SyncReport`"""
+        if isinstance(items, dict):
+            kwargs.setdefault("projects", list(items))
+            return self.run(lambda manager: manager.items.sync(items[manager.token_config.project_name], chunk_size=chunk_size, concurrency=concurrency), **kwargs)
+
+        return self.run(lambda manager: manager.items.sync(items, chunk_size=chunk_size, concurrency=concurrency), **kwargs)
+
+    def close(self):
+        """Close the shared transport (and every manager's capture file)"""
+        for manager in self.managers.values():
+            manager.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
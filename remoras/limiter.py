@@ -0,0 +1,248 @@
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable
+import asyncio
+import random
+import threading
+import time
+
+THROTTLE_STATUSES = (429,)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class LimiterStats:
+    """Snapshot of an `AdaptiveLimiter`
+
+    - `limit` current number of calls allowed in flight
+    - `in_flight` calls running right now
+    - `calls` attempts that went through the limiter, `retries` the attempts that were repeats
+    - `throttled` attempts answered with 429, `failed` attempts that failed with a 5xx or a connection error
+    - `decreases` times the limit was cut in response to throttling, errors or slow calls
+    - `paused` total seconds of `Retry-After` asked for by the server
+    """
+    limit: float = 0.0
+    in_flight: int = 0
+    calls: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failed: int = 0
+    decreases: int = 0
+    paused: float = 0.0
+
+    def dict(self):
+        return vars(self)
+
+
+def _status(error:Exception) -> int | None:
+    """HTTP status carried by a `requests.HTTPError` or an `aiohttp.ClientResponseError`"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if status is not None else getattr(error, "status", None)
+
+
+def _retry_after(error:Exception) -> float | None:
+    """Seconds to wait according to the `Retry-After` header of a failed response, if it sent one"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    value = headers.get("Retry-After") if headers else None
+    if value is None:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveLimiter:
+    def __init__(self,
+        initial:int = 4,
+        min_limit:int = 1,
+        max_limit:int = 64,
+        latency_target:float = None,
+        decrease:float = 0.5,
+        retries:int = 3,
+        backoff:float = 0.5,
+        max_backoff:float = 30
+    ):
+        """Shared concurrency limit for every bulk and concurrent call of a `GWManager`
+
+        The number of calls allowed in flight adapts AIMD style: every successful call raises the limit by
+        `1 / limit` (about one more slot per round of calls, up to `max_limit`), while a 429, a 5xx, a connection error,
+        or a call slower than `latency_target` seconds multiplies it by `decrease` (down to `min_limit`). Only calls
+        started after the last cut can cut it again, so one burst of errors counts once.
+
+        A `Retry-After` header pauses every caller until it has passed. Calls are retried up to `retries` times with
+        full-jitter exponential `backoff` (capped at `max_backoff` seconds): 429s always, since the server did not
+        act on them, and 5xx or connection errors only for calls marked `idempotent`
+        """
+        assert 0 < min_limit <= initial <= max_limit, "Limits must satisfy 0 < `min_limit` <= `initial` <= `max_limit`"
+        assert 0 < decrease < 1, "`decrease` must be between 0 and 1"
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.decrease = decrease
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._stats = LimiterStats()
+
+        self._condition = threading.Condition()
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _try_acquire(self) -> float:
+        """Take a slot, returns 0 on success, otherwise how long to wait (`-1` means until a slot is released)"""
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            return pause
+
+        if self._in_flight >= int(self._limit):
+            return -1
+
+        self._in_flight += 1
+        self._stats.calls += 1
+        return 0
+
+    def _free_slot(self):
+        """Give a slot back and wake every waiting thread and coroutine, must be called holding `self._condition`"""
+        self._in_flight -= 1
+        self._condition.notify_all()
+
+        waiters, self._waiters = self._waiters, deque()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(lambda future=future: future.done() or future.set_result(None))
+
+    def _release(self, started:float, latency:float, error:Exception | None):
+        with self._condition:
+            if error is None:
+                overloaded = self.latency_target is not None and latency > self.latency_target
+            else:
+                status = _status(error)
+                throttled = status in THROTTLE_STATUSES
+                failed = status >= 500 if status is not None else isinstance(error, (OSError, TimeoutError))
+                overloaded = throttled or failed # any other 4xx says nothing about load
+
+                self._stats.throttled += throttled
+                self._stats.failed += failed
+
+                retry_after = _retry_after(error)
+                if retry_after:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+                    self._stats.paused += retry_after
+
+            if overloaded and started >= self._last_decrease:
+                self._limit = max(self._limit * self.decrease, self.min_limit)
+                self._last_decrease = time.monotonic()
+                self._stats.decreases += 1
+            elif error is None and not overloaded:
+                self._limit = min(self._limit + 1 / self._limit, self.max_limit)
+
+            self._free_slot()
+
+    def _should_retry(self, error:Exception, attempt:int, idempotent:bool) -> bool:
+        if attempt >= self.retries:
+            return False
+
+        status = _status(error)
+        if status is not None:
+            return status in THROTTLE_STATUSES or (idempotent and status in RETRY_STATUSES)
+        return idempotent and isinstance(error, (OSError, TimeoutError))
+
+    def _delay(self, attempt:int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def acquire(self) -> float:
+        """Block until a slot is free, returns the monotonic time the call may start at. Pair with `release`"""
+        with self._condition:
+            while (wait := self._try_acquire()) != 0:
+                self._condition.wait(wait if wait > 0 else None)
+        return time.monotonic()
+
+    def release(self, started:float, error:Exception = None):
+        self._release(started, time.monotonic() - started, error)
+
+    def call(self, fn:Callable[..., Any], *args, idempotent:bool = False, **kwargs) -> Any:
+        """Run `fn(*args, **kwargs)` within the limit, retrying it as described on the class"""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._condition:
+                    self._stats.retries += 1
+
+            started = self.acquire()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self.release(started, e)
+                if not self._should_retry(e, attempt, idempotent):
+                    raise
+                time.sleep(self._delay(attempt))
+                continue
+            except BaseException: # interrupted, give the slot back without judging the server
+                with self._condition:
+                    self._free_slot()
+                raise
+
+            self.release(started)
+            return result
+
+    async def aacquire(self) -> float:
+        """asyncio version of `acquire`"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            with self._condition:
+                wait = self._try_acquire()
+                if wait == 0:
+                    return time.monotonic()
+
+                if wait < 0:
+                    future = loop.create_future()
+                    self._waiters.append((loop, future))
+
+            if wait > 0:
+                await asyncio.sleep(wait)
+            else:
+                await future
+
+    async def acall(self, fn:Callable[..., Awaitable], *args, idempotent:bool = False, **kwargs) -> Any:
+        """asyncio version of `call`, `fn` must be a coroutine function"""
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._condition:
+                    self._stats.retries += 1
+
+            started = await self.aacquire()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                self.release(started, e)
+                if not self._should_retry(e, attempt, idempotent):
+                    raise
+                await asyncio.sleep(self._delay(attempt))
+                continue
+            except BaseException: # cancelled, give the slot back without judging the server
+                with self._condition:
+                    self._free_slot()
+                raise
+
+            self.release(started)
+            return result
+
+    def stats(self) -> LimiterStats:
+        with self._condition:
+            return LimiterStats(**{**vars(self._stats), "limit": self._limit, "in_flight": self._in_flight})
@@ -1,19 +1,35 @@
-import requests
-from requests.auth import HTTPBasicAuth
 import asyncio
-from websockets.asyncio.client import connect, ClientConnection
 
 from uuid import uuid4
 import json
+import random
 import os
-from typing import Union
+import time
+import hashlib
+from typing import Any, Callable, Container, TYPE_CHECKING, AsyncIterator, Iterable, Iterator, Union
+from collections import deque, OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from .structs import BasicAuth, TokenConfig, ProjectConfig, FeedPayload
-from .data_validation import validate_items, validate_policies
-from .utils import load_obj_or_path
+from .structs import BasicAuth, TokenConfig, ProjectConfig, FeedPayload, Event, WebsocketPayload, CardView
+from .data_validation import validate_items, validate_policies, Schema, ITEM_SCHEMA, POLICY_SCHEMA
+from .exceptions import GeniusValidationError
+from .utils import load_obj_or_path, iter_obj_or_path, iter_json_field
+from .transport import Transport
+from .codec import JSONCodec, DEFAULT_CODEC, get_codec
+from .cache import TTLCache, FeedCache, MISSING, feed_key
+from .events import EventBuffer
+from .limiter import AdaptiveLimiter
+from .metrics import Metrics, Sample
+from .bulk import BulkReport, ChunkResult, CallResult, SyncReport, chunked, run_chunks, run_calls
+from .capture import TrafficRecorder, make_recorder
+
+if TYPE_CHECKING:
+    from websockets.asyncio.client import ClientConnection
 
 ENDPOINT = "https://app.productgenius.io"
+ENDPOINT_ENV = "REMORAS_ENDPOINT"
 
 
 class GWManager:
@@ -22,8 +38,50 @@ class GWManager:
         project_config:ProjectConfig = None,
         token_config:TokenConfig = None,
         project_dir:str = "genius_project",
-        visitor:str = "DEFAULT"
+        visitor:str = "DEFAULT",
+        transport:Transport = None,
+        pool_size:int = 10,
+        timeout:float = 30,
+        item_cache:TTLCache = None,
+        max_websockets:int = 128,
+        codec:Union[str, JSONCodec] = None,
+        feed_cache:FeedCache = None,
+        limiter:AdaptiveLimiter = None,
+        metrics:Metrics = None,
+        endpoint:str = None,
+        capture:Union[bool, str, TrafficRecorder] = None
     ):
+        """Root manager for a single project
+
+        Requests go to `endpoint`, which defaults to the `REMORAS_ENDPOINT` environment variable and then to the
+        productgenius API. Point it at a `remoras.standin` server to run against a local stand-in
+
+        Every sub-manager shares `self.transport`, one pooled keep-alive HTTP transport. Pass your own `transport`
+        to share a pool between managers, otherwise one is created with `pool_size` connections per host and a
+        default `timeout` (seconds) for every request. `self.transport.stats()` reports connection reuse
+
+        Pass an `item_cache` (e.g. `TTLCache(maxsize=10_000, ttl=300)`) to serve repeated `items.get` calls from memory,
+        `items.update` and `items.delete` invalidate the cached entry. Pass a `feed_cache` (e.g. `FeedCache(ttl=5)`) to
+        answer identical event-less `data.feed` and websocket requests once for every visitor asking at the same time
+
+        `self.websocket` is a single connection for `visitor`, to serve many visitors at once use `self.websockets`,
+        a pool holding up to `max_websockets` live connections keyed by visitor
+
+        Bulk uploads, syncs and prefetching scans run within `self.limiter`, an `AdaptiveLimiter` that finds the highest
+        concurrency the API allows and backs off on 429/5xx. Pass your own `limiter` to tune it or share it between managers
+
+        Pass a `metrics` instance (`Metrics()`) to record latency histograms, byte counts and errors for every request
+        and websocket round trip, `metrics.prometheus()` renders them for scraping. When your own `transport` is passed
+        its metrics are used unless `metrics` is set. Without one nothing is measured
+
+        `codec` picks the JSON codec used for every request body, response, websocket message and json file that is
+        loaded: `"json"` (the standard library, default), `"orjson"`, `"ujson"`, `"auto"` for the fastest one installed,
+        or a `JSONCodec` instance (`pip install remoras[fast]` installs orjson). When your own `transport` is passed its codec is used unless `codec` is set
+
+        With `capture=True` every websocket request and `data.feed`/`data.batch` call is recorded with its timing to a new
+        gzipped JSONL file in `project_dir/captures` (or pass a path or a `TrafficRecorder`), for `remoras.replay` to load
+        test against. `self.capture.path` is the file, which is complete once the manager is closed
+        """
         assert (basic_auth and project_config) or token_config, "To manage a project you must pass either token_config, or (basic_auth, and project_config)"
         assert not (basic_auth and project_config and token_config), "Do not pass all three `basic_auth`, `token_config` and `project_config`. Either `token_config`, or (`basic_auth` and `project_config`)"
 
@@ -31,22 +89,56 @@ class GWManager:
         self.project_config = project_config
         self.token_config = token_config
         self.project_dir = project_dir
+        self.endpoint = (endpoint or os.environ.get(ENDPOINT_ENV) or ENDPOINT).rstrip("/")
+        self.item_cache = item_cache
+        self.feed_cache = feed_cache
+        self.limiter = limiter if limiter else AdaptiveLimiter()
+        self.max_websockets = max_websockets
 
+        self.codec = get_codec(codec) if codec else (transport.codec if transport else DEFAULT_CODEC)
+        self.metrics = metrics if metrics else (transport.metrics if transport else None)
+        self.transport = transport if transport else Transport(pool_size=pool_size, timeout=timeout, codec=self.codec, metrics=self.metrics)
+        self.capture = make_recorder(capture, project_dir, self.codec)
+
+        self._build_managers(visitor)
+
+    def _build_managers(self, visitor:str):
         self.project = ProjectManager(self)
         self.items = ItemManager(self)
         self.policies = PolicyManager(self)
         self.models = ModelManager(self)
         self.data = DataManager(self)
         self.websocket = WebSocketManager(self, visitor=visitor)
-        
+        self.websockets = WebSocketPool(self, max_size=self.max_websockets)
 
     @classmethod
-    def from_token(self, token_config:TokenConfig):
-        return GWManager(token_config=token_config)
+    def from_token(self, token_config:TokenConfig, **kwargs):
+        return self(token_config=token_config, **kwargs)
 
     @classmethod
-    def from_auth(self, basic_auth:BasicAuth, project_config:ProjectConfig):
-        return GWManager(basic_auth=basic_auth, project_config=project_config)
+    def from_auth(self, basic_auth:BasicAuth, project_config:ProjectConfig, **kwargs):
+        return self(basic_auth=basic_auth, project_config=project_config, **kwargs)
+
+    @property
+    def token_config(self) -> TokenConfig:
+        return self._token_config
+
+    @token_config.setter
+    def token_config(self, token_config:TokenConfig):
+        # build the auth header once per token instead of once per request
+        self._token_config = token_config
+        self._auth_header = token_config.auth_header() if token_config else None
+
+    @property
+    def auth_header(self) -> dict:
+        assert self._auth_header, "No token_config set in GWManager"
+        return self._auth_header
+
+    def close(self):
+        """Close the pooled connections held by `self.transport` and finish the capture file"""
+        self.transport.close()
+        if self.capture is not None:
+            self.capture.close()
 
      
     def save_token_config(self) -> None:
@@ -68,11 +160,12 @@ class ProjectManager:
 
     def create(self):
         assert self.manager.basic_auth and self.manager.project_config, "Root manager needs to have BasicAuth and ProjectConfig to create a new project"
+        from requests.auth import HTTPBasicAuth
         auth = HTTPBasicAuth(username=self.manager.basic_auth.username, password=self.manager.basic_auth.password)
-        r = requests.post(f"{ENDPOINT}/hackathon/project/create", auth=auth, json=self.manager.project_config.dict())
+        r = self.manager.transport.post(f"{self.manager.endpoint}/hackathon/project/create", name="project.create", auth=auth, json=self.manager.project_config.dict())
         r.raise_for_status()
 
-        response = r.json()
+        response = self.manager.codec.loads(r.content)
         self.manager.token_config = TokenConfig(
             project_name=self.manager.project_config.project_name,
             token = response["access_token"]
@@ -82,10 +175,65 @@ class ProjectManager:
 
     def update(self, update:dict):
         assert self.manager.token_config, "No token config set in the GWManager"
-        r = requests.put(f"{ENDPOINT}/platform/project/{self.manager.token_config.project_name}", headers=self.manager.token_config.auth_header(), json=update)
+        r = self.manager.transport.put(f"{self.manager.endpoint}/platform/project/{self.manager.token_config.project_name}", name="project.update", headers=self.manager.auth_header, json=update)
         r.raise_for_status()
 
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+
+def _page_items(page) -> list:
+    """`/items/list` pages are plain lists, but also unwrap `{"items": [...]}` shaped pages"""
+    if isinstance(page, dict):
+        return page.get("items", [])
+    return page
+
+
+def _content_hash(item:dict) -> str:
+    return hashlib.blake2b(json.dumps(item, sort_keys=True, separators=(",", ":")).encode(), digest_size=16).hexdigest()
+
+
+def _created_ids(response, count:int) -> list:
+    """Pull the new item ids out of an `/items/create` response when it echoes the created items back"""
+    if isinstance(response, list) and len(response) == count:
+        return [created.get("id") if isinstance(created, dict) else None for created in response]
+    return [None] * count
+
+
+def _checked_entries(entries:Iterable[tuple[str, Any]], schema:Schema = None, chunk_size:int = 500) -> Iterator[tuple[str, Any, list[str]]]:
+    """Check `(id, value)` entries as they are pulled from `entries`, yields `(id, value, problems)`
+
+    Entries are read `chunk_size` at a time and each chunk is validated against `schema` (when passed) in one pass, so
+    the input is never materialized. Ids must be non-empty strings. A repeated id is dropped, unless it comes with a
+    different value than its first occurrence (two conflicting updates), which is reported as a problem instead
+    """
+    seen = {}
+    for chunk in chunked(entries, chunk_size):
+        problems = {}
+        if schema is not None:
+            for index, message in schema.errors([value for _, value in chunk]):
+                problems.setdefault(index, []).append(message)
+
+        for index, (object_id, value) in enumerate(chunk):
+            if not isinstance(object_id, str) or not object_id:
+                yield object_id, value, [f"id should be a non-empty string, got {object_id!r}"]
+            elif object_id not in seen:
+                seen[object_id] = value
+                yield object_id, value, problems.get(index)
+            elif seen[object_id] != value:
+                yield object_id, value, [f"id {object_id} appears more than once with a different update"]
+
+
+def _run_many(manager:GWManager, call:Callable[[str, Any], Any], entries:Iterable[tuple[str, Any, list[str]]], concurrency:int, on_result:Callable[[CallResult], Any] = None) -> list[CallResult]:
+    """Run `call(id, value)` for every checked entry within the manager's limiter, returns one `CallResult` per entry
+    in input order, keyed by id. Entries with problems fail without a request being made
+    """
+    def send(entry):
+        object_id, value, problems = entry
+        if problems:
+            raise GeniusValidationError("; ".join(problems))
+        return manager.limiter.call(call, object_id, value, idempotent=True)
+
+    return run_calls(send, entries, concurrency=concurrency, key=lambda entry: entry[0], on_result=on_result)
 
 
 class ItemManager:
@@ -97,58 +245,291 @@ class ItemManager:
 
     def _get_endpoint(self):
         assert self.manager.token_config, "No token_config set in GWManager"
-        return f"{ENDPOINT}/platform/project/{self.manager.token_config.project_name}/items"
+        return f"{self.manager.endpoint}/platform/project/{self.manager.token_config.project_name}/items"
     
 
-    def add(self, items_or_path:Union[str, list]):
-        items = load_obj_or_path(items_or_path)
-        validate_items(items)
-
-        r = requests.post(
+    def _create(self, items:list):
+        r = self.manager.transport.post(
             f"{self._get_endpoint()}/create",
-            headers=self.manager.token_config.auth_header(),
+            name="items.create",
+            headers=self.manager.auth_header,
             json=items
         )
         r.raise_for_status()
 
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+    def add(self, items_or_path:Union[str, list], chunk_size:int = None, concurrency:int = 4, retries:int = 2, on_result:Callable[[ChunkResult], Any] = None, skip:Container[int] = ()) -> Union[list, BulkReport]:
+        """Validate and upload items to the project
+
+        By default every item is sent in a single request. Pass `chunk_size` to switch to bulk mode, the items are then
+        uploaded in chunks of `chunk_size` with up to `concurrency` chunks in flight, each chunk retried on its own up to
+        `retries` times. Bulk mode returns a `BulkReport` with per-chunk results and the overall items/sec.
+
+        In bulk mode a filepath (JSON array or JSON Lines) is streamed, so loading, validation and upload run as a
+        pipeline that only ever holds the chunks in flight in memory. `on_result` and `skip` are passed on to
+        `run_chunks`, to follow progress and to resume an earlier upload of the same input
+        """
+        if chunk_size:
+            items = iter_obj_or_path(items_or_path, codec=self.manager.codec)
+            return run_chunks(self._create, items, chunk_size=chunk_size, concurrency=concurrency, retries=retries, validate=validate_items, limiter=self.manager.limiter, on_result=on_result, skip=skip)
+
+        items = load_obj_or_path(items_or_path, codec=self.manager.codec)
+        validate_items(items)
+
+        return self._create(items)
 
     def get(self, item_id:str):
-        r = requests.get(
+        cache = self.manager.item_cache
+        if cache is not None:
+            item = cache.get(item_id, MISSING)
+            if item is not MISSING:
+                return item
+
+        r = self.manager.transport.get(
             f"{self._get_endpoint()}/{item_id}",
-            headers=self.manager.token_config.auth_header()
+            name="items.get",
+            headers=self.manager.auth_header
         )
         r.raise_for_status()
-        return r.json()
+        item = self.manager.codec.loads(r.content)
+
+        if cache is not None:
+            cache.set(item_id, item)
+
+        return item
 
     def list(self, params={"page": 1, "count": 10}):
-        r = requests.get(
+        r = self.manager.transport.get(
             f"{self._get_endpoint()}/list",
-            headers=self.manager.token_config.auth_header(),
+            name="items.list",
+            headers=self.manager.auth_header,
             params=params
         )
         r.raise_for_status()
 
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.manager.project_dir, "items_manifest.json")
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self._manifest_path()):
+            return {}
+
+        with open(self._manifest_path(), "rb") as f:
+            return self.manager.codec.loads(f.read())
+
+    def _save_manifest(self, manifest:dict) -> None:
+        os.makedirs(self.manager.project_dir, exist_ok=True)
+
+        # write then swap so an interrupted sync never leaves a half written manifest behind
+        path = self._manifest_path()
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(self.manager.codec.dumps(manifest))
+        os.replace(f"{path}.tmp", path)
+
+    def sync(self, items_or_path:Union[str, list], chunk_size:int = 500, concurrency:int = 8, retries:int = 2, dry_run:bool = False) -> SyncReport:
+        """Make the project's items match `items_or_path` while only sending what changed
+
+        A manifest in `project_dir/items_manifest.json` maps every synced item's `external_url` to a hash of its content and
+        its item id. The new catalog is streamed and diffed against it, then new items are created in concurrent chunks of
+        `chunk_size` (each chunk retried up to `retries` times), while changed and removed items are updated/deleted with up to `concurrency` calls in flight.
+        Only changes that went through are written back to the manifest, so failures are retried by the next sync. When
+        `/items/create` does not echo the new ids they are looked up through `iter_all`, an item whose id can still not
+        be found is reported as a failure and left out of the manifest.
+        An invalid item is reported in `failures` (with its `index` in the catalog) and left as it is on the server,
+        the rest of the catalog still syncs.
+
+        With `dry_run` nothing is sent and the returned `SyncReport` counts the changes that would be made
+        """
+        started = time.perf_counter()
+        manifest = self._load_manifest()
+        report = SyncReport()
+
+        seen = set()
+        creates, updates = [], []
+        offset = 0
+        for chunk in chunked(iter_obj_or_path(items_or_path, codec=self.manager.codec), chunk_size):
+            problems = {}
+            for index, message in ITEM_SCHEMA.errors(chunk):
+                problems.setdefault(index, []).append(message)
+
+            for index, item in enumerate(chunk):
+                if index in problems:
+                    key = item.get("external_url") if isinstance(item, dict) else None
+                    seen.add(key) # an item that is there but broken must not be deleted
+                    report.failures.append({"key": key, "index": offset + index, "action": "validate", "error": "; ".join(problems[index])})
+                    continue
+
+                key = item["external_url"]
+                if key in seen:
+                    report.failures.append({"key": key, "index": offset + index, "action": "create", "error": "Duplicate external_url in catalog"})
+                    continue
+                seen.add(key)
+
+                digest = _content_hash(item)
+                entry = manifest.get(key)
+
+                if entry is None:
+                    creates.append((key, digest, item))
+                elif entry["hash"] != digest:
+                    updates.append((key, digest, item))
+                else:
+                    report.unchanged += 1
+
+            offset += len(chunk)
+
+        deletes = [key for key in manifest if key not in seen]
+
+        if dry_run:
+            report.created, report.updated, report.deleted = len(creates), len(updates), len(deletes)
+            report.elapsed = time.perf_counter() - started
+            return report
+
+        # new items go up in bulk, the response is used to learn the ids needed for later updates and deletes
+        unresolved = {}
+        if creates:
+            bulk = run_chunks(self._create, (item for _, _, item in creates), chunk_size=chunk_size, concurrency=concurrency, retries=retries, limiter=self.manager.limiter)
+            for chunk in bulk.chunks:
+                report.requests += chunk.attempts
+                created = creates[chunk.start:chunk.start + chunk.count]
+
+                if not chunk.ok:
+                    report.failures.extend({"key": key, "action": "create", "error": chunk.error} for key, _, _ in created)
+                    continue
+
+                for (key, digest, item), item_id in zip(created, _created_ids(chunk.response, len(created))):
+                    item_id = item_id or item.get("id")
+                    if item_id is None:
+                        unresolved[key] = digest
+                    else:
+                        manifest[key] = {"hash": digest, "id": item_id}
+                    report.created += 1
+
+        if unresolved:
+            # `/items/create` did not echo the new ids, look them up by `external_url` rather than recording items that
+            # could never be updated or deleted
+            for listed in self.iter_all():
+                key = listed.get("external_url") if isinstance(listed, dict) else None
+                if key in unresolved and listed.get("id") is not None:
+                    manifest[key] = {"hash": unresolved.pop(key), "id": listed["id"]}
+                    if not unresolved:
+                        break
+
+            report.failures.extend({"key": key, "action": "create", "error": "Item was created but its id could not be resolved"} for key in unresolved)
+
+        changes = []
+        for key, digest, item in updates:
+            item_id = manifest[key].get("id") or item.get("id")
+            if item_id is None:
+                report.failures.append({"key": key, "action": "update", "error": "No item id recorded for this item"})
+            else:
+                changes.append(("update", key, item_id, digest, item))
+
+        for key in deletes:
+            if manifest[key].get("id") is None:
+                report.failures.append({"key": key, "action": "delete", "error": "No item id recorded for this item"})
+            else:
+                changes.append(("delete", key, manifest[key]["id"], None, None))
+
+        def apply(change):
+            action, _, item_id, _, item = change
+            return self._update(item_id, item) if action == "update" else self.delete(item_id)
+
+        for change, result in zip(changes, run_calls(apply, changes, concurrency=concurrency, key=lambda change: change[1], limiter=self.manager.limiter, idempotent=True)):
+            action, key, item_id, digest, _ = change
+            report.requests += 1
+
+            if not result.ok:
+                report.failures.append({"key": key, "action": action, "error": result.error})
+            elif action == "update":
+                manifest[key] = {"hash": digest, "id": item_id}
+                report.updated += 1
+            else:
+                del manifest[key]
+                report.deleted += 1
+
+        self._save_manifest(manifest)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def iter_all(self, page_size:int = 100, prefetch:int = 2, start_page:int = 1) -> Iterator[dict]:
+        """Yield every item in the project, walking `/items/list` one page of `page_size` at a time
+
+        While the current page is being consumed the next `prefetch` pages are already being fetched in the
+        background, so a full scan is bound by bandwidth rather than round trips. Iteration stops at the first
+        short page, and any outstanding prefetches are dropped if the consumer stops early
+        """
+        assert page_size > 0 and prefetch >= 0, "`page_size` must be positive and `prefetch` can not be negative"
+        pool = ThreadPoolExecutor(max_workers=prefetch + 1)
+        fetch = lambda page: _page_items(self.manager.limiter.call(self.list, params={"page": page, "count": page_size}, idempotent=True))
+
+        try:
+            pages = deque(pool.submit(fetch, page) for page in range(start_page, start_page + prefetch + 1))
+            next_page = start_page + prefetch + 1
+
+            while pages:
+                items = pages.popleft().result()
+                yield from items
+
+                if len(items) < page_size:
+                    break
+
+                pages.append(pool.submit(fetch, next_page))
+                next_page += 1
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
 
     def update(self, item_id:str, update:dict):
         validate_items([update])
+        return self._update(item_id, update)
 
-        r = requests.put(
+    def _update(self, item_id:str, update:dict):
+        r = self.manager.transport.put(
             f"{self._get_endpoint()}/{item_id}/update",
-            headers=self.manager.token_config.auth_header(),
+            name="items.update",
+            headers=self.manager.auth_header,
             json=update
         )
+        self._invalidate(item_id)
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def delete(self, item_id:str):
-        r = requests.delete(
+        r = self.manager.transport.delete(
             f"{self._get_endpoint()}/{item_id}/delete",
-            headers=self.manager.token_config.auth_header()
+            name="items.delete",
+            headers=self.manager.auth_header
         )
+        self._invalidate(item_id)
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+    def update_many(self, updates:Union[dict[str, dict], Iterable[tuple[str, dict]]], concurrency:int = 8, on_result:Callable[[CallResult], Any] = None) -> "list[CallResult]":
+        """Apply many updates, given as `{item_id: update}` or `(item_id, update)` pairs, with up to `concurrency` in flight
+
+        `updates` is consumed lazily and validated a chunk at a time just ahead of sending, entries with a bad id or an
+        invalid update fail without being sent. A repeated id is only sent once, repeating it with a different update
+        fails the repeat. Returns one `CallResult` per entry sent or failed, in input order and keyed by item id, a
+        failure never stops the rest of the batch. Calls run within `manager.limiter` and are retried on 429/5xx.
+        `on_result` is called as each result comes in
+        """
+        pairs = updates.items() if isinstance(updates, dict) else updates
+        return _run_many(self.manager, self._update, _checked_entries(pairs, ITEM_SCHEMA), concurrency, on_result)
+
+    def delete_many(self, item_ids:Iterable[str], concurrency:int = 8, on_result:Callable[[CallResult], Any] = None) -> "list[CallResult]":
+        """Delete many items with up to `concurrency` in flight, returns one `CallResult` per unique id (see `update_many`)
+
+        `item_ids` may be a lazy stream, it is read as calls go out rather than up front
+        """
+        entries = _checked_entries((item_id, None) for item_id in item_ids)
+        return _run_many(self.manager, lambda item_id, _: self.delete(item_id), entries, concurrency, on_result)
+
+    def _invalidate(self, item_id:str):
+        # invalidate even when the write failed, the server side state is unknown at that point
+        if self.manager.item_cache is not None:
+            self.manager.item_cache.invalidate(item_id)
     
         
 class PolicyManager:
@@ -160,62 +541,94 @@ class PolicyManager:
 
     def _get_endpoint(self):
         assert self.manager.token_config, "No token_config in GWManager"
-        return f"{ENDPOINT}/platform/{self.manager.token_config.project_name}/models/policies"
-
-    def add(self, policies_or_path:Union[str, list]):
-        policies = load_obj_or_path(policies_or_path)
-        validate_policies(policies)
+        return f"{self.manager.endpoint}/platform/{self.manager.token_config.project_name}/models/policies"
 
-        r = requests.post(
+    def _create(self, policies:list):
+        r = self.manager.transport.post(
             f"{self._get_endpoint()}",
-            headers=self.manager.token_config.auth_header(),
+            name="policies.create",
+            headers=self.manager.auth_header,
             json=policies
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+    def add(self, policies_or_path:Union[str, list], chunk_size:int = None, concurrency:int = 4, retries:int = 2, on_result:Callable[[ChunkResult], Any] = None, skip:Container[int] = ()) -> Union[list, BulkReport]:
+        """Validate and upload policies, pass `chunk_size` to stream them up in concurrent chunks (see `ItemManager.add`)"""
+        if chunk_size:
+            policies = iter_obj_or_path(policies_or_path, codec=self.manager.codec)
+            return run_chunks(self._create, policies, chunk_size=chunk_size, concurrency=concurrency, retries=retries, validate=validate_policies, limiter=self.manager.limiter, on_result=on_result, skip=skip)
+
+        policies = load_obj_or_path(policies_or_path, codec=self.manager.codec)
+        validate_policies(policies)
+
+        return self._create(policies)
 
     def list(self):
-        r = requests.get(
+        r = self.manager.transport.get(
             f"{self._get_endpoint()}",
-            headers=self.manager.token_config.auth_header()
+            name="policies.list",
+            headers=self.manager.auth_header
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
     
     def get(self, policy_id:str):
-        r = requests.get(
+        r = self.manager.transport.get(
             f"{self._get_endpoint()}/{policy_id}",
-            headers=self.manager.token_config.auth_header()
+            name="policies.get",
+            headers=self.manager.auth_header
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def update(self, policy_id:str, update:dict):
         validate_policies([update])
-        r = requests.put(
+        return self._update(policy_id, update)
+
+    def _update(self, policy_id:str, update:dict):
+        r = self.manager.transport.put(
             f"{self._get_endpoint()}/{policy_id}",
-            headers=self.manager.token_config.auth_header(),
+            name="policies.update",
+            headers=self.manager.auth_header,
             json=update
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def delete(self, policy_id:str):
-        r = requests.delete(
+        r = self.manager.transport.delete(
             f"{self._get_endpoint()}/{policy_id}",
-            headers=self.manager.token_config.auth_header()
+            name="policies.delete",
+            headers=self.manager.auth_header
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def enable(self, policy_id:str, enabled:bool):
-        r = requests.put(
+        r = self.manager.transport.put(
             f"{self._get_endpoint()}/{policy_id}/enable",
-            headers=self.manager.token_config.auth_header(),
+            name="policies.enable",
+            headers=self.manager.auth_header,
             json={"enabled": enabled}
         )
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
+
+    def update_many(self, updates:Union[dict[str, dict], Iterable[tuple[str, dict]]], concurrency:int = 8, on_result:Callable[[CallResult], Any] = None) -> "list[CallResult]":
+        """Apply many policy updates concurrently, returns one `CallResult` per policy id (see `ItemManager.update_many`)"""
+        pairs = updates.items() if isinstance(updates, dict) else updates
+        return _run_many(self.manager, self._update, _checked_entries(pairs, POLICY_SCHEMA), concurrency, on_result)
+
+    def delete_many(self, policy_ids:Iterable[str], concurrency:int = 8, on_result:Callable[[CallResult], Any] = None) -> "list[CallResult]":
+        """Delete many policies concurrently, returns one `CallResult` per unique policy id"""
+        entries = _checked_entries((policy_id, None) for policy_id in policy_ids)
+        return _run_many(self.manager, lambda policy_id, _: self.delete(policy_id), entries, concurrency, on_result)
+
+    def enable_many(self, policy_ids:Iterable[str], enabled:bool = True, concurrency:int = 8, on_result:Callable[[CallResult], Any] = None) -> "list[CallResult]":
+        """Enable (or with `enabled=False` disable) many policies concurrently, returns one `CallResult` per unique policy id"""
+        entries = _checked_entries((policy_id, None) for policy_id in policy_ids)
+        return _run_many(self.manager, lambda policy_id, _: self.enable(policy_id, enabled), entries, concurrency, on_result)
     
         
 class ModelManager:
@@ -227,48 +640,52 @@ class ModelManager:
 
     def _get_endpoint(self):
         assert self.manager.token_config, "No token_config set in GWManager"
-        return f"{ENDPOINT}/platform/{self.manager.token_config.project_name}/models"
+        return f"{self.manager.endpoint}/platform/{self.manager.token_config.project_name}/models"
 
     def get(self, model_id:str):
-        r = requests.get(
+        r = self.manager.transport.get(
             f"{self._get_endpoint()}/{model_id}",
-            headers=self.manager.token_config.auth_header()
+            name="models.get",
+            headers=self.manager.auth_header
         )
 
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def train(self, model_id:str=None):
         model = {"model_id": model_id} if model_id else {}
-        r = requests.post(
+        r = self.manager.transport.post(
             f"{self._get_endpoint()}/train",
-            headers=self.manager.token_config.auth_header(),
+            name="models.train",
+            headers=self.manager.auth_header,
             json=model
         )
         r.raise_for_status()
 
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def activate(self, model_id:str):
-        r = requests.post(
+        r = self.manager.transport.post(
             f"{self._get_endpoint()}/{model_id}/activate",
-            headers=self.manager.token_config.auth_header()
+            name="models.activate",
+            headers=self.manager.auth_header
         )
         r.raise_for_status()
 
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
     def list(self):
         assert self.manager.token_config, "No token_config in GWManager"
-        endpoint = f"{ENDPOINT}/hackathon/{self.manager.token_config.project_name}/model/list"
+        endpoint = f"{self.manager.endpoint}/hackathon/{self.manager.token_config.project_name}/model/list"
 
-        r = requests.get(
+        r = self.manager.transport.get(
             endpoint,
-            headers=self.manager.token_config.auth_header()
+            name="models.list",
+            headers=self.manager.auth_header
         )
 
         r.raise_for_status()
-        return r.json()
+        return self.manager.codec.loads(r.content)
 
 class DataManager:
     def __init__(
@@ -279,54 +696,143 @@ class DataManager:
 
     def _get_endpoint(self):
         assert self.manager.token_config, "No token_config in GWManager"
-        return f"{ENDPOINT}/hackathon/{self.manager.token_config.project_name}"
+        return f"{self.manager.endpoint}/hackathon/{self.manager.token_config.project_name}"
 
     def feed(self, payload:FeedPayload, session_id=None):
-        session_id = uuid4() if not session_id else session_id
-        r = requests.post(
-            f"{self._get_endpoint()}/feed/{session_id}",
-            headers=self.manager.token_config.auth_header(),
-            json=payload.dict()
-        )
-        r.raise_for_status()
-        return r.json()
-       
+        """Request a feed page, served from `manager.feed_cache` (when set) if the payload carries no events"""
+        if self.manager.feed_cache is None:
+            return self._feed(payload, session_id)
+
+        key = feed_key(payload, scope=self._get_endpoint())
+        return self.manager.feed_cache.call(key, lambda: self._feed(payload, session_id))
+
+    def _feed(self, payload:FeedPayload, session_id=None):
+        return self._post("feed", payload, session_id)
 
     def batch(self, payload:FeedPayload, session_id=None):
+        return self._post("batch", payload, session_id)
+
+    def _post(self, kind:str, payload:FeedPayload, session_id=None):
+        """POST `payload` to the `kind` endpoint, recording it to `manager.capture` when capturing
+
+        The body is written straight to bytes with `FeedPayload.encode`, without building a dict for the codec first
+        """
         session_id = uuid4() if not session_id else session_id
-        r = requests.post(
-            f"{self._get_endpoint()}/batch/{session_id}",
-            headers=self.manager.token_config.auth_header(),
-            json=payload.dict()
-        )
-        r.raise_for_status()
-        return r.json()
+        body = payload.encode()
+        capture = self.manager.capture
+        started = time.perf_counter()
+
+        try:
+            r = self.manager.transport.post(
+                f"{self._get_endpoint()}/{kind}/{session_id}",
+                name=f"data.{kind}",
+                headers={**self.manager.auth_header, "Content-Type": "application/json"},
+                data=body
+            )
+            r.raise_for_status()
+        except Exception as e:
+            if capture is not None:
+                capture.record(kind, session_id, body, started, error=e)
+            raise
+
+        if capture is not None:
+            capture.record(kind, session_id, body, started, response=r.content)
+        return self.manager.codec.loads(r.content)
+
+    def event_buffer(self, **kwargs) -> EventBuffer:
+        """Create an `EventBuffer` that coalesces events per session and flushes them through `self.batch`
+
+        `kwargs` are passed on to `EventBuffer` (`max_events`, `max_age`, `max_pending`, `on_error`)
+        """
+        def sink(session_id:str, visitor_id:str, events:list[Event]):
+            self.batch(FeedPayload(events=events), session_id=session_id)
+
+        return EventBuffer(sink, **kwargs)
 
     
     
+class _PendingRequest:
+    """A request waiting on its response, `sent` tracks whether the current socket has seen it"""
+    __slots__ = ("future", "message", "request_id", "sent")
+
+    def __init__(self, future:asyncio.Future, message:Union[str, bytes], request_id:str = None):
+        self.future = future
+        self.message = message
+        self.request_id = request_id
+        self.sent = False
+
+
 class WebSocketManager:
-    def __init__(self, manager:GWManager, timeout:int = 60, visitor:str = "DEFAULT"):
+    def __init__(self,
+        manager:GWManager,
+        timeout:int = 60,
+        visitor:str = "DEFAULT",
+        max_in_flight:int = 64,
+        request_timeout:float = 30,
+        heartbeat_timeout:float = 10,
+        reconnect:bool = True,
+        keep_session:bool = True,
+        replay:bool = True,
+        max_backoff:float = 30
+    ):
         """Websocket managing interface. Pass a reference to the controlling manager
-        and establish a `timeout` to determine when to call the ping method"""
+        and establish a `timeout` to determine when to call the ping method
+
+        Requests are multiplexed over the one socket: a background reader routes every incoming frame to the request
+        waiting on the same payload `id`, so many coroutines can have requests in flight at once. At most `max_in_flight`
+        requests are outstanding at a time and each one fails after `request_timeout` seconds without a response
+
+        Every `timeout` seconds a heartbeat ping is sent, a peer that does not answer within `heartbeat_timeout` is treated
+        as dead. With `reconnect` on, a dropped socket is re-established in the background with exponential backoff (capped
+        at `max_backoff` seconds), reusing the same session id when `keep_session` is set. Requests issued meanwhile are
+        queued until the socket is back, and with `replay` requests that were in flight when it dropped are sent again
+        """
         self.manager = manager
-        self.socket:ClientConnection = None
+        self.socket:"ClientConnection" = None
         self.visitor = visitor
         self.project_name = self.manager.project_config.project_name if self.manager.project_config else self.manager.token_config.project_name
 
         self._ping_timeout = timeout
+        self.request_timeout = request_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.reconnect = reconnect
+        self.keep_session = keep_session
+        self.replay = replay
+        self.max_backoff = max_backoff
+        self.reconnects = 0
+
+        # waiting requests by payload `id`, oldest first, requests sent without an `id` wait under `None`
+        self._pending: dict[str, deque[_PendingRequest]] = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._connected = asyncio.Event()
+        self._closed = False
+        self._reader_task: asyncio.Task = None
+        self._ping_task: asyncio.Task = None
+        self._reconnect_task: asyncio.Task = None
 
     async def _ping_job(self):
-        await asyncio.sleep(self._ping_timeout)
-        await self.send_ping()
+        """Heartbeat loop, a ping that goes unanswered closes the socket so the reader can reconnect"""
+        while True:
+            await asyncio.sleep(self._ping_timeout)
+
+            if not self._connected.is_set():
+                continue
+
+            socket = self.socket
+            try:
+                pong = await socket.ping()
+                await asyncio.wait_for(pong, self.heartbeat_timeout)
+            except Exception:
+                asyncio.ensure_future(socket.close())
         
     def set_visitor(self, visitor):
         self.visitor = visitor
 
     def _get_endpoint(self):
-        wss = ENDPOINT.replace("https", "wss")
+        wss = "ws" + self.manager.endpoint.removeprefix("http") # https -> wss, http -> ws
         return f"{wss}/ws/platform/feed/{self.project_name}/{self.visitor}"
     
-    def _convert_cards(self, socket_response:str) -> list[dict]:
+    def _convert_cards(self, socket_response:Union[str, bytes], lazy:bool = False) -> list[Union[dict, CardView]]:
         """Convert the slightly annoying product card format into the more easily usable item format
 
         We are given:
@@ -346,51 +852,449 @@ class WebSocketManager:
 
             if users need more information on the product they can call the items.get(id) to recieve
         }
+
+        With `lazy` each card is a `CardView` whose JSON `body` is only parsed when it is read. A response that is not
+        JSON is returned as text, like `_cards` does
         """
         try:
-            cards = json.loads(socket_response)
-            cards = cards['cards']
+            cards = self.manager.codec.loads(socket_response)
+        except ValueError:
+            cards = None
+
+        return self._cards(cards, socket_response, lazy=lazy)
 
-            cards = [{**card, "product": {**card['product'], 'body': card['product']['body']}} for card in cards]
+    def _cards(self, cards, socket_response:Union[str, bytes], lazy:bool = False) -> list[Union[dict, CardView]]:
+        """`_convert_cards` for a response that has already been decoded, a response that was not JSON is returned as text"""
+        if cards is None:
+            return socket_response.decode() if isinstance(socket_response, bytes) else socket_response
 
-            # the `id` field is useful for sending metrics back, `name` can be helpful for debug, and `description` contains the tool signature
-            return [{'id': card['product']['sku'], 'body': card['product']['body']} for card in cards]
-        except json.JSONDecodeError:
-            return socket_response
+        # the `id` field is useful for sending metrics back, `name` can be helpful for debug, and `description` contains the tool signature
+        # only `sku` and `body` are picked out of each card, nothing else is copied
+        if lazy:
+            loads = self.manager.codec.loads
+            return [CardView(product['sku'], product['body'], loads) for card in cards['cards'] for product in (card['product'],)]
+
+        return [{'id': product['sku'], 'body': product['body']} for card in cards['cards'] for product in (card['product'],)]
+
+    def iter_cards(self, socket_response:Union[str, bytes], lazy:bool = False) -> Iterator[Union[dict, CardView]]:
+        """Streaming `_convert_cards` for large card pages
+
+        Cards are decoded and yielded one at a time straight out of the raw response (e.g. from `send_message`),
+        so the whole page is never held as decoded objects and the first card is available before the last is parsed
+        """
+        loads = self.manager.codec.loads
+        for card in iter_json_field(socket_response, "cards"):
+            product = card['product']
+            yield CardView(product['sku'], product['body'], loads) if lazy else {'id': product['sku'], 'body': product['body']}
 
     async def initiate(self):
         """Create a websocket instance between client and PG"""
         self._active_session = str(uuid4())
-        self.socket = await connect(f"{self._get_endpoint()}/{self._active_session}", ping_timeout=None)
+        self._closed = False
+        await self._open()
         
         # Create the ping task to keep our socket alive for the forseeable future
         self._ping_task = asyncio.ensure_future(self._ping_job())
 
+    async def _open(self):
+        from websockets.asyncio.client import connect # only imported once a socket is actually opened
+
+        # keepalive is handled by `_ping_job`, so the library's own pings are turned off
+        self.socket = await connect(f"{self._get_endpoint()}/{self._active_session}", ping_interval=None, close_timeout=self.heartbeat_timeout)
+
+        # A single reader owns `recv()` and routes responses to whichever request is waiting on them
+        self._reader_task = asyncio.ensure_future(self._read_loop(self.socket))
+
+        # requests that were in flight when the last socket dropped go out first
+        for request in self._waiting():
+            await self.socket.send(request.message, text=True)
+            request.sent = True
+
+        self._connected.set()
+
+    async def _reconnect(self):
+        attempt = 0
+        while not self._closed:
+            try:
+                if not self.keep_session:
+                    self._active_session = str(uuid4())
+
+                await self._open()
+                self.reconnects += 1
+                return
+            except Exception:
+                delay = min(self.max_backoff, 0.1 * 2 ** attempt)
+                await asyncio.sleep(delay * random.uniform(0.5, 1))
+                attempt += 1
+
     def _cancel_ping(self):
         self._ping_task.cancel()
 
-    async def send_message(self, message:str):
-        """Simple message sending"""
-        if not self.socket:
+    @property
+    def connected(self) -> bool:
+        """Whether the socket is open, or being re-established in the background"""
+        return self.socket is not None and not self._closed
+
+    @property
+    def busy(self) -> bool:
+        """Whether any request is waiting on a response"""
+        return bool(self._pending)
+
+    async def close(self):
+        """Stop the background tasks and close the socket, waiting requests fail with `ConnectionError`"""
+        self._closed = True
+        for task in (self._ping_task, self._reconnect_task):
+            if task:
+                task.cancel()
+
+        if self.socket:
+            await self.socket.close()
+        if self._reader_task:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+        self._fail_pending(ConnectionError("Websocket connection closed before a response was received"))
+        self.socket = None
+
+    async def _read_loop(self, socket:"ClientConnection"):
+        try:
+            while True:
+                # raw frames are handed to the codec as bytes, skipping a utf-8 decode into `str`
+                self._dispatch(await socket.recv(decode=False))
+        except Exception:
+            pass # the socket is gone, handled below
+        finally:
+            if socket is self.socket:
+                self._connection_lost()
+
+    def _connection_lost(self):
+        self._connected.clear()
+
+        if self._closed or not self.reconnect:
+            self._closed = True
+            self._fail_pending(ConnectionError("Websocket connection closed before a response was received"))
             return
 
-        await self.socket.send(message)
+        for request in self._waiting():
+            if not request.sent:
+                continue
+
+            if self.replay:
+                request.sent = False
+            else:
+                self._forget(request)
+                request.future.set_exception(ConnectionError("Websocket connection dropped before a response was received"))
 
-        return await self.socket.recv()
+        if self._reconnect_task is None or self._reconnect_task.done():
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
 
-    async def send_json(self, payload:dict, convert_cards=True):
+    def _waiting(self) -> list[_PendingRequest]:
+        return [request for waiters in self._pending.values() for request in waiters]
+
+    def _forget(self, request:_PendingRequest):
+        """Stop waiting on `request`, a no-op when its response already arrived"""
+        waiters = self._pending.get(request.request_id)
+        if waiters is not None and request in waiters:
+            waiters.remove(request)
+            if not waiters:
+                del self._pending[request.request_id]
+
+    def _dispatch(self, message:bytes):
+        """Resolve the oldest request waiting on this response's `id`
+
+        Responses without an `id` only go to requests that were sent without one, so an id-less reply (a pong, an error
+        frame...) can never complete a request that is waiting on its own `id`
+        """
+        try:
+            response = self.manager.codec.loads(message)
+        except ValueError:
+            response = None
+
+        request_id = response.get("id") if isinstance(response, dict) else None
+
+        # an `id` nobody waits on belongs to a request that already timed out, drop it
+        waiters = self._pending.get(request_id)
+        if not waiters:
+            return
+
+        request = waiters.popleft()
+        if not waiters:
+            del self._pending[request_id]
+
+        if not request.future.done():
+            request.future.set_result((message, response))
+
+    def _fail_pending(self, error:Exception):
+        pending, self._pending = self._waiting(), {}
+        for request in pending:
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    async def _roundtrip(self, request:_PendingRequest):
+        # wait out a reconnect, the request may already have been replayed by the time the socket is back
+        await self._connected.wait()
+
+        if not request.sent:
+            request.sent = True
+            try:
+                await self.socket.send(request.message, text=True)
+            except Exception:
+                request.sent = False # the reader notices the drop and the request is replayed or failed
+
+        return await request.future
+
+    async def _request(self, message:Union[str, bytes], request_id:str = None, timeout:float = None, name:str = "websocket.send_message") -> tuple[bytes, object]:
+        """Send `message` and wait for its response, returns the raw response along with its decoded JSON
+
+        The round trip is recorded under `name` when the manager has `metrics`, and written to `capture` when capturing
+        """
+        if self._closed:
+            raise ConnectionError("Websocket connection is closed")
+
+        metrics, capture = self.manager.metrics, self.manager.capture
+        if metrics is None and capture is None:
+            return await self._exchange(message, request_id, timeout)
+
+        # a `str` message goes out utf-8 encoded, count what actually went over the wire
+        sent = len(message.encode() if isinstance(message, str) else message)
+        started = time.perf_counter()
+        try:
+            response = await self._exchange(message, request_id, timeout)
+        except Exception as e:
+            if metrics is not None:
+                metrics.record(Sample("websocket", name, "WS", time.perf_counter() - started, sent=sent, error=type(e).__name__))
+            if capture is not None:
+                capture.record("websocket", self._active_session, message, started, visitor=self.visitor, error=e)
+            raise
+
+        if metrics is not None:
+            metrics.record(Sample("websocket", name, "WS", time.perf_counter() - started, sent=sent, received=len(response[0])))
+        if capture is not None:
+            capture.record("websocket", self._active_session, message, started, visitor=self.visitor, response=response[0], decoded=response[1])
+        return response
+
+    async def _exchange(self, message:Union[str, bytes], request_id:str = None, timeout:float = None) -> tuple[bytes, object]:
+        async with self._slots:
+            # concurrent requests sharing an `id` (or all without one) are answered in the order they were sent
+            request = _PendingRequest(asyncio.get_running_loop().create_future(), message, request_id)
+            self._pending.setdefault(request_id, deque()).append(request)
+
+            try:
+                return await asyncio.wait_for(self._roundtrip(request), timeout if timeout else self.request_timeout)
+            finally:
+                self._forget(request)
+
+    def _check_open(self):
+        if self.socket is None or self._closed:
+            raise ConnectionError("Websocket is not connected, call `initiate()` first")
+
+    async def send_message(self, message:str, request_id:str = None, timeout:float = None):
+        """Simple message sending
+
+        Pass the payload's `request_id` so the response can be matched when several requests are in flight
+        """
+        self._check_open()
+
+        response, _ = await self._request(message, request_id=request_id, timeout=timeout)
+        return response.decode()
+
+    async def send_json(self, payload:Union[dict, WebsocketPayload], convert_cards=True, timeout:float = None, lazy_cards:bool = False):
         """Wrapper around the send_message function to send dictionary/json payloads
 
         convert_cards will call `self._convert_cards` on the returned data to simplify the datastructure before
-        use. By default this is **ON**
+        use. By default this is **ON**. Pass `lazy_cards=True` to get `CardView`s whose bodies are parsed on access.
+        With a `manager.feed_cache` set, converted responses to event-less payloads are shared between identical
+        requests on this visitor's session. `socket_pagination_request`s (the default `type`) are never cached, the
+        server answers each one with the next page
+
+        The payload `id` is used to match the response, so concurrent calls on one socket each get their own response.
+        A `WebsocketPayload` can be passed as is, it is then encoded straight to bytes without building a dict first
         """
-        response = await self.send_message(json.dumps(payload))
+        self._check_open()
+
+        if isinstance(payload, WebsocketPayload):
+            message, request_id = payload.encode(), payload.id
+        else:
+            message, request_id = self.manager.codec.dumps(payload), payload.get("id")
+
+        kind = payload.type if isinstance(payload, WebsocketPayload) else payload.get("type", "socket_pagination_request")
+        cache = self.manager.feed_cache
+        if cache is not None and convert_cards and kind != "socket_pagination_request":
+            # a raw response carries the `id` of whichever request fetched it, so only converted cards are shared
+            key = feed_key(payload, scope=f"ws/{self.project_name}/{self.visitor}/{self._active_session}")
+            response, decoded = await cache.acall(key, lambda: self._request(message, request_id=request_id, timeout=timeout, name="websocket.send_json"))
+        else:
+            response, decoded = await self._request(message, request_id=request_id, timeout=timeout, name="websocket.send_json")
 
         if convert_cards:
-            return self._convert_cards(response)
+            return self._cards(decoded, response, lazy=lazy_cards)
 
-        return response
+        return response.decode()
+
+    async def stream(self, prompt:str = "", events:list[Event] = None, prefetch:int = 1, max_pages:int = None, lazy_cards:bool = False, timeout:float = None) -> AsyncIterator[list[Union[dict, CardView]]]:
+        """Async generator yielding converted cards page by page for `prompt`
+
+            async for cards in manager.websocket.stream("running shoes", events=events):
+                ...
+
+        `events` go out with the first page request only. Every following `socket_pagination_request` asks the server
+        for its next page, `prefetch` of them are kept in flight ahead of the page being consumed so the consumer does
+        not wait a round trip between pages. The stream ends at the first empty page or after `max_pages`, and stopping
+        early (`break` or `aclose()`) cancels every outstanding prefetch. Pages bypass `manager.feed_cache`, since each
+        request is for a different page
+        """
+        assert prefetch >= 0, "`prefetch` can not be negative"
+        self._check_open()
+
+        async def fetch(events:list[Event]):
+            payload = WebsocketPayload(id=str(uuid4()), search_prompt=prompt, events=events)
+            response, decoded = await self._request(payload.encode(), request_id=payload.id, timeout=timeout, name="websocket.stream")
+            return self._cards(decoded, response, lazy=lazy_cards)
+
+        total = max_pages if max_pages is not None else float("inf")
+        pages = deque()
+        requested = 0
+
+        def request_more():
+            nonlocal requested
+            while len(pages) <= prefetch and requested < total:
+                pages.append(asyncio.ensure_future(fetch(events if requested == 0 and events else [])))
+                requested += 1
+
+        try:
+            request_more()
+            while pages:
+                cards = await pages.popleft()
+                if not isinstance(cards, list) or not cards:
+                    break
+
+                request_more()
+                yield cards
+        finally:
+            for task in pages:
+                task.cancel()
 
     async def send_ping(self):
         """Ping command to keep our connection alive"""
-        return await self.send_json({"type": "ping"})
+        return await self.send_json({"type": "ping"}, convert_cards=False)
+
+
+@dataclass
+class WebSocketPoolStats:
+    """Counters for a `WebSocketPool`
+
+    - `open` sockets currently held by the pool
+    - `connects` sockets opened over the pool's lifetime
+    - `evictions` idle sockets closed to stay within `max_size`
+    - `hits` / `misses` lookups served by an already open socket / that had to connect
+    """
+    open: int = 0
+    connects: int = 0
+    evictions: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    def dict(self):
+        return vars(self)
+
+
+class WebSocketPool:
+    def __init__(self, manager:GWManager, max_size:int = 128, **websocket_kwargs):
+        """Pool of live `WebSocketManager` connections keyed by visitor
+
+        Connections are opened lazily on a visitor's first request and reused afterwards. Once more than `max_size`
+        sockets are open the least recently used idle ones are closed, sockets with requests in flight (and the one just
+        opened) are never evicted, so the pool may briefly hold more than `max_size` sockets when all of them are busy.
+        `websocket_kwargs` are passed to every `WebSocketManager` the pool creates
+        """
+        assert max_size > 0, "Pool `max_size` must be a positive integer"
+        self.manager = manager
+        self.max_size = max_size
+        self.websocket_kwargs = websocket_kwargs
+
+        self._sockets: OrderedDict[str, WebSocketManager] = OrderedDict()
+        self._connecting: dict[str, asyncio.Task] = {}
+        self._stats = WebSocketPoolStats()
+
+    async def get(self, visitor:str) -> WebSocketManager:
+        """Return the open connection for `visitor`, connecting on first use"""
+        websocket = self._sockets.get(visitor)
+        if websocket is not None and websocket.connected:
+            self._sockets.move_to_end(visitor)
+            self._stats.hits += 1
+            return websocket
+
+        # concurrent first requests for a visitor share one connect
+        if visitor not in self._connecting:
+            self._stats.misses += 1
+            self._connecting[visitor] = asyncio.ensure_future(self._connect(visitor))
+
+        return await asyncio.shield(self._connecting[visitor])
+
+    async def _connect(self, visitor:str) -> WebSocketManager:
+        try:
+            stale = self._sockets.pop(visitor, None)
+            if stale is not None:
+                await stale.close()
+
+            websocket = WebSocketManager(self.manager, visitor=visitor, **self.websocket_kwargs)
+            await websocket.initiate()
+
+            self._sockets[visitor] = websocket
+            self._stats.connects += 1
+        finally:
+            del self._connecting[visitor]
+
+        await self._evict(keep=visitor)
+        return websocket
+
+    async def _evict(self, keep:str = None):
+        # the socket just opened for `keep` is about to be used, so while every other socket is busy the pool runs over
+        # `max_size` for a moment, the next connect evicts whatever went idle meanwhile
+        idle = [visitor for visitor, websocket in self._sockets.items() if not websocket.busy and visitor != keep]
+        closing = []
+
+        # `idle` is in least recently used order
+        for visitor in idle[:max(len(self._sockets) - self.max_size, 0)]:
+            closing.append(self._sockets.pop(visitor).close())
+            self._stats.evictions += 1
+
+        await asyncio.gather(*closing, return_exceptions=True)
+
+    async def send_json(self, visitor:str, payload:Union[dict, WebsocketPayload], **kwargs):
+        """`WebSocketManager.send_json` on `visitor`'s connection"""
+        websocket = await self.get(visitor)
+        return await websocket.send_json(payload, **kwargs)
+
+    def event_buffer(self, **kwargs) -> EventBuffer:
+        """Create an `EventBuffer` that flushes each visitor's events over that visitor's socket
+
+        Batches go out as `socket_event_request`s, which carry events without asking for a page of cards. Must be called
+        from inside the running event loop the pool is used on, and flushed or closed from that loop with
+        `aflush()` / `aclose()` (or `async with`), `kwargs` are passed on to `EventBuffer`
+        """
+        loop = asyncio.get_running_loop()
+
+        def sink(session_id:str, visitor_id:str, events:list[Event]):
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                # waiting on the loop from the loop itself would never return
+                raise RuntimeError("Flush a websocket `EventBuffer` with `aflush()` / `aclose()` from its event loop")
+
+            payload = WebsocketPayload(id=str(uuid4()), type="socket_event_request", events=events)
+            asyncio.run_coroutine_threadsafe(self.send_json(visitor_id, payload, convert_cards=False), loop).result()
+
+        return EventBuffer(sink, **kwargs)
+
+    async def close(self):
+        """Close every socket held by the pool"""
+        sockets, self._sockets = self._sockets, OrderedDict()
+        await asyncio.gather(*[websocket.close() for websocket in sockets.values()], return_exceptions=True)
+
+    def stats(self) -> WebSocketPoolStats:
+        return WebSocketPoolStats(**{**vars(self._stats), "open": len(self._sockets)})
+
+    def __len__(self):
+        return len(self._sockets)
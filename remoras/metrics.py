@@ -0,0 +1,176 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Callable
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+@dataclass(slots=True)
+class Sample:
+    """A single timed request, as handed to every metrics sink
+
+    - `kind` `"http"` or `"websocket"`
+    - `name` the operation, e.g. `"items.create"` or `"websocket.send_json"`
+    - `method` the HTTP method, `"WS"` for websocket requests
+    - `status` the HTTP status, `None` when no response came back
+    - `error` name of the exception raised, if any
+    """
+    kind: str
+    name: str
+    method: str
+    latency: float
+    sent: int = 0
+    received: int = 0
+    status: int | None = None
+    error: str | None = None
+
+    def dict(self):
+        return {
+            "kind": self.kind, "name": self.name, "method": self.method, "latency": self.latency,
+            "sent": self.sent, "received": self.received, "status": self.status, "error": self.error
+        }
+
+
+class Histogram:
+    def __init__(self, buckets:tuple[float, ...] = DEFAULT_BUCKETS):
+        """Fixed bucket latency histogram, `buckets` are the upper bounds in seconds"""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value:float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q:float) -> float:
+        """Estimate the `q` quantile by interpolating inside the bucket it falls in"""
+        if not self.count:
+            return 0.0
+
+        rank, seen = q * self.count, 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else lower
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+
+        return self.buckets[-1]
+
+    def dict(self):
+        return {"count": self.count, "sum": self.sum, "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99)}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    def __init__(self, buckets:tuple[float, ...] = DEFAULT_BUCKETS, sinks:list[Callable[[Sample], None]] = None):
+        """Latency, throughput and error metrics for every request a `GWManager` makes
+
+        Pass an instance as `GWManager(metrics=...)`. Every HTTP request is recorded under its operation name and
+        method with a latency histogram, request/response byte counts and error counts by status, websocket requests
+        are recorded the same way with their round-trip time. `snapshot()` returns everything as a dict and
+        `prometheus()` in the Prometheus text exposition format. Each `Sample` is also handed to every sink (see
+        `add_sink`), a sink that raises is counted in `sink_errors` and never fails the request.
+
+        Without a `Metrics` instance nothing is measured at all
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.sink_errors = 0
+
+        self._sinks = list(sinks or [])
+        self._lock = threading.Lock()
+        self._latency: dict[tuple[str, str, str], Histogram] = {}
+        self._sent: dict[tuple[str, str, str], int] = {}
+        self._received: dict[tuple[str, str, str], int] = {}
+        self._errors: dict[tuple[str, str, str, str], int] = {}
+
+    def add_sink(self, sink:Callable[[Sample], None]) -> None:
+        """Call `sink(sample)` for every request recorded from now on, e.g. to forward samples to StatsD or a log"""
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink:Callable[[Sample], None]) -> None:
+        self._sinks.remove(sink)
+
+    def record(self, sample:Sample) -> None:
+        key = (sample.kind, sample.name, sample.method)
+
+        with self._lock:
+            histogram = self._latency.get(key)
+            if histogram is None:
+                histogram = self._latency[key] = Histogram(self.buckets)
+            histogram.observe(sample.latency)
+
+            self._sent[key] = self._sent.get(key, 0) + sample.sent
+            self._received[key] = self._received.get(key, 0) + sample.received
+
+            if sample.error is not None or (sample.status is not None and sample.status >= 400):
+                error_key = (*key, str(sample.status) if sample.status is not None else sample.error)
+                self._errors[error_key] = self._errors.get(error_key, 0) + 1
+
+        for sink in self._sinks:
+            try:
+                sink(sample)
+            except Exception:
+                with self._lock:
+                    self.sink_errors += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latency.clear()
+            self._sent.clear()
+            self._received.clear()
+            self._errors.clear()
+
+    def snapshot(self) -> dict:
+        """Every series recorded so far, keyed by `"<kind> <name> <method>"`"""
+        with self._lock:
+            series = {
+                " ".join(key): {**histogram.dict(), "sent_bytes": self._sent[key], "received_bytes": self._received[key], "errors": {}}
+                for key, histogram in self._latency.items()
+            }
+            for (*key, status), count in self._errors.items():
+                series[" ".join(key)]["errors"][status] = count
+
+        return series
+
+    def prometheus(self, prefix:str = "remoras") -> str:
+        """Render every series in the Prometheus text exposition format (version 0.0.4)"""
+        with self._lock:
+            latency = {key: (list(histogram.counts), histogram.count, histogram.sum) for key, histogram in self._latency.items()}
+            sent, received, errors = dict(self._sent), dict(self._received), dict(self._errors)
+
+        lines = []
+        for kind, help_text in (("http", "HTTP request latency in seconds"), ("websocket", "Websocket request round-trip time in seconds")):
+            metric = f"{prefix}_{kind}_request_duration_seconds"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+
+            for (series_kind, name, method), (counts, count, total) in sorted(latency.items()):
+                if series_kind != kind:
+                    continue
+
+                cumulative = 0
+                for bound, bucket_count in zip((*self.buckets, "+Inf"), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{metric}_bucket{_labels(name=name, method=method, le=bound)} {cumulative}")
+                lines.append(f"{metric}_sum{_labels(name=name, method=method)} {total}")
+                lines.append(f"{metric}_count{_labels(name=name, method=method)} {count}")
+
+        for metric, help_text, values in ((f"{prefix}_sent_bytes_total", "Bytes sent", sent), (f"{prefix}_received_bytes_total", "Bytes received", received)):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f"{metric}{_labels(kind=kind, name=name, method=method)} {value}" for (kind, name, method), value in sorted(values.items())]
+
+        metric = f"{prefix}_errors_total"
+        lines += [f"# HELP {metric} Failed requests by status, or by exception when no response came back", f"# TYPE {metric} counter"]
+        lines += [f"{metric}{_labels(kind=kind, name=name, method=method, status=status)} {value}" for (kind, name, method, status), value in sorted(errors.items())]
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,195 @@
+"""Capture real feed traffic and replay it against a server for load testing
+
+Capture with `GWManager(capture=True)`, every websocket request and `data.feed`/`data.batch` call is then written with its
+timing to a gzipped JSONL file in `project_dir/captures`. Replay it against a local stand-in at 10x speed with 50 visitors:
+
+    python -m remoras.replay genius_project/captures/capture-20250101-120000.jsonl.gz --speed 10 --visitors 50
+
+or from code with `await replay(path, manager, speed=10, visitors=50)`
+"""
+from dataclasses import dataclass, field
+from typing import Union
+import argparse
+import asyncio
+import importlib.util
+import inspect
+import time
+
+from .codec import JSONCodec
+from .capture import iter_capture, error_label
+from .structs import FeedPayload
+from .manager import GWManager, WebSocketManager
+from .async_manager import AsyncGWManager
+
+
+def _percentile(values:list[float], q:float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(q * len(values)), len(values) - 1)]
+
+
+@dataclass
+class ReplayReport:
+    """Outcome of a `replay`
+
+    `latencies` holds the replayed round trips and `captured` the latencies originally recorded, both in seconds and
+    keyed by kind, `throughput` is requests per second over the whole replay
+    """
+    sessions: int = 0
+    requests: int = 0
+    errors: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+    latencies: dict[str, list[float]] = field(default_factory=dict, repr=False)
+    captured: dict[str, list[float]] = field(default_factory=dict, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return self.requests / self.elapsed if self.elapsed else 0.0
+
+    def percentiles(self, kind:str = None, captured:bool = False) -> dict:
+        """p50/p90/p99 in seconds for one kind of request, or all of them"""
+        source = self.captured if captured else self.latencies
+        values = source.get(kind, []) if kind else [value for values in source.values() for value in values]
+        return {"p50": _percentile(values, 0.5), "p90": _percentile(values, 0.9), "p99": _percentile(values, 0.99)}
+
+    def dict(self):
+        return {
+            "sessions": self.sessions, "requests": self.requests, "errors": self.errors, "elapsed": self.elapsed, "throughput": self.throughput,
+            "latency": {kind: {"count": len(values), **self.percentiles(kind), "captured": self.percentiles(kind, captured=True)} for kind, values in self.latencies.items()}
+        }
+
+
+def load_sessions(path:str, codec:Union[str, JSONCodec] = None) -> list[list[dict]]:
+    """Group the records of a capture by session, each session ordered by time"""
+    sessions: dict[tuple, list[dict]] = {}
+    for record in iter_capture(path, codec=codec):
+        family = "websocket" if record["kind"] == "websocket" else "http"
+        sessions.setdefault((family, record["visitor"], record["session"]), []).append(record)
+
+    return [sorted(records, key=lambda record: record["t"]) for records in sessions.values()]
+
+
+async def replay(capture:Union[str, list[list[dict]]], manager, speed:float = 1.0, visitors:int = 1, repeat:int = 1, timeout:float = None) -> ReplayReport:
+    """Replay captured sessions through `manager` and measure them
+
+    Sessions are handed out to `visitors` concurrent virtual visitors, each with its own websocket connection, and
+    every session is replayed `repeat` times. Within a session each request is sent at its captured offset divided by
+    `speed`, without waiting on earlier responses, so the captured concurrency is kept. `speed=0` sends every request
+    at once. `manager` may be a `GWManager` (HTTP calls then run in threads) or an `AsyncGWManager`
+    """
+    assert visitors > 0 and repeat > 0, "`visitors` and `repeat` must be positive"
+    sessions = load_sessions(capture, codec=manager.codec) if isinstance(capture, str) else capture
+    queue = asyncio.Queue()
+    for _ in range(repeat):
+        for session in sessions:
+            queue.put_nowait(session)
+
+    report = ReplayReport(sessions=queue.qsize())
+    for session in sessions:
+        for record in session:
+            report.captured.setdefault(record["kind"], []).extend([record["latency"]] * repeat)
+
+    async def call(fn, *args, **kwargs):
+        result = fn(*args, **kwargs) if inspect.iscoroutinefunction(fn) else asyncio.to_thread(fn, *args, **kwargs)
+        return await result
+
+    async def send(websocket, record:dict, at:float):
+        delay = at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        kind, request = record["kind"], record["request"]
+        started = time.perf_counter()
+        try:
+            if kind == "websocket":
+                await websocket.send_message(manager.codec.dumps(request).decode(), request_id=request.get("id"), timeout=timeout)
+            elif kind == "feed":
+                await call(manager.data.feed, FeedPayload(**request), session_id=record["session"])
+            else:
+                await call(manager.data.batch, FeedPayload(**request), session_id=record["session"])
+        except Exception as e:
+            error = error_label(e)
+            report.errors[error] = report.errors.get(error, 0) + 1
+        else:
+            report.latencies.setdefault(kind, []).append(time.perf_counter() - started)
+        report.requests += 1
+
+    async def visitor(number:int):
+        websocket = WebSocketManager(manager, visitor=f"replay-{number}", reconnect=False)
+
+        while not queue.empty():
+            session = queue.get_nowait()
+            uses_websocket = session[0]["kind"] == "websocket"
+            if uses_websocket:
+                try:
+                    await websocket.initiate()
+                except Exception as e:
+                    error = error_label(e)
+                    report.errors[error] = report.errors.get(error, 0) + len(session)
+                    report.requests += len(session)
+                    continue
+
+            origin, first = time.perf_counter(), session[0]["t"]
+            try:
+                await asyncio.gather(*[send(websocket, record, origin + (record["t"] - first) / speed if speed else origin) for record in session])
+            finally:
+                if uses_websocket:
+                    await websocket.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[visitor(number) for number in range(visitors)])
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def main(argv:list[str] = None):
+    from .structs import TokenConfig
+
+    parser = argparse.ArgumentParser(prog="python -m remoras.replay", description="Replay a captured traffic file")
+    parser.add_argument("capture", help="a capture file written with `GWManager(capture=True)`")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay this many times faster than captured, 0 for as fast as possible")
+    parser.add_argument("--visitors", type=int, default=1, help="concurrent virtual visitors")
+    parser.add_argument("--repeat", type=int, default=1, help="replay every session this many times")
+    parser.add_argument("--endpoint", help="replay against this API instead of starting a local stand-in")
+    parser.add_argument("--project", default="replay")
+    parser.add_argument("--token", default="replay")
+    parser.add_argument("--latency", type=float, default=0.0, help="latency the local stand-in adds to every request")
+    args = parser.parse_args(argv)
+
+    def run(endpoint:str) -> ReplayReport:
+        token = TokenConfig(project_name=args.project, token=args.token)
+        if importlib.util.find_spec("aiohttp") is None:
+            manager = GWManager.from_token(token, endpoint=endpoint, pool_size=args.visitors)
+            try:
+                return asyncio.run(replay(args.capture, manager, speed=args.speed, visitors=args.visitors, repeat=args.repeat))
+            finally:
+                manager.close()
+
+        async def run_async():
+            # HTTP calls share the event loop with the websockets instead of waiting on a thread
+            async with AsyncGWManager.from_token(token, endpoint=endpoint, pool_size=args.visitors) as manager:
+                return await replay(args.capture, manager, speed=args.speed, visitors=args.visitors, repeat=args.repeat)
+
+        return asyncio.run(run_async())
+
+    if args.endpoint:
+        report = run(args.endpoint)
+    else:
+        from .standin import StandinServer
+        with StandinServer(latency=args.latency).serve_in_thread() as endpoint:
+            report = run(endpoint)
+
+    print(f"{report.sessions} sessions, {report.requests} requests in {report.elapsed:.2f}s, {report.throughput:,.0f} requests/sec")
+    for kind, values in sorted(report.latencies.items()):
+        replayed, captured = report.percentiles(kind), report.percentiles(kind, captured=True)
+        print(
+            f"{kind:<10} {len(values):>8} ok   p50 {replayed['p50'] * 1000:>8.2f} ms   p99 {replayed['p99'] * 1000:>8.2f} ms"
+            f"   (captured p50 {captured['p50'] * 1000:.2f} ms, p99 {captured['p99'] * 1000:.2f} ms)"
+        )
+    for error, count in sorted(report.errors.items()):
+        print(f"error {error}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""Local stand-in for the productgenius API, for offline tests and benchmarks
+
+Implements the HTTP endpoints and the feed websocket used by `GWManager` on top of in-memory projects, with optional
+latency and error injection. Requires `aiohttp` (`pip install remoras[async]`)
+
+    python -m remoras.standin --port 8080 --latency 0.005 --error-rate 0.01
+
+then point a manager at it with `GWManager(..., endpoint="http://127.0.0.1:8080")` or `REMORAS_ENDPOINT`
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+from uuid import uuid4
+import argparse
+import asyncio
+import json
+import random
+import threading
+
+try:
+    from aiohttp import web, WSMsgType
+except ImportError:
+    web = None
+
+
+@dataclass
+class StandinStats:
+    """Counters for a `StandinServer`, `errors` counts the failures that were injected"""
+    requests: int = 0
+    messages: int = 0
+    errors: int = 0
+
+    def dict(self):
+        return vars(self)
+
+
+class _Project:
+    def __init__(self):
+        self.items: dict[str, dict] = {}
+        self.policies: dict[str, dict] = {}
+        self.models: dict[str, dict] = {}
+        self.settings: dict = {}
+        self.events = 0
+
+
+class StandinServer:
+    def __init__(self,
+        host:str = "127.0.0.1",
+        port:int = 0,
+        latency:float = 0.0,
+        jitter:float = 0.0,
+        error_rate:float = 0.0,
+        error_status:int = 503,
+        retry_after:float = None,
+        cards_per_page:int = 10,
+        seed:int = None
+    ):
+        """In-memory productgenius API
+
+        Every request and websocket message waits `latency` seconds plus up to `jitter` more. A share `error_rate` of
+        HTTP requests fail with `error_status` (with a `Retry-After` header when `retry_after` is set) and the same
+        share of websocket messages drop the connection. Websocket pagination serves `cards_per_page` cards per page
+        from the project's items, or from a synthetic catalog while the project has none, `socket_event_request`s are
+        only acknowledged. `port=0` picks a free port
+        """
+        if web is None:
+            raise ImportError("StandinServer requires `aiohttp`, install it with `pip install remoras[async]`")
+
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.cards_per_page = cards_per_page
+
+        self.projects: dict[str, _Project] = defaultdict(_Project)
+        self._random = random.Random(seed)
+        self._stats = StandinStats()
+        self._runner: "web.AppRunner" = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def stats(self) -> StandinStats:
+        return StandinStats(**vars(self._stats))
+
+    async def _delay(self):
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+
+    def _fail(self) -> bool:
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._stats.errors += 1
+            return True
+        return False
+
+    async def _inject(self, request:"web.Request", handler):
+        if request.path.startswith("/ws/"):
+            return await handler(request)
+
+        self._stats.requests += 1
+        await self._delay()
+
+        if self._fail():
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else None
+            return web.json_response({"detail": "Injected error"}, status=self.error_status, headers=headers)
+
+        if not request.path.endswith("/project/create") and not request.headers.get("Authorization", "").startswith("Bearer "):
+            return web.json_response({"detail": "Not authenticated"}, status=401)
+
+        return await handler(request)
+
+    def _project(self, request:"web.Request") -> _Project:
+        return self.projects[request.match_info["project"]]
+
+    @staticmethod
+    def _found(collection:dict, key:str):
+        if key not in collection:
+            raise web.HTTPNotFound(text=json.dumps({"detail": "Not found"}), content_type="application/json")
+        return collection[key]
+
+    def build_app(self) -> "web.Application":
+        @web.middleware
+        async def inject(request, handler):
+            return await self._inject(request, handler)
+
+        app = web.Application(middlewares=[inject], client_max_size=1 << 30)
+        ok = web.json_response
+
+        async def create_project(request):
+            body = await request.json()
+            project = self.projects[body["project_name"]]
+            project.settings.update(body)
+            return ok({"access_token": uuid4().hex})
+
+        async def update_project(request):
+            project = self._project(request)
+            project.settings.update(await request.json())
+            return ok(project.settings)
+
+        async def create_items(request):
+            items = self._project(request).items
+            created = [{**item, "id": item.get("id") or uuid4().hex} for item in await request.json()]
+            items.update((item["id"], item) for item in created)
+            return ok(created)
+
+        async def list_items(request):
+            page, count = int(request.query.get("page", 1)), int(request.query.get("count", 10))
+            items = list(self._project(request).items.values())
+            return ok(items[(page - 1) * count:page * count])
+
+        async def get_item(request):
+            return ok(self._found(self._project(request).items, request.match_info["id"]))
+
+        async def update_item(request):
+            items = self._project(request).items
+            self._found(items, request.match_info["id"])
+            items[request.match_info["id"]] = {**await request.json(), "id": request.match_info["id"]}
+            return ok(items[request.match_info["id"]])
+
+        async def delete_item(request):
+            self._found(self._project(request).items, request.match_info["id"])
+            del self._project(request).items[request.match_info["id"]]
+            return ok(True)
+
+        async def create_policies(request):
+            policies = self._project(request).policies
+            created = [{**policy, "id": uuid4().hex, "enabled": True} for policy in await request.json()]
+            policies.update((policy["id"], policy) for policy in created)
+            return ok(created)
+
+        async def list_policies(request):
+            return ok(list(self._project(request).policies.values()))
+
+        async def get_policy(request):
+            return ok(self._found(self._project(request).policies, request.match_info["id"]))
+
+        async def update_policy(request):
+            policy = self._found(self._project(request).policies, request.match_info["id"])
+            policy.update(await request.json())
+            return ok(policy)
+
+        async def delete_policy(request):
+            self._found(self._project(request).policies, request.match_info["id"])
+            del self._project(request).policies[request.match_info["id"]]
+            return ok(True)
+
+        async def enable_policy(request):
+            policy = self._found(self._project(request).policies, request.match_info["id"])
+            policy["enabled"] = (await request.json())["enabled"]
+            return ok(policy)
+
+        async def train_model(request):
+            body = await request.json() if request.can_read_body else {}
+            model = {"model_id": body.get("model_id") or uuid4().hex, "status": "trained", "active": False}
+            self._project(request).models[model["model_id"]] = model
+            return ok(model)
+
+        async def get_model(request):
+            return ok(self._found(self._project(request).models, request.match_info["id"]))
+
+        async def activate_model(request):
+            models = self._project(request).models
+            self._found(models, request.match_info["id"])
+            for model_id, model in models.items():
+                model["active"] = model_id == request.match_info["id"]
+            return ok(models[request.match_info["id"]])
+
+        async def list_models(request):
+            return ok(list(self._project(request).models.values()))
+
+        async def feed(request):
+            body = await request.json()
+            project = self._project(request)
+            project.events += len(body.get("events", []))
+
+            page, count = body.get("page", 1), body.get("batch_count", 10)
+            items = self._catalog(project)[(page - 1) * count:page * count]
+            return ok({"session_id": request.match_info["session"], "search_prompt": body.get("search_prompt", ""), "page": page, "items": items})
+
+        async def batch(request):
+            events = (await request.json()).get("events", [])
+            self._project(request).events += len(events)
+            return ok({"received": len(events)})
+
+        items = "/platform/project/{project}/items"
+        policies = "/platform/{project}/models/policies"
+        models = "/platform/{project}/models"
+
+        app.add_routes([
+            web.post("/hackathon/project/create", create_project),
+            web.put("/platform/project/{project}", update_project),
+
+            web.post(f"{items}/create", create_items),
+            web.get(f"{items}/list", list_items),
+            web.get(f"{items}/{{id}}", get_item),
+            web.put(f"{items}/{{id}}/update", update_item),
+            web.delete(f"{items}/{{id}}/delete", delete_item),
+
+            web.post(policies, create_policies),
+            web.get(policies, list_policies),
+            web.get(f"{policies}/{{id}}", get_policy),
+            web.put(f"{policies}/{{id}}", update_policy),
+            web.delete(f"{policies}/{{id}}", delete_policy),
+            web.put(f"{policies}/{{id}}/enable", enable_policy),
+
+            web.post(f"{models}/train", train_model),
+            web.get(f"{models}/{{id}}", get_model),
+            web.post(f"{models}/{{id}}/activate", activate_model),
+            web.get("/hackathon/{project}/model/list", list_models),
+
+            web.post("/hackathon/{project}/feed/{session}", feed),
+            web.post("/hackathon/{project}/batch/{session}", batch),
+
+            web.get("/ws/platform/feed/{project}/{visitor}/{session}", self._websocket),
+        ])
+        return app
+
+    def _catalog(self, project:_Project) -> list[dict]:
+        if project.items:
+            return list(project.items.values())
+        return [{"id": f"sku-{i}", "title": f"Item {i}", "description": "Synthetic stand-in item", "external_url": f"https://standin/{i}", "image_url": f"https://standin/{i}.png"} for i in range(100)]
+
+    async def _websocket(self, request:"web.Request"):
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+
+        project = self._project(request)
+        page = 0
+
+        async for message in socket:
+            if message.type != WSMsgType.TEXT:
+                continue
+
+            self._stats.messages += 1
+            await self._delay()
+
+            if self._fail():
+                await socket.close()
+                break
+
+            payload = json.loads(message.data)
+            if payload.get("type") == "ping":
+                await socket.send_str(json.dumps({"id": payload.get("id"), "type": "pong"}))
+                continue
+
+            project.events += len(payload.get("events") or [])
+            if payload.get("type") == "socket_event_request":
+                await socket.send_str(json.dumps({"id": payload.get("id"), "type": "ack"}))
+                continue
+
+            items = self._catalog(project)[page * self.cards_per_page:(page + 1) * self.cards_per_page]
+            page += 1
+
+            cards = [
+                {"type": "product", "id": item["id"], "source_id": "standin", "layout_state": {}, "product": {"sku": item["id"], "body": json.dumps(item)}}
+                for item in items
+            ]
+            await socket.send_str(json.dumps({"id": payload.get("id"), "cards": cards}))
+
+        return socket
+
+    async def start(self) -> str:
+        """Start serving on the running event loop, returns the base URL"""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.stop()
+
+    @contextmanager
+    def serve_in_thread(self) -> Iterator[str]:
+        """Run the server on its own event loop in a background thread, for use with the blocking `GWManager`
+
+            with StandinServer(latency=0.002).serve_in_thread() as url:
+                manager = GWManager.from_token(token, endpoint=url)
+        """
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="remoras-standin", daemon=True)
+        thread.start()
+
+        try:
+            yield asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+        finally:
+            asyncio.run_coroutine_threadsafe(self.stop(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+def main(argv:list[str] = None):
+    parser = argparse.ArgumentParser(prog="python -m remoras.standin", description="Local stand-in for the productgenius API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    server = StandinServer(
+        host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, error_status=args.error_status, retry_after=args.retry_after
+    )
+    web.run_app(server.build_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,78 @@
 from dataclasses import dataclass, field
 import os
 import json
+from json.encoder import encode_basestring_ascii as _encode_string
 from typing import Self
 
+from .codec import JSONCodec, DEFAULT_CODEC
+
 
 # Named dict for HTTPBasicAuth requirements
-@dataclass
+@dataclass(slots=True)
 class BasicAuth:
     username:str
     password:str
 
     @classmethod
-    def load(self, path:str):
+    def load(self, path:str, codec:JSONCodec = None):
         assert os.path.exists(path), "File path does not exist"
 
-        with open(path, 'r') as f:
-            auth = json.loads(f.read())
+        with open(path, 'rb') as f:
+            auth = (codec or DEFAULT_CODEC).loads(f.read())
 
         assert auth.get("username") and auth.get("password"), "Fields `username` and `password` were not found. Ensure both are present in your auth json file!"
 
         return BasicAuth(username=auth.get("username"), password=auth.get("password"))
 
     def dict(self):
-        return vars(self)
+        return {"username": self.username, "password": self.password}
 
 # Named dict for project management via a token
-@dataclass
+@dataclass(slots=True)
 class TokenConfig:
     token:str
     project_name:str
 
     @classmethod
-    def load(self, path:str):
+    def load(self, path:str, codec:JSONCodec = None):
         assert os.path.exists(path), "File path does not exist"
 
-        with open(path, 'r') as f:
-            token = json.loads(f.read())
+        with open(path, 'rb') as f:
+            token = (codec or DEFAULT_CODEC).loads(f.read())
 
         assert token.get("project_name") and token.get("token"), "Fields `project_name` and `token` were not found. Ensure both are present in your token json file!"
 
         return TokenConfig(project_name=token.get("project_name"), token=token.get("token"))
 
     def dict(self):
-        return vars(self)
+        return {"token": self.token, "project_name": self.project_name}
 
     def auth_header(self):
         return {"Authorization": f"Bearer {self.token}"}
 
 # Named dict for new project requirements
-@dataclass
+@dataclass(slots=True)
 class ProjectConfig:
     hacker_email:str
     project_name:str
     project_summary:str
     
     @classmethod
-    def load(self, path:str):
+    def load(self, path:str, codec:JSONCodec = None):
         assert os.path.exists(path), "File path does not exist"
 
-        with open(path, 'r') as f:
-            project = json.loads(f.read())
+        with open(path, 'rb') as f:
+            project = (codec or DEFAULT_CODEC).loads(f.read())
 
         assert project.get("project_name") and project.get("project_summary") and project.get("hacker_email"), "Fields `project_name` and `project_summary` and `hacker_email` were not found. Ensure both are present in your project json file!"
 
         return ProjectConfig(project_name=project.get("project_name"), project_summary=project.get("project_summary"), hacker_email=project.get("hacker_email"))
 
     def dict(self):
-        return vars(self)
+        return {"hacker_email": self.hacker_email, "project_name": self.project_name, "project_summary": self.project_summary}
 
 # Named dict for Feed/Batch endpoint payloads
-@dataclass
+@dataclass(slots=True)
 class FeedPayload:
     page:int = 1 
     batch_count:int = 10
@@ -77,11 +80,19 @@ class FeedPayload:
     search_prompt: str = ""
 
     def dict(self):
-        return vars(self)
+        events = [event.dict() if type(event) is Event else event for event in self.events]
+        return {"page": self.page, "batch_count": self.batch_count, "events": events, "search_prompt": self.search_prompt}
+
+    def encode(self) -> bytes:
+        """Serialize straight to compact JSON bytes, `events` may hold `Event`s or already built dicts"""
+        return (
+            f'{{"page":{_value(self.page)},"batch_count":{_value(self.batch_count)},'
+            f'"events":{_events(self.events)},"search_prompt":{_value(self.search_prompt)}}}'
+        ).encode()
 
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """Concrete wrapper for event system
 
@@ -118,6 +129,17 @@ class Event:
             }
         }
 
+    def _encode(self) -> str:
+        return (
+            f'{{"event":{_value(self.event)},"properties":{{"id":{_value(self.id)},'
+            f'"organization_id":{_value(self.organization_id)},"session_id":{_value(self.session_id)},'
+            f'"visitor_id":{_value(self.visitor_id)},"weight":{_value(self.weight)}}}}}'
+        )
+
+    def encode(self) -> bytes:
+        """Serialize straight to compact JSON bytes without building the intermediate `dict()`"""
+        return self._encode().encode()
+
     @classmethod
     def create(self,
                id:str,
@@ -128,7 +150,7 @@ class Event:
         return Event(id=id, organization_id=organization_id, session_id=session_id, visitor_id=visitor_id, weight=weight)
     
 
-@dataclass
+@dataclass(slots=True)
 class WebsocketPayload:
     """Create a websockey payload defined in API 2.0
 
@@ -149,5 +171,72 @@ class WebsocketPayload:
     events: list[Event] = field(default_factory=list)
 
     def dict(self):
-        return {**vars(self), "events": [event.dict() for event in self.events]}
+        return {"id": self.id, "type": self.type, "search_prompt": self.search_prompt, "events": [event.dict() for event in self.events]}
+
+    def encode(self) -> bytes:
+        """Serialize straight to compact JSON bytes without building the intermediate `dict()`"""
+        return (
+            f'{{"id":{_value(self.id)},"type":{_value(self.type)},'
+            f'"search_prompt":{_value(self.search_prompt)},"events":{_events(self.events)}}}'
+        ).encode()
+
+
+_UNPARSED = object()
+
+
+class CardView:
+    """Read-only view of a recommendation card
+
+    Holds the card's `id` (the product sku) and its `raw_body` exactly as PG sent it. `body` parses the raw JSON
+    body on first access only, so cards that are never looked into cost nothing beyond the view itself. Item access
+    (`card["id"]`, `card["body"]`) mirrors the plain `{"id", "body"}` card dicts
+    """
+    __slots__ = ("id", "raw_body", "_body", "_loads")
+
+    def __init__(self, id:str, raw_body, loads=json.loads):
+        self.id = id
+        self.raw_body = raw_body
+        self._body = _UNPARSED
+        self._loads = loads
+
+    @property
+    def body(self):
+        if self._body is _UNPARSED:
+            try:
+                self._body = self._loads(self.raw_body) if isinstance(self.raw_body, (str, bytes)) else self.raw_body
+            except ValueError: # not every body is JSON, hand those back untouched
+                self._body = self.raw_body
+        return self._body
+
+    def __getitem__(self, key:str):
+        if key == "id":
+            return self.id
+        if key == "body":
+            return self.raw_body
+        raise KeyError(key)
+
+    def dict(self):
+        return {"id": self.id, "body": self.raw_body}
+
+    def __repr__(self):
+        return f"CardView(id={self.id!r})"
+
+
+_dumps = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def _value(value) -> str:
+    # strings and ints are by far the most common values, only fall back to the full encoder for anything else
+    kind = type(value)
+    if kind is str:
+        return _encode_string(value)
+    if kind is int:
+        return int.__repr__(value)
+    if value is None:
+        return "null"
+    return _dumps(value)
+
+
+def _events(events: list) -> str:
+    return "[" + ",".join([event._encode() if type(event) is Event else _dumps(event) for event in events]) + "]"
     
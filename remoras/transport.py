@@ -0,0 +1,296 @@
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+import threading
+import json
+import time
+
+from .codec import JSONCodec, DEFAULT_CODEC
+from .metrics import Metrics, Sample
+
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
+# `requests` and `aiohttp` are imported on first use so `import remoras` stays cheap, see `test_import_time.py`
+
+
+@dataclass
+class TransportStats:
+    """Snapshot of how a `Transport` has been used
+
+    - `requests` number of HTTP requests issued
+    - `connections` number of TCP(+TLS) connections that had to be opened
+    - `reused` number of requests that went out over an already open connection
+    """
+    requests: int = 0
+    connections: int = 0
+
+    @property
+    def reused(self) -> int:
+        return max(self.requests - self.connections, 0)
+
+    @property
+    def reuse_ratio(self) -> float:
+        return self.reused / self.requests if self.requests else 0.0
+
+    def dict(self):
+        return {"requests": self.requests, "connections": self.connections, "reused": self.reused, "reuse_ratio": self.reuse_ratio}
+
+
+def _counting_pool(base, transport):
+    """Build a urllib3 pool class that reports every new connection back to `transport`"""
+    class CountingPool(base):
+        def _new_conn(self):
+            transport._count_connection()
+            return super()._new_conn()
+
+    return CountingPool
+
+
+@cache
+def _counting_adapter() -> type:
+    """The `HTTPAdapter` subclass counting new connections, built once `requests` is first needed"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class CountingAdapter(HTTPAdapter):
+        def __init__(self, transport, **kwargs):
+            self._transport = transport
+            super().__init__(**kwargs)
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": _counting_pool(HTTPConnectionPool, self._transport),
+                "https": _counting_pool(HTTPSConnectionPool, self._transport),
+            }
+
+    return CountingAdapter
+
+
+def import_aiohttp():
+    """Import `aiohttp`, which is only needed by the async client"""
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError("The async client requires `aiohttp`, install it with `pip install remoras[async]`") from None
+    return aiohttp
+
+
+def _encode_json(codec:JSONCodec, kwargs:dict) -> dict:
+    """Swap a `json=` argument for a body pre-encoded with `codec`, so the HTTP client never serializes it itself"""
+    if "json" in kwargs:
+        kwargs["data"] = codec.dumps(kwargs.pop("json"))
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), "Content-Type": "application/json"}
+    return kwargs
+
+
+def _sample(name:str, method:str, url:str, started:float, kwargs:dict, status:int = None, received:int = 0, error:Exception = None) -> Sample:
+    data = kwargs.get("data")
+    return Sample(
+        kind="http",
+        name=name or urlsplit(url).path,
+        method=method,
+        latency=time.perf_counter() - started,
+        sent=len(data) if isinstance(data, (bytes, str)) else 0,
+        received=received,
+        status=status,
+        error=type(error).__name__ if error is not None else None
+    )
+
+
+class Transport:
+    def __init__(self, pool_size:int = 10, timeout:float = 30, pool_block:bool = False, codec:JSONCodec = None, metrics:Metrics = None):
+        """Pooled HTTP transport shared by every sub-manager of a `GWManager`
+
+        A single keep-alive `requests.Session` is held so repeated calls reuse open connections
+        instead of paying for a new TCP+TLS handshake each time.
+
+        `pool_size` is the number of connections kept open per host, `timeout` is the default
+        timeout (seconds) applied to any request that does not set its own, and `pool_block`
+        makes callers wait for a free connection instead of opening throwaway ones when the pool is exhausted.
+        `codec` encodes every `json=` request body (see `remoras.codec`) and every request is recorded to `metrics`, if set
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pool_block = pool_block
+        self.codec = codec or DEFAULT_CODEC
+        self.metrics = metrics
+
+        self._lock = threading.Lock()
+        self._stats = TransportStats()
+        self._session: "requests.Session" = None
+
+    @property
+    def session(self) -> "requests.Session":
+        """The pooled session, created (and `requests` imported) on the first request"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+
+                    session = requests.Session()
+                    adapter = _counting_adapter()(self, pool_connections=self.pool_size, pool_maxsize=self.pool_size, pool_block=self.pool_block)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+
+        return self._session
+
+    def _count_connection(self):
+        with self._lock:
+            self._stats.connections += 1
+
+    def request(self, method:str, url:str, name:str = None, **kwargs) -> "requests.Response":
+        """Send a request, `name` labels it in `self.metrics` (the URL path is used otherwise)"""
+        kwargs.setdefault("timeout", self.timeout)
+        _encode_json(self.codec, kwargs)
+
+        with self._lock:
+            self._stats.requests += 1
+
+        if self.metrics is None:
+            return self.session.request(method, url, **kwargs)
+
+        started = time.perf_counter()
+        try:
+            r = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            self.metrics.record(_sample(name, method, url, started, kwargs, error=e))
+            raise
+
+        self.metrics.record(_sample(name, method, url, started, kwargs, status=r.status_code, received=len(r.content)))
+        return r
+
+    def get(self, url:str, **kwargs) -> "requests.Response":
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url:str, **kwargs) -> "requests.Response":
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url:str, **kwargs) -> "requests.Response":
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url:str, **kwargs) -> "requests.Response":
+        return self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> TransportStats:
+        """Return a copy of the current connection reuse statistics"""
+        with self._lock:
+            return TransportStats(requests=self._stats.requests, connections=self._stats.connections)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class ReadResponse:
+    """An `aiohttp.ClientResponse` whose body has already been read
+
+    aiohttp refuses to `read()` a response once its connection went back to the pool, so the body is kept here and
+    every other attribute (`status`, `headers`, `raise_for_status()`, ...) comes from the wrapped response
+    """
+    __slots__ = ("_response", "_body")
+
+    def __init__(self, response:"aiohttp.ClientResponse", body:bytes):
+        self._response = response
+        self._body = body
+
+    def __getattr__(self, name:str):
+        return getattr(self._response, name)
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self, encoding:str = "utf-8") -> str:
+        return self._body.decode(encoding)
+
+    async def json(self):
+        return json.loads(self._body)
+
+
+class AsyncTransport:
+    def __init__(self, pool_size:int = 100, timeout:float = 30, codec:JSONCodec = None, metrics:Metrics = None):
+        """Non-blocking twin of `Transport` built on an `aiohttp.ClientSession`
+
+        `pool_size` caps the number of open keep-alive connections and `timeout` is the default total
+        timeout (seconds) for a request. The session is created lazily on the first request so the
+        transport can be built outside of a running event loop. `codec` encodes every `json=` request body and every
+        request is recorded to `metrics`, if set
+        """
+        self._aiohttp = import_aiohttp()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.codec = codec or DEFAULT_CODEC
+        self.metrics = metrics
+
+        self._session: "aiohttp.ClientSession" = None
+        self._stats = TransportStats()
+
+    async def _on_connection(self, session, context, params):
+        self._stats.connections += 1
+
+    def _get_session(self) -> "aiohttp.ClientSession":
+        if self._session is None or self._session.closed:
+            aiohttp = self._aiohttp
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_end.append(self._on_connection)
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[trace]
+            )
+
+        return self._session
+
+    async def request(self, method:str, url:str, name:str = None, **kwargs) -> ReadResponse:
+        """Send a request and read the full body before handing the connection back to the pool
+
+        The returned response can still be used with `raise_for_status()` and `await r.read()`, `name` labels the
+        request in `self.metrics` (the URL path is used otherwise)
+        """
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None:
+            kwargs["timeout"] = self._aiohttp.ClientTimeout(total=timeout)
+        _encode_json(self.codec, kwargs)
+
+        self._stats.requests += 1
+
+        if self.metrics is None:
+            async with self._get_session().request(method, url, **kwargs) as r:
+                body = await r.read()
+            return ReadResponse(r, body)
+
+        started = time.perf_counter()
+        try:
+            async with self._get_session().request(method, url, **kwargs) as r:
+                body = await r.read()
+        except Exception as e:
+            self.metrics.record(_sample(name, method, url, started, kwargs, error=e))
+            raise
+
+        self.metrics.record(_sample(name, method, url, started, kwargs, status=r.status, received=len(body)))
+        return ReadResponse(r, body)
+
+    async def get(self, url:str, **kwargs) -> ReadResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url:str, **kwargs) -> ReadResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url:str, **kwargs) -> ReadResponse:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url:str, **kwargs) -> ReadResponse:
+        return await self.request("DELETE", url, **kwargs)
+
+    def stats(self) -> TransportStats:
+        return TransportStats(requests=self._stats.requests, connections=self._stats.connections)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
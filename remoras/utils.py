@@ -1,15 +1,259 @@
 import json
 import os
-from typing import Union
+import re
+from typing import Iterable, Iterator, Union
 
-def load_obj_or_path(obj: Union[list, str]):
-    """Check the type of `obj`. If it is a string treat it like a json filepath, else just return it"""
+from .codec import JSONCodec, DEFAULT_CODEC
+
+JSON_LINES_EXTENSIONS = (".jsonl", ".ndjson")
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\n\r"
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[ \t\n\r,\]}]')
+
+
+def load_obj_or_path(obj: Union[list, str], codec: JSONCodec = None):
+    """Check the type of `obj`. If it is a string treat it like a json filepath (decoded with `codec`), else just return it"""
     if type(obj) is str:
         assert os.path.exists(obj), f"Unable to find specified file at {obj}"
 
-        with open(obj, 'r') as f:
-            objs = json.loads(f.read())
+        if obj.endswith(JSON_LINES_EXTENSIONS):
+            return list(iter_obj_or_path(obj, codec=codec))
+
+        with open(obj, 'rb') as f:
+            objs = (codec or DEFAULT_CODEC).loads(f.read())
     else: # we have a list
         objs = obj
 
     return objs
+
+
+def _skip(buffer: str, index: int, chars: str) -> int:
+    while index < len(buffer) and buffer[index] in chars:
+        index += 1
+    return index
+
+
+class _ValueEnd:
+    """Finds where a JSON value that arrives in pieces ends, without decoding it
+
+    Fed one piece at a time, only brackets and quotes are looked at, so the pieces of a large value are each scanned
+    once before the value is decoded in a single pass
+    """
+    __slots__ = ("scalar", "depth", "in_string", "escaped")
+
+    def __init__(self, first: str):
+        self.scalar = first not in '[{"'
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> int:
+        """Offset in `text` just past the end of the value, or -1 when it continues in the next piece"""
+        if self.scalar:
+            match = _SCALAR_END.search(text)
+            return match.start() if match else -1
+
+        index = 0
+        while True:
+            if self.in_string:
+                if self.escaped:
+                    if index >= len(text):
+                        return -1
+                    index += 1
+                    self.escaped = False
+
+                match = _STRING_END.search(text, index)
+                if match is None:
+                    return -1
+                index = match.end()
+                if match.group() == "\\":
+                    self.escaped = True
+                    continue
+
+                self.in_string = False
+                if self.depth == 0:
+                    return index
+                continue
+
+            match = _STRUCTURE.search(text, index)
+            if match is None:
+                return -1
+            index = match.end()
+
+            char = match.group()
+            if char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return index
+
+
+def iter_json_values(chunks: Iterable[str]) -> Iterator:
+    """Incrementally decode JSON text arriving as `chunks` of any size
+
+    A top-level array yields its elements one at a time, anything else is treated as a stream of
+    whitespace separated values (JSON Lines, or concatenated objects) and yields each value. Only the
+    undecoded tail of the text is buffered, so memory stays bounded by the largest single value, and a value
+    spread over many chunks is only decoded once all of it has arrived
+    """
+    chunks = iter(chunks)
+    buffer, index, exhausted = "", 0, False
+    in_array, started = False, False
+    # inside an array: a `,` or `]` must follow each element, and an element must follow each `,`
+    separator_due, value_due = False, False
+
+    def fill():
+        # drop everything already decoded and append the next chunk
+        nonlocal buffer, index, exhausted
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer, index = buffer[index:] + chunk, 0
+
+    def complete():
+        # pull chunks until the value starting at `index` is whole, then join them once
+        nonlocal buffer, index, exhausted
+        scanner = _ValueEnd(buffer[index])
+        parts = [buffer[index:]]
+        found = scanner.feed(parts[0])
+        while found < 0:
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                break
+            parts.append(chunk)
+            found = scanner.feed(chunk)
+        buffer, index = "".join(parts), 0
+
+    while True:
+        index = _skip(buffer, index, _WHITESPACE)
+        if index >= len(buffer):
+            if exhausted:
+                break
+            fill()
+            continue
+
+        char = buffer[index]
+        if not started:
+            started = True
+            if char == "[":
+                in_array = True
+                index += 1
+                continue
+
+        if in_array:
+            if separator_due:
+                if char == "]":
+                    break
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, index)
+                separator_due, value_due = False, True
+                index += 1
+                continue
+            if char == "]" and not value_due:
+                break
+            if char in ",]":
+                raise json.JSONDecodeError("Expecting value", buffer, index)
+
+        try:
+            value, end = _decoder.raw_decode(buffer, index)
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+            complete()
+            value, end = _decoder.raw_decode(buffer, index)
+
+        # a bare number may still continue in the next chunk, only trust it once something follows it
+        if end >= len(buffer) and not exhausted and char not in '[{"':
+            fill()
+            continue
+
+        index = end
+        separator_due, value_due = in_array, False
+        yield value
+
+
+def iter_json_field(text: Union[str, bytes], field: str) -> Iterator:
+    """Yield the elements of the array stored under the top-level `field` of the JSON object in `text` one at a time
+
+    Sibling fields are stepped over, only one element of `field` is decoded at a time. Yields nothing if the
+    object has no such field or it is not an array. `bytes` are decoded once, after that the text is only ever read by
+    offset so the response is never copied again
+    """
+    if isinstance(text, bytes):
+        text = text.decode()
+
+    index = _skip(text, 0, _WHITESPACE)
+    if text[index:index + 1] != "{":
+        raise json.JSONDecodeError("Expecting object", text, index)
+    index += 1
+
+    while True:
+        index = _skip(text, index, _WHITESPACE + ",")
+        if text[index:index + 1] in ("}", ""):
+            return
+
+        key, index = _decoder.raw_decode(text, index)
+        index = _skip(text, index, _WHITESPACE)
+        if text[index:index + 1] != ":":
+            raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+        index = _skip(text, index + 1, _WHITESPACE)
+
+        if key == field:
+            if text[index:index + 1] == "[":
+                yield from _iter_array(text, index + 1)
+            return
+
+        _, index = _decoder.raw_decode(text, index)
+
+
+def _iter_array(text: str, index: int) -> Iterator:
+    """Elements of the JSON array whose opening `[` sits just before `index`"""
+    index = _skip(text, index, _WHITESPACE)
+    if text[index:index + 1] == "]":
+        return
+
+    while True:
+        value, index = _decoder.raw_decode(text, _skip(text, index, _WHITESPACE))
+        yield value
+
+        index = _skip(text, index, _WHITESPACE)
+        char = text[index:index + 1]
+        if char == "]":
+            return
+        if not char:
+            raise json.JSONDecodeError("Unterminated array", text, index)
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+        index += 1
+
+
+def iter_obj_or_path(obj: Union[Iterable, str], chunk_size: int = 1 << 20, codec: JSONCodec = None) -> Iterator:
+    """Lazy counterpart of `load_obj_or_path`
+
+    If `obj` is a filepath the file is read `chunk_size` characters at a time and its objects are yielded
+    as soon as they are decoded. Both JSON Lines files and files holding one large top-level array are
+    supported. When a `codec` is passed, JSON Lines files are instead read as bytes and decoded a line at a time
+    with it. Any other iterable is yielded from as is
+    """
+    if type(obj) is not str:
+        yield from obj
+        return
+
+    assert os.path.exists(obj), f"Unable to find specified file at {obj}"
+
+    if codec is not None and obj.endswith(JSON_LINES_EXTENSIONS):
+        loads = codec.loads
+        with open(obj, 'rb') as f:
+            yield from (loads(line) for line in f if not line.isspace())
+        return
+
+    with open(obj, 'r') as f:
+        yield from iter_json_values(iter(lambda: f.read(chunk_size), ""))
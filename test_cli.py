@@ -0,0 +1,120 @@
+from remoras.cli import main
+import pytest
+import json
+import os
+
+@pytest.fixture
+def cli(standin, tmp_path):
+    project_dir = tmp_path / "project"
+    project_dir.mkdir()
+    (project_dir / "token.json").write_text(json.dumps({"project_name": "test", "token": "123456789"}))
+
+    server, url = standin
+    return server, lambda *argv: main(["--project-dir", str(project_dir), "--endpoint", url, "-q", *argv])
+
+def test_cli_push_export_delete(cli, item, tmp_path):
+    server, run = cli
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text("\n".join(json.dumps(item(i)) for i in range(250)))
+
+    assert run("items", "push", str(catalog), "--chunk-size", "50") == 0
+    assert len(server.projects["test"].items) == 250
+    assert not os.listdir(tmp_path / "project" / "state"), "Checkpoint kept after a clean run"
+
+    export = tmp_path / "export.jsonl"
+    assert run("items", "export", str(export), "--page-size", "50") == 0
+    lines = export.read_bytes().splitlines(keepends=True)
+    assert len(lines) == 250
+
+    # an export interrupted mid page (and mid line) continues from the last whole page
+    export.write_bytes(b"".join(lines[:130]) + lines[130][:10])
+    assert run("items", "export", str(export), "--page-size", "50", "--resume") == 0
+    assert export.read_bytes().splitlines(keepends=True) == lines
+
+    ids = tmp_path / "ids.txt"
+    ids.write_text("\n".join(json.loads(line)["id"] for line in lines[:10] + lines[:2]))
+    assert run("items", "delete", str(ids)) == 0
+    assert len(server.projects["test"].items) == 240
+
+def test_cli_resume_after_failures(cli, item, tmp_path):
+    server, run = cli
+    catalog = tmp_path / "catalog.json"
+    catalog.write_text(json.dumps([item(i) for i in range(200)]))
+    report = tmp_path / "report.json"
+
+    server.error_rate, server.error_status = 0.5, 400 # client errors are not retried
+    assert run("items", "push", str(catalog), "--chunk-size", "20", "--retries", "0", "--report", str(report)) == 1
+
+    failures = json.loads(report.read_text())["failures"]
+    assert failures and all(failure["error"] and failure["count"] == 20 for failure in failures)
+    assert len(server.projects["test"].items) == 200 - 20 * len(failures)
+
+    server.error_rate = 0
+    assert run("items", "push", str(catalog), "--chunk-size", "20", "--resume") == 0
+    assert len(server.projects["test"].items) == 200, "Resuming sent chunks that were already uploaded"
+
+    # a checkpoint written with another chunk size would skip the wrong items
+    state = tmp_path / "state.json"
+    state.write_text(json.dumps({"identity": {"command": "items push", "chunk_size": 50}, "done": [0]}))
+    with pytest.raises(SystemExit):
+        run("items", "push", str(catalog), "--chunk-size", "20", "--resume", "--state", str(state))
+
+def test_cli_sync(cli, item, tmp_path):
+    server, run = cli
+    policies = tmp_path / "policies.json"
+    policies.write_text(json.dumps([{"policy": "Boost shoes"}, {"policy": "Hide hats"}]))
+    assert run("policies", "sync", str(policies)) == 0
+
+    policies.write_text(json.dumps([{"policy": "Boost shoes"}]))
+    assert run("policies", "sync", str(policies), "--dry-run") == 0
+    assert len(server.projects["test"].policies) == 2
+    assert run("policies", "sync", str(policies)) == 0
+    assert [policy["policy"] for policy in server.projects["test"].policies.values()] == ["Boost shoes"]
+
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text("\n".join(json.dumps(item(i)) for i in range(30)))
+    assert run("items", "sync", str(catalog)) == 0
+    assert run("items", "sync", str(catalog)) == 0
+    assert len(server.projects["test"].items) == 30
+
+def test_cli_sync_retries(cli, item, tmp_path, monkeypatch):
+    from remoras.manager import ItemManager
+
+    server, run = cli
+    calls = []
+    sync = ItemManager.sync
+    monkeypatch.setattr(ItemManager, "sync", lambda self, *args, **kwargs: calls.append(kwargs) or sync(self, *args, **kwargs))
+
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text("\n".join(json.dumps(item(i)) for i in range(3)))
+    assert run("items", "sync", str(catalog), "--retries", "5") == 0
+    assert calls[0]["retries"] == 5
+
+def test_cli_missing_token(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit:
+        main(["--project-dir", str(tmp_path), "items", "export"])
+    assert exit.value.code == 2 and "token.json not found" in capsys.readouterr().err
+
+def test_cli_bad_input(cli, item, tmp_path):
+    server, run = cli
+    report = tmp_path / "report.json"
+
+    policies = tmp_path / "policies.json"
+    policies.write_text(json.dumps([{"policy": "Boost shoes"}, {"rule": "no policy field"}]))
+    assert run("policies", "sync", str(policies), "--report", str(report)) == 1
+    assert "'policy' field was not found" in json.loads(report.read_text())["failures"][0]["error"]
+    assert not server.projects["test"].policies
+
+    catalog = tmp_path / "catalog.jsonl"
+    catalog.write_text("\n".join(json.dumps(record) for record in [item(0), {"title": "no other fields"}, item(2)]))
+    assert run("items", "sync", str(catalog), "--report", str(report)) == 1
+    assert "'description' field was not found" in json.dumps(json.loads(report.read_text())["failures"])
+
+    catalog.write_text(json.dumps(item(5)))
+    assert run("items", "push", str(catalog)) == 0
+    ids = tmp_path / "ids.jsonl"
+    kept = list(server.projects["test"].items)
+    ids.write_text("\n".join(json.dumps(record) for record in [{"id": kept[0]}, {"sku": "no id"}]))
+    assert run("items", "delete", str(ids), "--report", str(report)) == 1
+    assert [failure["key"] for failure in json.loads(report.read_text())["failures"]] == [None]
+    assert kept[0] not in server.projects["test"].items
@@ -0,0 +1,59 @@
+from remoras import GWManager, TokenConfig, JSONCodec, get_codec
+from remoras.codec import CODECS
+from remoras.utils import load_obj_or_path, iter_obj_or_path
+import pytest
+import json
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+TEST_ITEMS = [{"title": f"item {i}", "description": "café \"quoted\"", "external_url": f"https://x/{i}", "image_url": "d", "price": i * 1.5} for i in range(20)]
+
+def installed(name):
+    try:
+        return get_codec(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_codec_round_trip(name):
+    codec = installed(name)
+
+    encoded = codec.dumps(TEST_ITEMS)
+    assert type(encoded) is bytes, "Codecs must encode straight to bytes"
+    assert json.loads(encoded) == TEST_ITEMS, "Codec output is not valid JSON"
+    assert codec.loads(encoded) == codec.loads(encoded.decode()) == TEST_ITEMS
+
+    with pytest.raises(ValueError):
+        codec.loads(b"{not json")
+
+def test_get_codec():
+    assert isinstance(get_codec("auto"), JSONCodec)
+    assert get_codec().name == "json"
+
+    codec = JSONCodec()
+    assert get_codec(codec) is codec
+
+    with pytest.raises(AssertionError):
+        get_codec("yaml")
+
+@pytest.mark.parametrize("name", list(CODECS))
+def test_codec_loaders(name, tmp_path):
+    codec = installed(name)
+
+    lines_path = tmp_path / "items.jsonl"
+    lines_path.write_text("\n".join(json.dumps(item) for item in TEST_ITEMS) + "\n\n")
+    array_path = tmp_path / "items.json"
+    array_path.write_text(json.dumps(TEST_ITEMS))
+
+    assert list(iter_obj_or_path(str(lines_path), codec=codec)) == TEST_ITEMS
+    assert load_obj_or_path(str(array_path), codec=codec) == TEST_ITEMS
+
+def test_manager_codec():
+    installed("orjson")
+
+    manager = GWManager.from_token(TEST_TOKEN, codec="orjson")
+    assert manager.codec.name == "orjson" and manager.transport.codec is manager.codec, "Codec was not shared with the transport"
+
+    shared = GWManager.from_token(TEST_TOKEN, transport=manager.transport)
+    assert shared.codec is manager.codec, "A passed transport's codec should be used by default"
+
+    assert GWManager.from_token(TEST_TOKEN).codec.name == "json", "The standard library should be the default"
@@ -0,0 +1,42 @@
+from remoras import GeniusValidationError, validate_items, validate_instructions
+from remoras.data_validation import validate_policies, Schema
+import pytest
+import subprocess
+import sys
+
+TEST_ITEM = {"title": "a", "description": "b", "external_url": "c", "image_url": "d"}
+
+def test_valid_batches():
+    validate_items([TEST_ITEM] * 1000)
+    validate_items([TEST_ITEM], strict=True)
+    validate_instructions([{"promptlet": "a"}])
+    validate_policies([{"policy": "a"}])
+
+def test_collects_every_error():
+    items = [TEST_ITEM, {"title": "a"}, TEST_ITEM, "not an item", {**TEST_ITEM, "image_url": 5}]
+
+    with pytest.raises(GeniusValidationError) as e:
+        validate_items(items)
+
+    indexes = [index for index, _ in e.value.errors]
+    assert indexes == [1, 1, 1, 3], "Every missing field should be reported with its index"
+    assert "'description' field was not found inside of item" in e.value.errors[0][1]
+
+    with pytest.raises(GeniusValidationError) as e:
+        validate_items(items, strict=True)
+
+    assert e.value.errors[-1] == (4, "'image_url' field should be str, got int"), "Strict mode did not check types"
+
+def test_strict_lengths():
+    schema = Schema("item", {"title": str}, max_length=3)
+
+    assert not schema.errors([{"title": "abcdef"}]), "Length should only be checked in strict mode"
+    assert [error for _, error in schema.errors([{"title": "abcdef"}, {"title": ""}, {"title": "abc"}], strict=True)] == [
+        "'title' field is longer than 3 characters",
+        "'title' field is empty"
+    ]
+
+def test_validation_survives_optimize():
+    code = "from remoras.data_validation import validate_policies\ntry:\n    validate_policies([{}])\nexcept Exception as e:\n    print(type(e).__name__)"
+    output = subprocess.run([sys.executable, "-O", "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "GeniusValidationError", "Validation was skipped under `python -O`"
@@ -0,0 +1,111 @@
+from remoras import EventBuffer, Event, GWManager, TokenConfig
+import pytest
+import json
+import queue
+import requests
+import threading
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+
+def make_event(i, session):
+    return Event.create(id=str(i), organization_id="org", session_id=session, visitor_id=f"visitor-{session}", weight=1)
+
+def test_event_buffer_groups_and_flushes():
+    batches = []
+    lock = threading.Lock()
+
+    def sink(session_id, visitor_id, events):
+        with lock:
+            batches.append((session_id, visitor_id, events))
+
+    buffer = EventBuffer(sink, max_events=20, max_age=60)
+
+    def produce(worker):
+        for i in range(50):
+            buffer.add(make_event(i, f"s{(worker + i) % 5}"))
+
+    threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    buffer.close()
+
+    assert sum(len(events) for _, _, events in batches) == 500, "Events were lost on close"
+    assert all(len(events) <= 20 for _, _, events in batches), "A flush carried more than `max_events`"
+    assert all({event.session_id for event in events} == {session} and visitor == f"visitor-{session}" for session, visitor, events in batches)
+    assert len(batches) < 50, "Events were not coalesced"
+
+    stats = buffer.stats()
+    assert stats.added == stats.flushed == 500 and stats.pending == 0
+
+    with pytest.raises(RuntimeError):
+        buffer.add(make_event(0, "s0"))
+
+def test_event_buffer_age_and_backpressure():
+    flushed = threading.Event()
+    release = threading.Event()
+
+    def sink(session_id, visitor_id, events):
+        flushed.set()
+        release.wait(5)
+
+    buffer = EventBuffer(sink, max_events=2, max_age=0.05, max_pending=2)
+    buffer.add(make_event(0, "a"))
+    assert flushed.wait(2), "Aged group was not flushed"
+
+    buffer.add(make_event(1, "b"))
+    with pytest.raises(queue.Full):
+        buffer.add(make_event(2, "c"), block=False)
+
+    release.set()
+    buffer.add(make_event(3, "c"), timeout=2)
+    buffer.close()
+    assert buffer.stats().flushed == 3
+
+def test_event_buffer_survives_failing_error_handler():
+    sent = []
+
+    def sink(session_id, visitor_id, events):
+        if session_id == "bad":
+            raise ValueError("rejected")
+        sent.append(session_id)
+
+    def on_error(error, events):
+        raise RuntimeError("handler is broken too")
+
+    buffer = EventBuffer(sink, max_events=10, max_age=0.05, on_error=on_error)
+    buffer.add(make_event(0, "bad"))
+    buffer.add(make_event(1, "good"))
+    buffer.close(timeout=2)
+
+    assert not buffer._thread.is_alive() and sent == ["good"]
+    stats = buffer.stats()
+    assert (stats.flushed, stats.dropped, stats.pending) == (1, 1, 0)
+
+def test_data_manager_event_buffer(monkeypatch):
+    posts = []
+
+    def mock_request(session, method, url, **kwargs):
+        posts.append((url, json.loads(kwargs["data"])))
+
+        class Response:
+            content = b"true"
+
+            def raise_for_status(self):
+                return
+
+        return Response()
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+    manager = GWManager.from_token(TEST_TOKEN)
+
+    with manager.data.event_buffer(max_events=50, max_age=60) as buffer:
+        for i in range(120):
+            buffer.add(make_event(i, "session-1"))
+
+    assert len(posts) == 3, "Events were not batched through DataManager.batch"
+    assert all(url.endswith("/batch/session-1") for url, _ in posts)
+    assert sum(len(payload["events"]) for _, payload in posts) == 120
+    assert posts[0][1]["events"][0] == make_event(0, "session-1").dict(), "Events were not encoded like Event.dict()"
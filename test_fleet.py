@@ -0,0 +1,32 @@
+from remoras import GWFleet, GWManager, TokenConfig, Metrics
+
+def test_fleet(standin, item, tmp_path):
+    for name in ("alpha", "beta", "gamma"):
+        GWManager.from_token(TokenConfig(project_name=name, token=f"token-{name}"), project_dir=str(tmp_path / name)).save_token_config()
+
+    server, url = standin
+    with GWFleet.from_dir(str(tmp_path), endpoint=url, metrics=Metrics()) as fleet:
+        assert len(fleet) == 3 and fleet["beta"].project_dir == str(tmp_path / "beta")
+        assert all(manager.transport is fleet.transport and manager.limiter is fleet.limiter for manager in fleet)
+
+        report = fleet.add_items({"alpha": [item(i) for i in range(30)], "beta": [item(i) for i in range(10)]}, chunk_size=5)
+        assert report.ok and {name: bulk.succeeded for name, bulk in report.responses.items()} == {"alpha": 30, "beta": 10}
+        assert len(server.projects["alpha"].items) == 30 and "gamma" not in server.projects
+
+        report = fleet.sync_items([item(i) for i in range(5)], projects=["gamma"])
+        assert report.responses["gamma"].created == 5
+
+        assert fleet.train().ok
+        report = fleet.list_models()
+        assert {name: len(models) for name, models in report.responses.items()} == {"alpha": 1, "beta": 1, "gamma": 1}
+
+        def flaky(manager):
+            if manager.token_config.project_name == "beta":
+                raise RuntimeError("tenant offline")
+            return manager.items.list()
+
+        report = fleet.run(flaky)
+        assert not report.ok and report.errors == {"beta": "RuntimeError: tenant offline"} and set(report.responses) == {"alpha", "gamma"}
+
+        assert fleet.transport.stats().connections <= 32
+        assert fleet.metrics.snapshot()["http items.create POST"]["count"] == 6 + 2 + 1 # both uploads plus the sync
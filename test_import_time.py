@@ -0,0 +1,34 @@
+import remoras
+import pytest
+import json
+import subprocess
+import sys
+
+HEAVY = ("requests", "urllib3", "websockets", "aiohttp")
+
+def cold_import(statement):
+    """Run `statement` in a fresh interpreter, returns the modules it loaded among `HEAVY`, `asyncio` and `remoras.*`"""
+    script = (
+        "import sys, json\n"
+        f"{statement}\n"
+        f"print(json.dumps(sorted(name for name in sys.modules if name in {HEAVY + ('asyncio',)!r} or name.startswith('remoras.'))))"
+    )
+    return set(json.loads(subprocess.check_output([sys.executable, "-c", script])))
+
+def test_import_budget():
+    # what gets loaded is checked rather than wall-clock time, which depends too much on the machine
+    loaded = cold_import("import remoras")
+    assert not loaded & {*HEAVY, "asyncio"}, f"`import remoras` loaded {loaded & {*HEAVY, 'asyncio'}}"
+    assert not loaded & {"remoras.manager", "remoras.transport", "remoras.async_manager"}, f"`import remoras` loaded {loaded}"
+
+    loaded = cold_import("from remoras import GWManager, TokenConfig; GWManager.from_token(TokenConfig(project_name='a', token='b'))")
+    assert not loaded & set(HEAVY), f"Building a GWManager loaded {loaded & set(HEAVY)}"
+    assert "remoras.async_manager" not in loaded and "remoras.standin" not in loaded
+
+def test_lazy_exports():
+    assert "GWManager" in dir(remoras) and set(remoras.__all__) >= {"GWManager", "AsyncGWManager", "TokenConfig"}
+    from remoras.manager import GWManager
+    assert remoras.GWManager is GWManager
+
+    with pytest.raises(AttributeError):
+        remoras.NotAThing
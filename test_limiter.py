@@ -0,0 +1,132 @@
+from remoras import AdaptiveLimiter, GWManager, TokenConfig
+import pytest
+import asyncio
+import requests
+import threading
+import time
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+
+def http_error(status, retry_after=None):
+    response = requests.Response()
+    response.status_code = status
+    if retry_after is not None:
+        response.headers["Retry-After"] = str(retry_after)
+    return requests.HTTPError(f"{status} Error", response=response)
+
+def test_limiter_aimd():
+    limiter = AdaptiveLimiter(initial=4, max_limit=8, backoff=0)
+
+    for _ in range(40):
+        limiter.call(lambda: None)
+    assert limiter.limit == 8, "Limit did not grow on success"
+
+    # a whole burst of throttled calls that started together cuts the limit once
+    started = [limiter.acquire() for _ in range(4)]
+    for start in started:
+        limiter.release(start, http_error(429))
+    assert limiter.limit == 4 and limiter.stats().decreases == 1 and limiter.stats().throttled == 4
+
+    limiter.release(limiter.acquire(), http_error(404))
+    assert limiter.limit == 4, "A client error should not cut the limit"
+
+def test_limiter_retries():
+    limiter = AdaptiveLimiter(retries=2, backoff=0.001)
+    attempts = []
+
+    def flaky(status, times):
+        attempts.append(status)
+        if len(attempts) <= times:
+            raise http_error(status)
+        return "ok"
+
+    assert limiter.call(flaky, 429, 2) == "ok" and len(attempts) == 3, "Throttled calls should always be retried"
+
+    attempts.clear()
+    with pytest.raises(requests.HTTPError):
+        limiter.call(flaky, 503, 1)
+    assert len(attempts) == 1, "Non idempotent calls must not be retried on a 5xx"
+
+    attempts.clear()
+    assert limiter.call(flaky, 503, 1, idempotent=True) == "ok" and len(attempts) == 2
+    assert limiter.stats().retries == 3
+
+def test_limiter_interrupted_call():
+    limiter = AdaptiveLimiter(initial=1, max_limit=1)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        limiter.call(interrupted)
+    assert limiter.stats().in_flight == 0 and limiter.limit == 1, "An interrupted call leaked its slot"
+    assert limiter.call(lambda: "ok") == "ok"
+
+def test_limiter_retry_after():
+    limiter = AdaptiveLimiter(backoff=0)
+    calls = []
+
+    def throttled():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise http_error(429, retry_after=0.2)
+
+    limiter.call(throttled)
+    assert calls[1] - calls[0] >= 0.19, "Retry-After was not respected"
+    assert limiter.stats().paused == pytest.approx(0.2)
+
+def test_limiter_bounds_concurrency():
+    limiter = AdaptiveLimiter(initial=3, max_limit=3)
+    lock, state = threading.Lock(), {"now": 0, "peak": 0}
+
+    def work():
+        with lock:
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+        time.sleep(0.01)
+        with lock:
+            state["now"] -= 1
+
+    threads = [threading.Thread(target=limiter.call, args=(work,)) for _ in range(20)]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+    assert state["peak"] == 3, "Limiter let too many calls through"
+
+    async def run():
+        state["peak"] = 0
+
+        async def awork():
+            state["now"] += 1
+            state["peak"] = max(state["peak"], state["now"])
+            await asyncio.sleep(0.01)
+            state["now"] -= 1
+
+        await asyncio.gather(*[limiter.acall(awork) for _ in range(20)])
+        assert state["peak"] == 3 and limiter.stats().in_flight == 0
+
+    asyncio.run(run())
+
+def test_bulk_add_throttled(monkeypatch):
+    posts = []
+
+    def mock_request(session, method, url, **kwargs):
+        posts.append(url)
+        if len(posts) <= 5:
+            raise http_error(429, retry_after=0.01)
+
+        class Response:
+            content = kwargs["data"]
+
+            def raise_for_status(self):
+                return
+
+        return Response()
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+    manager = GWManager.from_token(TEST_TOKEN, limiter=AdaptiveLimiter(retries=5, backoff=0.001))
+
+    item = {"title": "a", "description": "b", "external_url": "c", "image_url": "d"}
+    report = manager.items.add([item] * 50, chunk_size=5, concurrency=4, retries=0)
+
+    assert report.ok and report.succeeded == 50, "Throttled chunks were not retried by the limiter"
+    assert manager.limiter.stats().throttled > 0
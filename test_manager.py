@@ -1,8 +1,11 @@
-from remoras import GWManager, BasicAuth, ProjectConfig, TokenConfig, FeedPayload, GeniusValidationError
+from remoras import GWManager, AsyncGWManager, BasicAuth, ProjectConfig, TokenConfig, FeedPayload, GeniusValidationError
 import pytest
 import requests
+import asyncio
 import os
 import shutil
+import json
+import time
 
 # Static Values
 TEST_AUTH = BasicAuth(username="a", password="b")
@@ -29,6 +32,10 @@ class MockBaseResponse():
     def raise_for_status():
         return
 
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
 class MockGetResponse(MockBaseResponse):
     @staticmethod
     def json():
@@ -51,6 +58,16 @@ class MockAuthToken(MockBaseResponse):
     def json():
         return {"access_token": "abc"}
 
+# Every sub-manager goes through the pooled `requests.Session` owned by `GWManager.transport`
+def mock_session(monkeypatch, handlers:dict):
+    def mock_request(session, method, url, **kwargs):
+        # `Transport` pre-encodes `json=` bodies with its codec, decode them so handlers can inspect the payload
+        if kwargs.get("data") is not None:
+            kwargs["json"] = json.loads(kwargs.pop("data"))
+        return handlers[method](url, **kwargs)
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+
 @pytest.fixture
 def mock_auth_response(monkeypatch):
     def mock_auth(*args, **kwargs):
@@ -59,8 +76,7 @@ def mock_auth_response(monkeypatch):
     def mock_put(*args, **kwargs):
         return MockMirrorResponse(kwargs["json"])
 
-    monkeypatch.setattr(requests, "post", mock_auth)
-    monkeypatch.setattr(requests, "put", mock_put)
+    mock_session(monkeypatch, {"POST": mock_auth, "PUT": mock_put})
 
 @pytest.fixture
 def mock_response(monkeypatch):
@@ -74,10 +90,7 @@ def mock_response(monkeypatch):
     def mock_delete(*args, **kwargs):
         return MockDeleteResponse()
 
-    monkeypatch.setattr(requests, "get", mock_get)
-    monkeypatch.setattr(requests, "post", mock_post)
-    monkeypatch.setattr(requests, "put", mock_post)
-    monkeypatch.setattr(requests, "delete", mock_delete)
+    mock_session(monkeypatch, {"GET": mock_get, "POST": mock_post, "PUT": mock_post, "DELETE": mock_delete})
 
 
 def test_invalid_construction(remove_project_dir):
@@ -172,3 +185,817 @@ def test_data_manager(mock_response):
 
     r = manager.data.batch(FeedPayload())
     assert r and "search_prompt" in r, "Batch not passed"
+
+def test_shared_transport(mock_response):
+    manager = GWManager.from_token(TEST_TOKEN, pool_size=4, timeout=5)
+
+    for sub_manager in (manager.items, manager.policies, manager.models, manager.data):
+        assert sub_manager.manager.transport is manager.transport, "Sub-managers do not share the root transport"
+
+    manager.items.list()
+    manager.policies.list()
+
+    stats = manager.transport.stats()
+    assert stats.requests == 2, "Transport did not count requests"
+
+    other = GWManager.from_token(TEST_TOKEN, transport=manager.transport)
+    assert other.transport is manager.transport, "Could not share a transport between managers"
+
+def test_transport_reuses_connections():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from remoras.transport import Transport
+    import threading
+
+    class KeepAliveHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = b'["ok"]'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            return
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    transport = Transport(pool_size=2, timeout=5)
+    try:
+        for _ in range(5):
+            r = transport.get(f"http://127.0.0.1:{server.server_port}/")
+            assert r.json() == ["ok"]
+
+        stats = transport.stats()
+        assert stats.requests == 5 and stats.connections == 1, f"Connections were not reused: {stats}"
+        assert stats.reused == 4
+    finally:
+        transport.close()
+        server.shutdown()
+
+# Mock the non-blocking transport used by `AsyncGWManager`
+class MockAsyncResponse(MockBaseResponse):
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+@pytest.fixture
+def mock_async_response(monkeypatch):
+    from remoras.transport import AsyncTransport
+
+    calls = {"in_flight": 0, "peak": 0}
+
+    async def mock_request(transport, method, url, **kwargs):
+        calls["in_flight"] += 1
+        calls["peak"] = max(calls["peak"], calls["in_flight"])
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            calls["in_flight"] -= 1
+        if method == "GET":
+            return MockAsyncResponse(["1", "2", "3"])
+        if method == "DELETE":
+            return MockAsyncResponse(True)
+        # feed/batch payloads arrive already encoded
+        return MockAsyncResponse(json.loads(kwargs["data"]) if "data" in kwargs else kwargs.get("json"))
+
+    monkeypatch.setattr(AsyncTransport, "request", mock_request)
+    return calls
+
+def test_async_manager(mock_async_response):
+    async def run():
+        async with AsyncGWManager.from_token(TEST_TOKEN) as manager:
+            r = await manager.items.add([TEST_ITEM])
+            assert r and TEST_ITEM in r, "Async item add not passed"
+
+            r = await manager.policies.enable("some_id", True)
+            assert r and r["enabled"], "Async policy enable not passed"
+
+            r = await manager.models.list()
+            assert r == ["1", "2", "3"], "Async model list not passed"
+
+            r = await manager.data.feed(FeedPayload())
+            assert r and "search_prompt" in r, "Async feed not passed"
+
+            report = await manager.items.add([TEST_ITEM] * 25, chunk_size=10, concurrency=2)
+            assert report.ok and report.items == 25 and len(report.chunks) == 3, "Async bulk add not passed"
+
+            # calls should overlap on a single event loop instead of running one after another
+            started = time.perf_counter()
+            results = await asyncio.gather(*[manager.items.get(str(i)) for i in range(200)])
+            assert len(results) == 200
+            assert mock_async_response["peak"] >= 50, f"Only {mock_async_response['peak']} calls were ever in flight at once"
+            assert time.perf_counter() - started < 1.0, "200 calls of 10ms each ran one after another"
+
+    asyncio.run(run())
+
+def test_async_manager_real_socket():
+    from aiohttp import web
+
+    async def run():
+        async def handle(request):
+            if request.method == "GET":
+                return web.json_response({"id": request.match_info["tail"]})
+            return web.json_response(await request.json())
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        try:
+            async with AsyncGWManager.from_token(TEST_TOKEN, pool_size=2, endpoint=f"http://127.0.0.1:{port}") as manager:
+                assert await manager.items.add([TEST_ITEM]) == [TEST_ITEM], "Async response body could not be read"
+                results = await asyncio.gather(*[manager.items.get(str(i)) for i in range(20)])
+                assert [result["id"] for result in results] == [f"platform/project/test/items/{i}" for i in range(20)]
+                assert manager.transport.stats().connections <= 2, "Async connections were not reused"
+
+                r = await manager.transport.get(f"http://127.0.0.1:{port}/raw")
+                assert await r.read() == b'{"id": "raw"}' and r.status == 200, "Body was lost once the connection went back to the pool"
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+def test_item_bulk_add(mock_response):
+    manager = GWManager.from_token(TEST_TOKEN)
+    items = [{**TEST_ITEM, "title": str(i)} for i in range(95)]
+
+    report = manager.items.add(items, chunk_size=10, concurrency=3)
+    assert report.ok and report.items == 95 and len(report.chunks) == 10, "Bulk upload did not cover every item"
+    assert [chunk.index for chunk in report.chunks] == list(range(10)), "Chunk results are not in upload order"
+    assert report.chunks[-1].count == 5 and report.chunks[-1].response == items[90:], "Last chunk was not sent correctly"
+    assert report.items_per_sec > 0
+
+def test_item_bulk_add_retries(monkeypatch):
+    attempts = {}
+
+    def flaky_post(url, **kwargs):
+        title = kwargs["json"][0]["title"]
+        attempts[title] = attempts.get(title, 0) + 1
+
+        if title == "0" and attempts[title] == 1:
+            raise requests.ConnectionError("dropped")
+        if title == "10":
+            raise requests.HTTPError("500 Server Error")
+        return MockMirrorResponse(kwargs["json"])
+
+    mock_session(monkeypatch, {"POST": flaky_post})
+    manager = GWManager.from_token(TEST_TOKEN)
+    items = [{**TEST_ITEM, "title": str(i)} for i in range(30)]
+
+    monkeypatch.setattr("remoras.bulk.time.sleep", lambda seconds: None)
+    report = manager.items.add(items, chunk_size=10, retries=1)
+    report_chunks = {chunk.start: chunk for chunk in report.chunks}
+
+    assert report_chunks[0].ok and report_chunks[0].attempts == 2, "Flaky chunk was not retried on its own"
+    assert not report_chunks[10].ok and report_chunks[10].attempts == 2, "Failing chunk was not reported"
+    assert report_chunks[20].ok and report_chunks[20].attempts == 1
+    assert report.succeeded == 20 and len(report.failed) == 1
+
+def test_item_bulk_add_stream(mock_response, tmp_path):
+    import json
+
+    items = [{**TEST_ITEM, "title": str(i)} for i in range(25)]
+    items[12] = {"title": "missing fields"}
+
+    path = tmp_path / "items.jsonl"
+    path.write_text("\n".join(json.dumps(item) for item in items))
+
+    manager = GWManager.from_token(TEST_TOKEN)
+    report = manager.items.add(str(path), chunk_size=10)
+
+    assert report.items == 25 and report.succeeded == 15, "Streamed upload did not cover every item"
+    assert report.chunks[1].error and report.chunks[1].attempts == 0, "Invalid chunk should be reported and never sent"
+
+    report = manager.policies.add(iter([{"policy": str(i)} for i in range(5)]), chunk_size=2)
+    assert report.ok and len(report.chunks) == 3, "Streamed policy upload not passed"
+
+CATALOG = [{**TEST_ITEM, "title": str(i)} for i in range(95)]
+
+def catalog_page(params):
+    start = (params["page"] - 1) * params["count"]
+    return CATALOG[start:start + params["count"]]
+
+def test_item_iter_all(monkeypatch):
+    import threading
+    import time
+
+    state = {"active": 0, "peak": 0, "pages": []}
+    lock = threading.Lock()
+
+    def mock_list(url, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            state["pages"].append(kwargs["params"]["page"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return MockMirrorResponse(catalog_page(kwargs["params"]))
+
+    mock_session(monkeypatch, {"GET": mock_list})
+    manager = GWManager.from_token(TEST_TOKEN)
+
+    assert list(manager.items.iter_all(page_size=10, prefetch=3)) == CATALOG, "iter_all did not walk every page in order"
+    assert state["peak"] > 1, "Pages were not prefetched in the background"
+
+    assert list(manager.items.iter_all(page_size=19, prefetch=0)) == CATALOG, "iter_all without prefetch did not walk every page"
+
+    first = next(iter(manager.items.iter_all(page_size=10, prefetch=2)))
+    assert first == CATALOG[0]
+
+def test_async_item_iter_all(monkeypatch):
+    from remoras.transport import AsyncTransport
+
+    async def mock_request(transport, method, url, **kwargs):
+        await asyncio.sleep(0.01)
+        return MockAsyncResponse(catalog_page(kwargs["params"]))
+
+    monkeypatch.setattr(AsyncTransport, "request", mock_request)
+
+    async def run():
+        async with AsyncGWManager.from_token(TEST_TOKEN) as manager:
+            items = [item async for item in manager.items.iter_all(page_size=10, prefetch=4)]
+            assert items == CATALOG, "Async iter_all did not walk every page in order"
+
+            stream = manager.items.iter_all(page_size=10, prefetch=4)
+            assert await anext(stream) == CATALOG[0]
+            await stream.aclose()
+
+    asyncio.run(run())
+
+def test_cache_eviction():
+    from remoras import TTLCache
+
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1 # `a` is now the most recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None and cache.get("c") == 3, "Least recently used entry was not evicted"
+
+    now[0] = 11
+    assert cache.get("a") is None, "Expired entry was served"
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.expirations, stats.size) == (2, 2, 1, 1, 1)
+
+def test_item_cache(monkeypatch):
+    from remoras import TTLCache
+
+    calls = []
+
+    def mock_get(url, **kwargs):
+        calls.append(url)
+        return MockMirrorResponse({"url": url})
+
+    def mock_put(url, **kwargs):
+        return MockMirrorResponse(kwargs["json"])
+
+    mock_session(monkeypatch, {"GET": mock_get, "PUT": mock_put, "DELETE": lambda url, **kwargs: MockDeleteResponse()})
+    manager = GWManager.from_token(TEST_TOKEN, item_cache=TTLCache(maxsize=10, ttl=60))
+
+    first = manager.items.get("sku-1")
+    assert manager.items.get("sku-1") == first and len(calls) == 1, "Cached item was fetched again"
+
+    manager.items.update("sku-1", TEST_ITEM)
+    manager.items.get("sku-1")
+    assert len(calls) == 2, "Update did not invalidate the cached item"
+
+    manager.items.delete("sku-1")
+    manager.items.get("sku-1")
+    assert len(calls) == 3, "Delete did not invalidate the cached item"
+
+    stats = manager.item_cache.stats()
+    assert stats.hits == 1 and stats.misses == 3 and stats.invalidations == 2
+
+def test_feed_cache(monkeypatch):
+    from remoras import FeedCache, Event
+    from concurrent.futures import ThreadPoolExecutor
+    import threading
+    import time
+
+    calls = []
+    release = threading.Event()
+
+    def mock_post(url, **kwargs):
+        calls.append(kwargs["json"])
+        release.wait(2)
+        return MockMirrorResponse({"cards": [kwargs["json"]["search_prompt"]]})
+
+    mock_session(monkeypatch, {"POST": mock_post})
+    manager = GWManager.from_token(TEST_TOKEN, feed_cache=FeedCache(maxsize=10, ttl=60))
+
+    # identical requests in flight at the same time share one upstream call
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(manager.data.feed, FeedPayload(search_prompt="running  shoes")) for _ in range(8)]
+        time.sleep(0.1)
+        release.set()
+        responses = [future.result() for future in futures]
+
+    assert len(calls) == 1 and all(response == {"cards": ["running  shoes"]} for response in responses), "Concurrent requests were not coalesced"
+
+    assert manager.data.feed(FeedPayload(search_prompt=" running shoes ")) == responses[0], "Normalized prompt missed the cache"
+    manager.data.feed(FeedPayload(search_prompt="running shoes", page=2))
+    event = Event.create(id="sku", organization_id="org", session_id="s", visitor_id="v", weight=1)
+    manager.data.feed(FeedPayload(search_prompt="running shoes", events=[event.dict()]))
+    assert len(calls) == 3, "Other pages and payloads with events should go upstream"
+
+    stats = manager.feed_cache.stats()
+    assert (stats.hits, stats.coalesced, stats.misses, stats.uncacheable) == (1, 7, 2, 1)
+    assert stats.hit_ratio == 0.8 and stats.saved_latency > 0
+
+def test_websocket_feed_cache(monkeypatch):
+    from remoras import FeedCache
+    from remoras.manager import WebSocketManager
+    import json
+
+    received = []
+
+    async def handler(socket):
+        async for message in socket:
+            payload = json.loads(message)
+            received.append(payload)
+            await asyncio.sleep(0.05)
+            await socket.send(json.dumps(card_response(payload["id"], f"sku-{payload['search_prompt']}")))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN, feed_cache=FeedCache(ttl=60))
+        await manager.websocket.initiate()
+
+        try:
+            payloads = [{"id": str(i), "type": "socket_recommendation_request", "search_prompt": "a", "events": []} for i in range(10)]
+            responses = await asyncio.gather(*[manager.websocket.send_json(payload) for payload in payloads])
+            assert len(received) == 1 and all(cards == [{"id": "sku-a", "body": "{}"}] for cards in responses), "Identical requests were not coalesced"
+
+            await manager.websocket.send_json({"id": "late", "type": "socket_recommendation_request", "search_prompt": "a", "events": []})
+            raw = await manager.websocket.send_json({"id": "raw", "type": "socket_recommendation_request", "search_prompt": "a", "events": []}, convert_cards=False)
+            assert len(received) == 2 and json.loads(raw)["id"] == "raw", "Raw responses must not be shared"
+
+            # a waiter timing out must not cancel the shared request for everyone else
+            slow = asyncio.ensure_future(manager.websocket.send_json({"id": "b1", "type": "socket_recommendation_request", "search_prompt": "b", "events": []}))
+            await asyncio.sleep(0)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(manager.websocket.send_json({"id": "b2", "type": "socket_recommendation_request", "search_prompt": "b", "events": []}), 0.01)
+            assert await slow == [{"id": "sku-b", "body": "{}"}]
+
+            # pagination requests ask for the next page every time, they are never shared
+            page = {"id": "p", "type": "socket_pagination_request", "search_prompt": "a", "events": []}
+            await manager.websocket.send_json(page)
+            await manager.websocket.send_json({k: v for k, v in page.items() if k != "type"})
+            assert len(received) == 5, "Pagination requests were served from the cache"
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+        stats = manager.feed_cache.stats()
+        assert (stats.hits, stats.coalesced, stats.misses) == (1, 10, 2)
+
+    asyncio.run(run())
+
+def test_item_sync(monkeypatch, tmp_path):
+    server = {}
+    calls = []
+
+    def mock_create(url, **kwargs):
+        calls.append("create")
+        created = [{**item, "id": f"id-{item['external_url']}"} for item in kwargs["json"]]
+        server.update({item["id"]: item for item in created})
+        return MockMirrorResponse(created)
+
+    def mock_update(url, **kwargs):
+        calls.append("update")
+        item_id = url.split("/")[-2]
+        server[item_id] = {**kwargs["json"], "id": item_id}
+        return MockMirrorResponse(server[item_id])
+
+    def mock_delete(url, **kwargs):
+        calls.append("delete")
+        del server[url.split("/")[-2]]
+        return MockDeleteResponse()
+
+    mock_session(monkeypatch, {"POST": mock_create, "PUT": mock_update, "DELETE": mock_delete})
+    manager = GWManager.from_token(TEST_TOKEN, project_dir=str(tmp_path))
+    catalog = [{**TEST_ITEM, "external_url": f"url-{i}"} for i in range(100)]
+
+    report = manager.items.sync(catalog, chunk_size=40)
+    assert report.ok and report.created == 100 and report.requests == 3 and len(server) == 100, "Initial sync did not create every item"
+    assert os.path.exists(tmp_path / "items_manifest.json"), "Manifest was not written to the project_dir"
+
+    calls.clear()
+    report = manager.items.sync(catalog)
+    assert report.unchanged == 100 and not calls, "Unchanged catalog should not send anything"
+
+    catalog[3] = {**catalog[3], "title": "changed"}
+    catalog.pop(7)
+    catalog.append({**TEST_ITEM, "external_url": "url-new"})
+
+    assert manager.items.sync(catalog, dry_run=True).dict()["updated"] == 1 and not calls, "Dry run should not send anything"
+
+    report = manager.items.sync(catalog)
+    assert (report.created, report.updated, report.deleted, report.unchanged) == (1, 1, 1, 98)
+    assert sorted(calls) == ["create", "delete", "update"], "Only the changed items should be sent"
+    assert server["id-url-3"]["title"] == "changed" and "id-url-7" not in server and "id-url-new" in server
+
+    # invalid items are reported one by one and left alone, the rest of the catalog still syncs
+    catalog[0] = {"external_url": "url-0", "title": "no other fields"}
+    catalog[60] = {**catalog[60], "title": "changed too"}
+    catalog.append({"title": "no url"})
+    calls.clear()
+    report = manager.items.sync(catalog, chunk_size=40)
+    assert [(failure["index"], failure["key"], failure["action"]) for failure in report.failures] == [(0, "url-0", "validate"), (100, None, "validate")]
+    assert "'description' field was not found" in report.failures[0]["error"]
+    assert report.updated == 1 and report.deleted == 0 and calls == ["update"], "An invalid item stopped the sync or was deleted"
+    assert "id-url-0" in server and server["id-url-61"]["title"] == "changed too"
+
+def test_item_sync_resolves_ids(monkeypatch, tmp_path):
+    server = {}
+
+    def mock_create(url, **kwargs):
+        for item in kwargs["json"]:
+            server[f"id-{len(server)}"] = item
+        return MockMirrorResponse({"created": len(kwargs["json"])}) # no ids echoed back
+
+    def mock_list(url, **kwargs):
+        page, count = kwargs["params"]["page"], kwargs["params"]["count"]
+        # one item went missing server side, its id can not be resolved
+        listed = [{**item, "id": item_id} for item_id, item in server.items() if item["external_url"] != "url-2"]
+        return MockMirrorResponse(listed[(page - 1) * count:page * count])
+
+    mock_session(monkeypatch, {"POST": mock_create, "GET": mock_list})
+    manager = GWManager.from_token(TEST_TOKEN, project_dir=str(tmp_path))
+    catalog = [{**TEST_ITEM, "external_url": f"url-{i}"} for i in range(5)] + [{**TEST_ITEM, "external_url": "url-1"}]
+
+    report = manager.items.sync(catalog)
+    assert [(failure["key"], failure["index"], failure["action"]) for failure in report.failures[:1]] == [("url-1", 5, "create")]
+    assert [(failure["key"], failure["action"]) for failure in report.failures[1:]] == [("url-2", "create")]
+
+    manifest = json.loads((tmp_path / "items_manifest.json").read_text())
+    assert sorted(manifest) == ["url-0", "url-1", "url-3", "url-4"] and manifest["url-3"]["id"] == "id-3"
+    assert all(entry["id"] is not None for entry in manifest.values()), "Manifest recorded an item without an id"
+
+def test_many(standin, item):
+    server, url = standin
+    manager = GWManager.from_token(TEST_TOKEN, endpoint=url)
+    ids = [created["id"] for created in manager.items.add([item(i) for i in range(20)])]
+
+    updates = {item_id: {**item(i), "title": f"Sale {i}"} for i, item_id in enumerate(ids[:10])}
+    updates["missing"] = item(99)
+    results = manager.items.update_many([*updates.items(), (ids[10], {"title": "no other fields"}), ("", item(0)), (ids[0], item(0))], concurrency=4)
+
+    assert [result.key for result in results] == [*updates, ids[10], "", ids[0]], "Results are not in input order"
+    assert all(result.ok for result in results[:10]) and server.projects["test"].items[ids[3]]["title"] == "Sale 3"
+    assert "404" in results[10].error
+    assert [result.error.split(":")[0] for result in results[11:]] == ["GeniusValidationError"] * 3
+    assert "'description' field was not found" in results[11].error and "appears more than once" in results[13].error
+
+    seen = []
+    results = manager.items.delete_many(iter(ids[15:] + [ids[15], "missing", ids[16]]), on_result=seen.append)
+    assert [result.key for result in results] == ids[15:] + ["missing"], "Repeated ids were not dropped"
+    assert [result.ok for result in results] == [True] * 5 + [False] and len(seen) == 6
+    assert len(server.projects["test"].items) == 15
+
+    def stream():
+        for i in range(600):
+            assert i < 550 or seen, "Every id was read before the first delete went out"
+            yield f"missing-{i}"
+
+    seen.clear()
+    assert len(manager.items.delete_many(stream(), concurrency=16, on_result=seen.append)) == 600
+
+    policy_ids = [policy["id"] for policy in manager.policies.add([{"policy": f"Rule {i}"} for i in range(6)])]
+    assert all(result.ok for result in manager.policies.enable_many(policy_ids[:4], enabled=False))
+    assert [policy["enabled"] for policy in server.projects["test"].policies.values()] == [False] * 4 + [True] * 2
+    assert all(result.ok for result in manager.policies.update_many({policy_ids[0]: {"policy": "Rule zero"}}))
+    assert all(result.ok for result in manager.policies.delete_many(policy_ids[4:]))
+    assert len(server.projects["test"].policies) == 4
+
+# Local websocket stand-in, answers `socket_pagination_request`s with a card echoing the request id
+def card_response(request_id, sku):
+    return {"id": request_id, "cards": [{"type": "card", "id": sku, "product": {"sku": sku, "body": "{}"}}]}
+
+async def serve_websocket(handler):
+    from websockets.asyncio.server import serve
+
+    server = await serve(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"ws://127.0.0.1:{port}"
+
+def test_websocket_multiplexing(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    async def handler(socket):
+        async def answer(message):
+            payload = json.loads(message)
+            if payload["id"] == "never":
+                return
+            # reply slowest-first so responses arrive out of order
+            await asyncio.sleep(0.05 - int(payload["id"]) * 0.002 if payload["id"].isdigit() else 0)
+            await socket.send(json.dumps(card_response(payload["id"], f"sku-{payload['id']}")))
+
+        async for message in socket:
+            asyncio.ensure_future(answer(message))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN)
+        await manager.websocket.initiate()
+
+        try:
+            payloads = [{"id": str(i), "type": "socket_pagination_request", "search_prompt": "a", "events": []} for i in range(20)]
+            responses = await asyncio.gather(*[manager.websocket.send_json(payload) for payload in payloads])
+
+            for i, cards in enumerate(responses):
+                assert cards == [{"id": f"sku-{i}", "body": "{}"}], "Response was routed to the wrong request"
+
+            with pytest.raises(asyncio.TimeoutError):
+                await manager.websocket.send_json({"id": "never"}, timeout=0.05)
+            assert not manager.websocket._pending, "Timed out request was not cleaned up"
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_websocket_shared_ids(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    async def handler(socket):
+        count = 0
+        async for message in socket:
+            payload = json.loads(message)
+            # an unsolicited id-less frame ahead of every real reply must not complete a request waiting on its id
+            await socket.send(json.dumps({"type": "pong"}))
+            if "id" in payload:
+                await socket.send(json.dumps(card_response(payload["id"], f"sku-{count}")))
+                count += 1
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN)
+        await manager.websocket.initiate()
+
+        try:
+            payload = {"id": "same", "type": "socket_pagination_request", "search_prompt": "a", "events": []}
+            responses = await asyncio.gather(*[manager.websocket.send_json(payload, timeout=1) for _ in range(3)])
+            assert responses == [[{"id": f"sku-{i}", "body": "{}"}] for i in range(3)], "Requests sharing an id were not answered in order"
+
+            assert json.loads(await manager.websocket.send_ping()) == {"type": "pong"}
+            assert not manager.websocket._pending
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_websocket_pool(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    connections = []
+
+    async def handler(socket):
+        connections.append(socket.request.path)
+        async for message in socket:
+            payload = json.loads(message)
+            await socket.send(json.dumps(card_response(payload["id"], socket.request.path.split("/")[1])))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: f"{url}/{self.visitor}")
+
+        manager = GWManager.from_token(TEST_TOKEN, max_websockets=2)
+        pool = manager.websockets
+
+        try:
+            for visitor in ("a", "b", "c"):
+                cards = await pool.send_json(visitor, {"id": visitor})
+                assert cards[0]["id"] == visitor, "Request was not sent over the visitor's socket"
+
+            stats = pool.stats()
+            assert (stats.open, stats.connects, stats.evictions) == (2, 3, 1), f"Least recently used socket was not evicted: {stats}"
+            assert (await pool.get("c")).visitor == "c" and pool.stats().hits == 1
+
+            # concurrent first requests for one visitor share a single connect
+            await asyncio.gather(*[pool.send_json("d", {"id": str(i)}) for i in range(5)])
+            assert pool.stats().connects == 4 and len(connections) == 4
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_websocket_pool_busy(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    release = asyncio.Event()
+
+    async def handler(socket):
+        visitor = socket.request.path.split("/")[1]
+        async for message in socket:
+            payload = json.loads(message)
+            if visitor != "c":
+                await release.wait()
+            await socket.send(json.dumps(card_response(payload["id"], visitor)))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: f"{url}/{self.visitor}")
+
+        manager = GWManager.from_token(TEST_TOKEN, max_websockets=2)
+        pool = manager.websockets
+
+        try:
+            in_flight = [asyncio.create_task(pool.send_json(visitor, {"id": visitor})) for visitor in ("a", "b")]
+            while sum(websocket.busy for websocket in pool._sockets.values()) < 2:
+                await asyncio.sleep(0.01)
+
+            # every slot is busy, the new visitor overflows the pool instead of evicting its own socket
+            cards = await pool.send_json("c", {"id": "c"})
+            assert cards[0]["id"] == "c"
+            stats = pool.stats()
+            assert (stats.open, stats.evictions) == (3, 0), f"A busy or fresh socket was evicted: {stats}"
+
+            release.set()
+            assert [(await task)[0]["id"] for task in in_flight] == ["a", "b"]
+
+            # once the others went idle the next connect trims the pool back down
+            await pool.send_json("d", {"id": "d"})
+            assert pool.stats().open == 2
+
+            websocket = await pool.get("d")
+            await websocket.close()
+            try:
+                await websocket.send_json({"id": "e"})
+                assert False, "Closed websocket did not raise"
+            except ConnectionError:
+                pass
+        finally:
+            await pool.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_websocket_reconnect(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    paths = []
+
+    async def handler(socket):
+        paths.append(socket.request.path)
+        async for message in socket:
+            payload = json.loads(message)
+            if len(paths) == 1:
+                # drop the first connection mid request
+                await socket.close()
+                return
+            await socket.send(json.dumps(card_response(payload["id"], "sku")))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN)
+        await manager.websocket.initiate()
+
+        try:
+            cards = await manager.websocket.send_json({"id": "replayed"}, timeout=5)
+            assert cards == [{"id": "sku", "body": "{}"}], "In flight request was not replayed after the reconnect"
+            assert len(paths) == 2 and paths[0] == paths[1], "Reconnect did not keep the session id"
+            assert manager.websocket.reconnects == 1
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_websocket_heartbeat(monkeypatch):
+    from remoras.manager import WebSocketManager
+    import json
+
+    paths = []
+
+    async def handler(socket):
+        paths.append(socket.request.path)
+        async for message in socket:
+            await socket.send(json.dumps(card_response(json.loads(message)["id"], "sku")))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN)
+        manager.websocket = WebSocketManager(manager, timeout=0.05, heartbeat_timeout=0.05)
+        await manager.websocket.initiate()
+
+        # the first socket stops answering pings, the heartbeat should notice and reconnect
+        async def dead_ping(*args):
+            return asyncio.get_running_loop().create_future()
+
+        monkeypatch.setattr(manager.websocket.socket, "ping", dead_ping)
+
+        try:
+            for _ in range(100):
+                if manager.websocket.reconnects:
+                    break
+                await asyncio.sleep(0.02)
+
+            assert manager.websocket.reconnects >= 1 and len(paths) >= 2, "Dead peer was not detected"
+            assert await manager.websocket.send_json({"id": "after"}, timeout=5)
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+    asyncio.run(run())
+
+def test_convert_cards():
+    from remoras import CardView
+
+    websocket = GWManager.from_token(TEST_TOKEN).websocket
+    page = {"id": "r1", "cards": [{"type": "card", "id": f"sku-{i}", "layout_state": {}, "product": {"sku": f"sku-{i}", "body": json.dumps({"price": i})}} for i in range(5)]}
+    raw = json.dumps(page).encode()
+    expected = [{"id": f"sku-{i}", "body": json.dumps({"price": i})} for i in range(5)]
+
+    assert websocket._convert_cards(raw) == expected
+    assert list(websocket.iter_cards(raw)) == expected, "Streamed cards do not match"
+
+    views = websocket._convert_cards(raw, lazy=True)
+    assert all(isinstance(view, CardView) for view in views)
+    assert [view.dict() for view in views] == expected and views[0]["body"] == expected[0]["body"]
+    assert views[3].body == {"price": 3}, "Lazy body was not parsed on access"
+    assert [view.body for view in websocket.iter_cards(raw, lazy=True)] == [{"price": i} for i in range(5)]
+
+    assert CardView("sku", "plain text").body == "plain text", "Non JSON bodies should be returned as is"
+    assert websocket._convert_cards(b"not json") == websocket._cards(None, b"not json") == "not json"
+
+def test_websocket_stream(monkeypatch):
+    from remoras import Event
+    from remoras.manager import WebSocketManager
+    import json
+
+    received = []
+
+    async def handler(socket):
+        async for message in socket:
+            payload = json.loads(message)
+            # every prompt pages through its own results
+            page = sum(sent["search_prompt"] == payload["search_prompt"] for sent in received)
+            received.append(payload)
+            await asyncio.sleep(0.02)
+
+            cards = [{"type": "card", "id": f"sku-{page}-{i}", "product": {"sku": f"sku-{page}-{i}", "body": "{}"}} for i in range(3)] if page < 4 else []
+            await socket.send(json.dumps({"id": payload["id"], "cards": cards}))
+
+    async def run():
+        server, url = await serve_websocket(handler)
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        manager = GWManager.from_token(TEST_TOKEN)
+        await manager.websocket.initiate()
+
+        try:
+            event = Event.create(id="sku", organization_id="org", session_id="s", visitor_id="v", weight=1)
+            pages = [cards async for cards in manager.websocket.stream("shoes", events=[event], prefetch=2)]
+
+            assert [[card["id"] for card in cards] for cards in pages] == [[f"sku-{page}-{i}" for i in range(3)] for page in range(4)], "Pages were not streamed in order"
+            assert received[0]["events"] and not any(payload["events"] for payload in received[1:]), "Events should only go with the first page"
+            assert all(payload["search_prompt"] == "shoes" for payload in received)
+
+            received.clear()
+            stream = manager.websocket.stream("boots", prefetch=2)
+            await anext(stream)
+            assert len(received) >= 2, "Next page was not prefetched"
+
+            await stream.aclose()
+            await asyncio.sleep(0)
+            assert not manager.websocket._pending, "Outstanding prefetches were not cancelled"
+
+            assert len([cards async for cards in manager.websocket.stream("sandals", max_pages=1)]) == 1
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+    asyncio.run(run())
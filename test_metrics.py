@@ -0,0 +1,104 @@
+from remoras import GWManager, TokenConfig, Metrics, Histogram, FeedPayload
+from remoras.manager import WebSocketManager
+import pytest
+import asyncio
+import json
+import requests
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+TEST_ITEM = {"title": "a", "description": "b", "external_url": "c", "image_url": "d"}
+
+class MockResponse:
+    def __init__(self, status, body):
+        self.status_code = status
+        self.content = json.dumps(body).encode()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error", response=self)
+
+@pytest.fixture
+def mock_requests(monkeypatch):
+    def mock_request(session, method, url, **kwargs):
+        if url.endswith("/missing"):
+            return MockResponse(404, {"detail": "not found"})
+        if url.endswith("/broken"):
+            raise requests.ConnectionError("dropped")
+        return MockResponse(200, {"ok": True})
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 0.2, 0.5))
+    for value in [0.05] * 50 + [0.15] * 40 + [0.4] * 9 + [3.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [50, 40, 9, 1] and histogram.count == 100
+    assert histogram.quantile(0.5) == pytest.approx(0.1)
+    assert 0.1 < histogram.quantile(0.9) <= 0.2 and histogram.quantile(0.99) <= 0.5
+
+def test_http_metrics(mock_requests):
+    samples = []
+    manager = GWManager.from_token(TEST_TOKEN, metrics=Metrics(sinks=[samples.append]))
+    manager.metrics.add_sink(lambda sample: 1 / 0) # a broken sink never fails the request
+
+    manager.items.add([TEST_ITEM])
+    manager.data.feed(FeedPayload(search_prompt="shoes"))
+    with pytest.raises(requests.HTTPError):
+        manager.items.get("missing")
+    with pytest.raises(requests.ConnectionError):
+        manager.items.get("broken")
+
+    assert [(sample.name, sample.method, sample.status) for sample in samples] == [
+        ("items.create", "POST", 200), ("data.feed", "POST", 200), ("items.get", "GET", 404), ("items.get", "GET", None)
+    ]
+    assert samples[0].sent == len(json.dumps([TEST_ITEM], separators=(",", ":"))) and samples[0].received > 0
+    assert manager.metrics.sink_errors == 4
+
+    snapshot = manager.metrics.snapshot()
+    assert snapshot["http items.get GET"]["count"] == 2 and snapshot["http items.get GET"]["errors"] == {"404": 1, "ConnectionError": 1}
+
+    text = manager.metrics.prometheus()
+    assert "# TYPE remoras_http_request_duration_seconds histogram" in text
+    assert 'remoras_http_request_duration_seconds_bucket{name="items.create",method="POST",le="+Inf"} 1' in text
+    assert 'remoras_http_request_duration_seconds_count{name="items.get",method="GET"} 2' in text
+    assert 'remoras_errors_total{kind="http",name="items.get",method="GET",status="404"} 1' in text
+
+def test_metrics_off(mock_requests):
+    manager = GWManager.from_token(TEST_TOKEN)
+    assert manager.metrics is None and manager.transport.metrics is None
+    assert manager.items.get("sku") == {"ok": True}
+
+def test_websocket_metrics(monkeypatch):
+    from websockets.asyncio.server import serve
+
+    async def handler(socket):
+        async for message in socket:
+            payload = json.loads(message)
+            await socket.send(json.dumps({"id": payload["id"], "cards": []}))
+
+    async def run():
+        server = await serve(handler, "127.0.0.1", 0)
+        url = f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        monkeypatch.setattr(WebSocketManager, "_get_endpoint", lambda self: url)
+
+        samples = []
+        manager = GWManager.from_token(TEST_TOKEN, metrics=Metrics(sinks=[samples.append]))
+        await manager.websocket.initiate()
+        try:
+            for i in range(3):
+                await manager.websocket.send_json({"id": str(i), "type": "socket_pagination_request", "search_prompt": "a", "events": []})
+
+            # `sent` counts encoded bytes, not characters
+            message = json.dumps({"id": "4", "search_prompt": "chaussures été"}, ensure_ascii=False)
+            await manager.websocket.send_message(message, request_id="4")
+            assert samples[-1].sent == len(message.encode()) == len(message) + 2
+        finally:
+            await manager.websocket.close()
+            server.close()
+
+        series = manager.metrics.snapshot()["websocket websocket.send_json WS"]
+        assert series["count"] == 3 and series["sent_bytes"] > 0 and series["received_bytes"] > 0 and series["p50"] > 0
+        assert 'remoras_websocket_request_duration_seconds_count{name="websocket.send_json",method="WS"} 3' in manager.metrics.prometheus()
+
+    asyncio.run(run())
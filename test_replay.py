@@ -0,0 +1,65 @@
+from remoras import GWManager, TokenConfig, FeedPayload, TrafficRecorder, iter_capture
+from remoras.replay import replay
+from remoras.standin import StandinServer
+import asyncio
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+
+def test_capture_and_replay(tmp_path):
+    server = StandinServer()
+    with server.serve_in_thread() as url:
+        manager = GWManager.from_token(TEST_TOKEN, endpoint=url, project_dir=str(tmp_path), capture=True)
+
+        async def browse():
+            await manager.websocket.initiate()
+            try:
+                await manager.websocket.send_json({"id": "1", "type": "socket_pagination_request", "search_prompt": "shoes", "events": []})
+                await asyncio.sleep(0.05)
+                [page async for page in manager.websocket.stream("boots", max_pages=2)]
+            finally:
+                await manager.websocket.close()
+
+        asyncio.run(browse())
+        manager.data.feed(FeedPayload(search_prompt="hats"), session_id="s1")
+        manager.data.batch(FeedPayload(events=[{"type": "click"}]), session_id="s1")
+        manager.close()
+
+        records = list(iter_capture(manager.capture.path))
+        assert manager.capture.path.startswith(str(tmp_path / "captures")) and manager.capture.records == 5
+        assert [record["kind"] for record in records] == ["websocket"] * 3 + ["feed", "batch"]
+        assert records[0]["request"]["search_prompt"] == "shoes" and records[0]["cards"] == 10 and records[0]["visitor"] == "DEFAULT"
+        assert records[1]["t"] - records[0]["t"] >= 0.05 and "response" not in records[0]
+        assert records[3]["session"] == "s1" and records[3]["received"] > 0 and records[3]["error"] is None
+
+        served = server.stats()
+        replayer = GWManager.from_token(TEST_TOKEN, endpoint=url)
+        report = asyncio.run(replay(manager.capture.path, replayer, speed=10, visitors=3, repeat=4))
+        replayer.close()
+
+    assert report.sessions == 8 and report.requests == 20 and not report.errors
+    assert len(report.latencies["websocket"]) == 12 and len(report.captured["feed"]) == 4
+    assert report.throughput > 0 and report.percentiles()["p99"] >= report.percentiles()["p50"] > 0
+    assert server.stats().messages - served.messages == 12 and server.stats().requests - served.requests == 8
+
+def test_recorder_errors(tmp_path):
+    server = StandinServer(error_rate=1.0, error_status=500)
+    with server.serve_in_thread() as url:
+        with TrafficRecorder(str(tmp_path / "errors.jsonl.gz"), responses=True) as recorder:
+            manager = GWManager.from_token(TEST_TOKEN, endpoint=url, capture=recorder)
+            try:
+                manager.data.feed(FeedPayload(search_prompt="a"))
+            except Exception:
+                pass
+
+    [record] = iter_capture(recorder.path)
+    assert record["error"] == "500" and record["response"] is None
+
+def test_recorder_reopens(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path / "capture.jsonl.gz"))
+    recorder.record("feed", "s1", {"search_prompt": "a"}, 0.0)
+    recorder.close()
+    recorder.record("feed", "s2", {"search_prompt": "b"}, 0.0)
+    recorder.close()
+
+    assert recorder.records == 2
+    assert [record["session"] for record in iter_capture(recorder.path)] == ["s1", "s2"], "Records made before close() were lost"
@@ -0,0 +1,130 @@
+from remoras import GWManager, AsyncGWManager, TokenConfig, FeedPayload, AdaptiveLimiter
+from remoras.standin import StandinServer
+import asyncio
+import json
+
+TEST_TOKEN = TokenConfig(project_name="test", token="123456789")
+
+def test_standin_items(standin, item, tmp_path):
+    server, url = standin
+    manager = GWManager.from_token(TEST_TOKEN, endpoint=url, project_dir=str(tmp_path))
+
+    created = manager.items.add([item(i) for i in range(3)])
+    assert len(created) == 3 and all("id" in created_item for created_item in created)
+    assert manager.items.get(created[0]["id"])["title"] == "Item 0"
+
+    manager.items.update(created[1]["id"], {**item(1), "title": "Renamed"})
+    manager.items.delete(created[2]["id"])
+    assert [listed["title"] for listed in manager.items.list(params={"page": 1, "count": 10})] == ["Item 0", "Renamed"]
+
+    report = manager.items.sync([item(i) for i in range(5)])
+    assert report.ok and report.created == 5
+    report = manager.items.sync([item(i) for i in range(4)])
+    assert report.ok and report.deleted == 1 and report.unchanged == 4
+    assert len(server.projects["test"].items) == 6
+
+    policy = manager.policies.add([{"policy": "Boost running shoes"}])[0]
+    manager.policies.enable(policy["id"], False)
+    assert manager.policies.get(policy["id"])["enabled"] is False
+
+    feed = manager.data.feed(FeedPayload(search_prompt="shoes"))
+    assert feed["search_prompt"] == "shoes" and len(feed["items"]) == 6
+    assert server.stats().errors == 0 and server.stats().requests > 10
+
+def test_standin_websocket(standin):
+    server, url = standin
+    manager = GWManager.from_token(TEST_TOKEN, endpoint=url)
+
+    async def run():
+        await manager.websocket.initiate()
+        try:
+            cards = await manager.websocket.send_json({"id": "1", "type": "socket_pagination_request", "search_prompt": "a", "events": []})
+            assert len(cards) == 10 and json.loads(cards[0]["body"])["title"] == "Item 0"
+
+            pages = [page async for page in manager.websocket.stream("b", prefetch=2, max_pages=3)]
+            assert [page[0]["id"] for page in pages] == ["sku-10", "sku-20", "sku-30"]
+        finally:
+            await manager.websocket.close()
+
+    asyncio.run(run())
+    assert server.stats().messages == 4
+
+def test_standin_pool_event_buffer(standin):
+    from remoras import Event
+
+    server, url = standin
+    manager = GWManager.from_token(TEST_TOKEN, endpoint=url)
+    pool = manager.websockets
+
+    errors = []
+
+    def event(i):
+        return Event.create(id=f"sku-{i}", organization_id="org", session_id="s", visitor_id=f"v{i % 2}", weight=1)
+
+    async def run():
+        try:
+            async with pool.event_buffer(max_events=100, max_age=60, on_error=lambda e, events: errors.append(e)) as buffer:
+                await buffer.aadd(event(0))
+                buffer.flush() # blocking on the loop from the loop fails the batch instead of deadlocking
+                assert len(errors) == 1 and isinstance(errors[0], RuntimeError)
+
+                for i in range(1, 5):
+                    await buffer.aadd(event(i))
+                await buffer.aflush()
+                assert buffer.stats().flushed == 4
+
+                await buffer.aadd(event(5))
+            return buffer.stats()
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(run())
+    assert (stats.flushed, stats.dropped, stats.pending) == (5, 1, 0)
+    assert server.projects["test"].events == 5 and len(server.projects["test"].items) == 0
+
+def test_standin_pagination_cache(standin):
+    from remoras import FeedCache
+
+    server, url = standin
+    manager = GWManager.from_token(TEST_TOKEN, endpoint=url, feed_cache=FeedCache(ttl=60))
+    payload = {"id": "1", "type": "socket_pagination_request", "search_prompt": "a", "events": []}
+
+    async def run():
+        await manager.websocket.initiate()
+        try:
+            return [await manager.websocket.send_json(payload) for _ in range(2)]
+        finally:
+            await manager.websocket.close()
+
+    first, second = asyncio.run(run())
+    assert first[0]["id"] == "sku-0" and second[0]["id"] == "sku-10", "Repeated pagination request returned the cached first page"
+
+def test_standin_async(standin, item):
+    server, url = standin
+
+    async def run():
+        async with AsyncGWManager.from_token(TEST_TOKEN, endpoint=url) as manager:
+            created = await manager.items.add([item(i) for i in range(3)])
+            assert (await manager.items.get(created[0]["id"]))["title"] == "Item 0"
+            assert len(await manager.items.list()) == 3
+            assert (await manager.data.feed(FeedPayload(search_prompt="a")))["search_prompt"] == "a"
+
+    asyncio.run(run())
+
+def test_standin_throttled(item):
+    server = StandinServer(error_rate=0.3, error_status=429, retry_after=0.001, seed=7)
+    with server.serve_in_thread() as url:
+        manager = GWManager.from_token(TEST_TOKEN, endpoint=url, limiter=AdaptiveLimiter(retries=10, backoff=0.001))
+        report = manager.items.add([item(i) for i in range(100)], chunk_size=5, concurrency=4, retries=0)
+
+    assert report.ok and report.succeeded == 100, "Injected 429s were not retried"
+    assert server.stats().errors > 0 and manager.limiter.stats().throttled == server.stats().errors
+    assert len(server.projects["test"].items) == 100
+
+def test_endpoint_override(monkeypatch):
+    monkeypatch.setenv("REMORAS_ENDPOINT", "http://localhost:9000/")
+    assert GWManager.from_token(TEST_TOKEN).endpoint == "http://localhost:9000"
+    assert GWManager.from_token(TEST_TOKEN, endpoint="https://other").endpoint == "https://other"
+
+    manager = GWManager.from_token(TEST_TOKEN)
+    assert manager.websocket._get_endpoint().startswith("ws://localhost:9000/ws/")
@@ -0,0 +1,32 @@
+from remoras import Event, WebsocketPayload, FeedPayload, BasicAuth, TokenConfig
+import json
+import pytest
+
+EVENTS = [
+    Event.create(id="sku-1", organization_id="org", session_id="session", visitor_id="visitor", weight=4),
+    Event(id='quote " and \\ slash', organization_id="ünïcode ✓", session_id="s\n2", visitor_id="v", weight=-1, event="purchase"),
+]
+
+def test_structs_are_slotted():
+    for struct in (EVENTS[0], WebsocketPayload(), FeedPayload(), TokenConfig(token="a", project_name="b")):
+        assert not hasattr(struct, "__dict__"), f"{type(struct).__name__} is not slot based"
+
+        with pytest.raises(AttributeError):
+            struct.not_a_field = 1
+
+def test_encode_matches_dict():
+    for event in EVENTS:
+        assert json.loads(event.encode()) == event.dict()
+
+    payload = WebsocketPayload(id="abc", search_prompt="shoes", events=EVENTS)
+    assert json.loads(payload.encode()) == payload.dict()
+    assert json.loads(WebsocketPayload().encode()) == WebsocketPayload().dict()
+
+    feed = FeedPayload(page=2, events=[event.dict() for event in EVENTS], search_prompt="hats")
+    assert json.loads(feed.encode()) == feed.dict()
+    assert json.loads(FeedPayload(events=EVENTS).encode()) == FeedPayload(events=EVENTS).dict()
+    assert FeedPayload(events=EVENTS).dict()["events"] == [event.dict() for event in EVENTS]
+
+def test_dict_is_a_copy():
+    auth = BasicAuth(username="a", password="b")
+    assert auth.dict() == {"username": "a", "password": "b"}
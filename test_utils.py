@@ -0,0 +1,73 @@
+from remoras.utils import iter_json_values, iter_json_field, iter_obj_or_path, load_obj_or_path
+import pytest
+import json
+
+TEST_ITEMS = [{"title": f"item {i}", "description": "b, [c] {d}", "external_url": f"https://x/{i}", "image_url": "d", "price": i * 1000} for i in range(50)]
+
+def split(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+@pytest.mark.parametrize("size", [1, 7, 64, 1 << 20])
+def test_iter_json_array(size):
+    text = json.dumps(TEST_ITEMS, indent=2)
+    assert list(iter_json_values(split(text, size))) == TEST_ITEMS, "Streamed array does not match json.loads"
+
+    # bare numbers split across chunks must not be cut short
+    assert list(iter_json_values(split("[12345, 678,9]", size))) == [12345, 678, 9]
+    assert list(iter_json_values(split("[]", size))) == []
+
+@pytest.mark.parametrize("size", [1, 13, 1 << 20])
+def test_iter_json_lines(size):
+    text = "\n".join(json.dumps(item) for item in TEST_ITEMS) + "\n"
+    assert list(iter_json_values(split(text, size))) == TEST_ITEMS, "Streamed JSON Lines do not match"
+
+@pytest.mark.parametrize("size", [1, 5, 1 << 20])
+def test_iter_json_invalid(size):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_values(split('[{"title": "a"}, {"title": ', 4)))
+
+    for text in ("[1,,2]", "[,1]", "[1,]", "[1 2]"):
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_values(split(text, size)))
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_json_field(f'{{"cards": {text}}}', "cards"))
+
+def test_iter_json_large_value(monkeypatch):
+    import remoras.utils
+
+    decodes = []
+    decoder = remoras.utils._decoder
+    monkeypatch.setattr(remoras.utils, "_decoder", type("Counting", (), {"raw_decode": lambda self, text, index: decodes.append(index) or decoder.raw_decode(text, index)})())
+
+    # escaped quotes and backslashes right at chunk edges must not end the value early
+    value = {"body": 'x \\" [ {' * 5000, "tags": [[i, {"i": str(i)}] for i in range(2000)]}
+    text = json.dumps([value, 1, value])
+    assert list(iter_json_values(split(text, 7))) == [value, 1, value]
+    assert len(decodes) < 10, f"{len(decodes)} decodes for 3 values, a large value was decoded again for every chunk"
+
+def test_iter_obj_or_path(tmp_path):
+    array_path = tmp_path / "items.json"
+    array_path.write_text(json.dumps(TEST_ITEMS))
+
+    lines_path = tmp_path / "items.jsonl"
+    lines_path.write_text("\n".join(json.dumps(item) for item in TEST_ITEMS))
+
+    assert list(iter_obj_or_path(str(array_path), chunk_size=16)) == TEST_ITEMS
+    assert list(iter_obj_or_path(str(lines_path), chunk_size=16)) == TEST_ITEMS
+    assert list(iter_obj_or_path(TEST_ITEMS)) == TEST_ITEMS
+
+    assert load_obj_or_path(str(lines_path)) == TEST_ITEMS, "load_obj_or_path does not read JSON Lines"
+
+def test_iter_json_field():
+    text = json.dumps({"id": "r1", "meta": {"cards": ["not", "these"]}, "cards": TEST_ITEMS, "after": [1]})
+    assert list(iter_json_field(text, "cards")) == TEST_ITEMS, "Did not stream the top-level field"
+    assert list(iter_json_field(text.encode(), "cards")) == TEST_ITEMS
+
+    assert list(iter_json_field('{"id": "r1"}', "cards")) == []
+    assert list(iter_json_field('{"cards": null}', "cards")) == []
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_field('["cards"]', "cards"))
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_field('{"cards": [1, 2', "cards"))
+    assert list(iter_json_field('{"cards": [ 1 , 2.5 ,{"a": []}] }', "cards")) == [1, 2.5, {"a": []}]